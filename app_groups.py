@@ -0,0 +1,298 @@
+"""
+App groups: stacks of apps started in dependency order.
+Each app lists the apps it needs in "depends_on" and a group names a set
+of apps. Starting a group launches every app whose dependencies are ready
+at once, so independent branches come up in parallel while each app waits
+for its dependencies to pass their readiness check, not just to spawn.
+Groups stop in reverse order, and the time the whole group took to become
+ready is reported against its critical path.
+"""
+
+import asyncio
+import threading
+import time
+
+from supervisor import BACKOFF, NOT_READY, READY, LaunchError
+
+FAILURE_EVENTS = {"not_ready", "crash_loop", "restart_failed", "start_failed", "prepare_failed"}
+
+
+def dependency_graph(supervisor, names):
+    """Return {name: [dependencies]} for names and everything they depend on"""
+    graph = {}
+    pending = list(names)
+    while pending:
+        name = pending.pop()
+        if name in graph:
+            continue
+        app = supervisor.get(name)
+        if app is None:
+            raise LaunchError(f"No app named '{name}'")
+        graph[name] = list(app.definition.depends_on)
+        for dependency in graph[name]:
+            if supervisor.get(dependency) is None:
+                raise LaunchError(f"'{name}' depends on unknown app '{dependency}'")
+        pending.extend(graph[name])
+    return graph
+
+
+def dependency_levels(graph):
+    """Group names by depth (apps without dependencies first); raises LaunchError on a cycle"""
+    depth = {}
+    visiting = set()
+
+    def visit(name, chain):
+        if name in depth:
+            return depth[name]
+        if name in visiting:
+            raise LaunchError("Dependency cycle: " + " → ".join(chain + [name]))
+        visiting.add(name)
+        deps = [dep for dep in graph[name] if dep in graph]
+        depth[name] = 1 + max((visit(dep, chain + [name]) for dep in deps), default=-1)
+        visiting.discard(name)
+        return depth[name]
+
+    for name in sorted(graph):
+        visit(name, [])
+    levels = [[] for _ in range(max(depth.values(), default=-1) + 1)]
+    for name in sorted(graph):
+        levels[depth[name]].append(name)
+    return levels
+
+
+def critical_path(graph, durations):
+    """Return (seconds, names) of the dependency chain with the largest total duration"""
+    finish = {}
+    previous = {}
+    for level in dependency_levels(graph):
+        for name in level:
+            before = max(graph[name], key=lambda dep: finish[dep], default=None)
+            previous[name] = before
+            finish[name] = durations.get(name, 0.0) + (finish[before] if before else 0.0)
+    if not finish:
+        return 0.0, []
+    name = max(finish, key=finish.get)
+    total = finish[name]
+    path = []
+    while name is not None:
+        path.append(name)
+        name = previous[name]
+    path.reverse()
+    return total, path
+
+
+class GroupRun:
+    """One dependency-ordered start of a set of apps"""
+
+    def __init__(self, supervisor, label, graph, initial=()):
+        self.supervisor = supervisor
+        self.label = label
+        self.graph = graph
+        # Apps started as initial starts; dependencies pulled in are not
+        self.initial = set(initial)
+        self.levels = dependency_levels(graph)
+        self.dependents = {name: [] for name in graph}
+        for name, deps in graph.items():
+            for dependency in deps:
+                self.dependents[dependency].append(name)
+        self.started_at = None
+        self.launched = {}
+        self.ready = {}
+        self.failed = {}
+        self.blocked = set()
+        self.errors = {}
+        self.cancelled = False
+        self.done = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self):
+        """True while some app is still waiting to be started or to become ready"""
+        return not self.done.is_set()
+
+    def start(self):
+        """Launch every app without dependencies; the rest follow as dependencies become ready"""
+        self.started_at = time.monotonic()
+        self._launch_all(self.levels[0] if self.levels else [])
+        return self
+
+    def cancel(self):
+        """Launch nothing more (the apps already started keep running)"""
+        with self._lock:
+            self.cancelled = True
+        self.done.set()
+
+    def on_event(self, event):
+        name = event["app"]
+        if name not in self.graph or self.done.is_set():
+            return
+        kind = event["type"]
+        if kind == "ready":
+            self._on_ready(name)
+        elif kind in FAILURE_EVENTS:
+            self._on_failed(name, kind.replace("_", " "))
+        elif kind == "exited" and not event.get("expected"):
+            app = self.supervisor.get(name)
+            if app and not app.definition.restart.should_restart(event["returncode"]):
+                self._on_failed(name, f"exited with code {event['returncode']}")
+
+    def _launch_all(self, names):
+        for name in names:
+            self._launch(name)
+
+    def _launch(self, name):
+        with self._lock:
+            if self.cancelled or name in self.launched:
+                return
+            self.launched[name] = time.monotonic()
+        app = self.supervisor.get(name)
+        if app.status == READY:
+            self._on_ready(name)
+        elif app.is_running and app.status == NOT_READY:
+            self._on_failed(name, "not ready")
+        elif not (app.is_running or app.status == BACKOFF):
+            try:
+                self.supervisor.start(name, initial=name in self.initial)
+            except (LaunchError, OSError) as e:
+                self.errors[name] = str(e)
+                self._on_failed(name, str(e))
+                self.supervisor.emit(name, "start_failed", error=str(e))
+
+    def _on_ready(self, name):
+        with self._lock:
+            if name in self.ready or name not in self.launched:
+                return
+            self.ready[name] = time.monotonic()
+            unblocked = [dependent for dependent in self.dependents[name]
+                         if all(dep in self.ready for dep in self.graph[dependent])]
+        self._launch_all(unblocked)
+        self._check_done()
+
+    def _on_failed(self, name, reason):
+        with self._lock:
+            if name not in self.launched or name in self.ready or name in self.failed:
+                return
+            self.failed[name] = reason
+            # Everything downstream can never start
+            pending = list(self.dependents[name])
+            while pending:
+                dependent = pending.pop()
+                if dependent not in self.launched and dependent not in self.blocked:
+                    self.blocked.add(dependent)
+                    pending.extend(self.dependents[dependent])
+        self._check_done()
+
+    def _check_done(self):
+        with self._lock:
+            settled = len(self.ready) + len(self.failed) + len(self.blocked)
+            if self.done.is_set() or self.cancelled or settled < len(self.graph):
+                return
+            self.done.set()
+        if len(self.graph) < 2:
+            return
+        if self.failed:
+            self.supervisor.emit(self.label, "group_failed", failed=dict(self.failed),
+                                 blocked=sorted(self.blocked))
+            return
+        elapsed = max(self.ready.values()) - self.started_at
+        durations = {name: self.ready[name] - self.launched[name] for name in self.graph}
+        critical, path = critical_path(self.graph, durations)
+        self.supervisor.emit(self.label, "group_ready", elapsed=elapsed, critical=critical,
+                             path=path, apps=len(self.graph))
+
+    def summary(self):
+        """Return the state of the run as a plain dict"""
+        with self._lock:
+            return {
+                "group": self.label,
+                "order": [name for level in self.levels for name in level],
+                "ready": sorted(self.ready),
+                "failed": dict(self.failed),
+                "blocked": sorted(self.blocked),
+                "done": self.done.is_set(),
+            }
+
+
+class GroupManager:
+    """Named app groups plus the dependency-ordered runs in progress"""
+
+    def __init__(self, supervisor):
+        self.supervisor = supervisor
+        self.groups = {}
+        self.runs = []
+        self._lock = threading.Lock()
+        self._listening = False
+
+    def on_event(self, event):
+        finished = False
+        for run in list(self.runs):
+            run.on_event(event)
+            finished = finished or not run.pending
+        if finished:
+            with self._lock:
+                self.runs = [run for run in self.runs if run.pending]
+
+    def members(self, group):
+        """Return the apps of a group; raises LaunchError for unknown groups"""
+        if group not in self.groups:
+            raise LaunchError(f"No group named '{group}'")
+        return list(self.groups[group])
+
+    def busy(self):
+        """Return True while a run still has apps waiting on their dependencies"""
+        return any(run.pending for run in list(self.runs))
+
+    def start(self, names, label="apps", initial=True):
+        """Start names and their dependencies in dependency order; returns the GroupRun.
+
+        With initial set, names (not their dependencies) open the browser once ready.
+        """
+        run = GroupRun(self.supervisor, label, dependency_graph(self.supervisor, names),
+                       initial=names if initial else ())
+        with self._lock:
+            if not self._listening:
+                # Registered late so a group's summary follows its apps' own events
+                self.supervisor.add_listener(self.on_event)
+                self._listening = True
+            self.runs.append(run)
+        return run.start()
+
+    def start_group(self, group):
+        return self.start(self.members(group), label=group)
+
+    def stop(self, names, wait=False, keep_running=False):
+        """Stop names dependents-first: each level once the apps depending on it are down"""
+        names = [name for name in names if self.supervisor.get(name) is not None]
+        for run in list(self.runs):
+            if any(name in run.graph for name in names):
+                run.cancel()
+        graph = {name: [dep for dep in self.supervisor.get(name).definition.depends_on if dep in names]
+                 for name in names}
+        try:
+            levels = dependency_levels(graph)
+        except LaunchError:
+            levels = [names]
+
+        async def run():
+            for level in reversed(levels):
+                stopping = []
+                for name in level:
+                    app = self.supervisor.get(name)
+                    if keep_running and app.definition.keep_running and app.is_running:
+                        continue
+                    self.supervisor.stop(name)
+                    if app.shutdown is not None:
+                        stopping.append(asyncio.wrap_future(app.shutdown))
+                await asyncio.gather(*stopping)
+
+        if wait:
+            self.supervisor.events.submit(run()).result()
+        else:
+            self.supervisor.events.spawn(run())
+
+    def stop_group(self, group, wait=False):
+        self.stop(self.members(group), wait=wait)
+
+    def stop_all(self, wait=False, keep_running=False):
+        """Stop every app in reverse dependency order"""
+        self.stop(list(self.supervisor.apps), wait=wait, keep_running=keep_running)
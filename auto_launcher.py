@@ -1,12 +1,46 @@
 #!/usr/bin/env python3
 """
 Auto-start version of Universal Web App Launcher
-This version automatically starts the server on startup if a path is saved
+This version automatically starts the server on startup if a path is saved.
+The server is spawned before Tk is even imported, so it boots while the
+window is being built; --startup-trace reports where start-up time goes.
 """
 
-from universal_launcher import UniversalWebAppLauncher
+import sys
 
 if __name__ == "__main__":
+    # First, so the trace's "interpreter ready" stamp is taken before anything else loads
+    import startup_trace
+    trace = startup_trace.from_argv(sys.argv)
+
+    if "--headless" in sys.argv[1:]:
+        # Headless auto-start never imports Tk
+        from headless import main
+        sys.exit(main(sys.argv[1:]))
+
+    import launcher_core
+    trace.mark("core imported")
+
+    core = launcher_core.LauncherCore()
+    # Only the saved app's profile for now; the rest once its server is on its way
+    core.load_config(lazy=True)
+    trace.mark("config loaded")
+    # The server may well speak before the window is up; report once both happened
+    trace.expect("window shown")
+    trace.watch(core.supervisor)
+    # Holds what the server prints until the window exists to show it
+    early_events = launcher_core.EventBuffer(core.supervisor)
+    core.start()
+    trace.mark("services started")
+    if core.start_saved_app():
+        trace.mark("server spawned")
+    core.load_profiles()
+
+    from universal_launcher import UniversalWebAppLauncher
+    trace.mark("Tk imported")
+
     # Create launcher with auto-start enabled
-    app = UniversalWebAppLauncher(auto_start=True)
-    app.run()
\ No newline at end of file
+    app = UniversalWebAppLauncher(auto_start=True, core=core, early_events=early_events)
+    trace.mark("window built")
+    app.root.after_idle(trace.mark, "window shown")
+    app.run()
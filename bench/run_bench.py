@@ -0,0 +1,502 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the launcher's hot paths.
+Drives the Tk-free LauncherCore (and the real GUI when a display is
+available) against the stand-in servers in standin.py and measures:
+
+    ready_fast / ready_slow   spawn-to-ready latency
+    log_flood                 sustained output lines per second
+    ui_flood                  UI event-loop lag while a flood is displayed
+    stop                      stop-to-port-free time, for a well-behaved server
+                              and for one that ignores SIGTERM and forks workers
+
+Each case runs in its own process so its peak memory can be reported.
+Results are written as JSON and compared against a stored baseline:
+
+    python bench/run_bench.py                      # run, compare with bench/baseline.json
+    python bench/run_bench.py --output out.json    # also save the results
+    python bench/run_bench.py --save-baseline      # make this run the new baseline
+"""
+
+import argparse
+import heapq
+import itertools
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+import journal
+import launcher_core
+import log_model
+import ports
+
+STANDIN = os.path.join(BENCH_DIR, "standin.py")
+BASELINE_FILE = os.path.join(BENCH_DIR, "baseline.json")
+CASES = ["ready_fast", "ready_slow", "log_flood", "ui_flood", "stop"]
+BASE_PORT = 5800
+SLOW_DELAY = 1.0
+STOP_GRACE = 1.0
+HEARTBEAT_MS = 20
+CASE_TIMEOUT = 300
+DEFAULT_THRESHOLD = 0.2
+
+# Differences smaller than this are noise whatever the percentage
+NOISE = {"s": 0.02, "ms": 5.0, "MB": 2.0, "lines/s": 0.0}
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def metric(value, unit, better="lower"):
+    return {"value": round(value, 6), "unit": unit, "better": better}
+
+
+def peak_rss_mb():
+    """Return this process's peak resident memory in MB, or None if unknown"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def standin_command(mode, argument=None):
+    parts = [sys.executable, STANDIN, mode] + ([str(argument)] if argument is not None else [])
+    return " ".join(f'"{part}"' for part in parts)
+
+
+class EventWaiter:
+    """Supervisor listener that lets the benchmark block until an event arrives"""
+
+    def __init__(self, supervisor):
+        self.events = []
+        self._condition = threading.Condition()
+        supervisor.add_listener(self.on_event)
+
+    def on_event(self, event):
+        # A stopped run's exit can be reported after the next start; it is not news
+        if event["type"] == "output" or (event["type"] == "exited" and event["expected"]):
+            return
+        with self._condition:
+            self.events.append(event)
+            self._condition.notify_all()
+
+    def mark(self):
+        with self._condition:
+            return len(self.events)
+
+    def wait(self, app, kinds, since=0, timeout=60.0):
+        """Return the first event of one of kinds for app after position since"""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while True:
+                for event in self.events[since:]:
+                    if event["app"] == app and event["type"] in kinds:
+                        return event
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"{app}: no {'/'.join(kinds)} event within {timeout:g}s")
+                self._condition.wait(remaining)
+
+
+class Bench:
+    """A launcher core in a scratch directory with the stand-in apps configured"""
+
+    def __init__(self, apps):
+        self.dir = tempfile.mkdtemp(prefix="launcher-bench-")
+        os.chdir(self.dir)
+        with open(launcher_core.CONFIG_FILE, "w") as f:
+            json.dump({"apps": apps}, f)
+        self.core = None
+
+    def open_core(self):
+        self.core = launcher_core.LauncherCore(os.path.join(self.dir, launcher_core.CONFIG_FILE))
+        self.core.load_config()
+        self.core.start()
+        return self.core
+
+    def close(self):
+        if self.core is not None:
+            self.core.groups.stop_all(wait=True)
+            self.core.close()
+        os.chdir(BENCH_DIR)
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+
+def app_entry(name, mode, argument=None, **settings):
+    entry = {"name": name, "path": ".", "command": standin_command(mode, argument), "port": BASE_PORT,
+             "open_browser": False, "detect_url": False}
+    entry.update(settings)
+    return entry
+
+
+def wait_port_free(host, port, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while not ports.is_port_free(host, port):
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"port {port} still busy after {timeout:g}s")
+        time.sleep(0.002)
+
+
+def measure_ready(mode, argument, repeat):
+    """Spawn-to-ready latencies over repeat starts"""
+    bench = Bench([app_entry("app", mode, argument)])
+    core = bench.open_core()
+    waiter = EventWaiter(core.supervisor)
+    samples = []
+    try:
+        for _ in range(repeat):
+            since = waiter.mark()
+            began = time.monotonic()
+            core.supervisor.start("app")
+            event = waiter.wait("app", ("ready", "not_ready", "exited"), since)
+            if event["type"] != "ready":
+                raise RuntimeError(f"stand-in did not become ready: {event}")
+            samples.append(event["monotonic"] - began)
+            port = core.supervisor.get("app").port
+            core.supervisor.stop("app", wait=True)
+            wait_port_free("127.0.0.1", port)
+    finally:
+        bench.close()
+    return samples
+
+
+def case_ready_fast(args):
+    samples = measure_ready("fast", None, args.repeat)
+    return {"spawn_to_ready_fast_s": metric(statistics.median(samples), "s")}
+
+
+def case_ready_slow(args):
+    samples = measure_ready("slow", SLOW_DELAY, max(1, args.repeat // 2))
+    return {
+        "spawn_to_ready_slow_s": metric(statistics.median(samples), "s"),
+        # What the launcher adds on top of the server's own start-up time
+        "spawn_to_ready_slow_overhead_s": metric(statistics.median(samples) - SLOW_DELAY, "s"),
+    }
+
+
+def case_log_flood(args):
+    bench = Bench([app_entry("flood", "flood", args.lines)])
+    core = bench.open_core()
+    waiter = EventWaiter(core.supervisor)
+    counts = {"lines": 0, "first": None, "last": None}
+
+    def count(event):
+        if event["type"] == "output" and event["app"] == "flood":
+            counts["lines"] += 1
+            counts["last"] = event["monotonic"]
+            if counts["first"] is None:
+                counts["first"] = event["monotonic"]
+
+    core.supervisor.add_listener(count)
+    try:
+        began = time.monotonic()
+        core.supervisor.start("flood")
+        event = waiter.wait("flood", ("exited",), timeout=CASE_TIMEOUT)
+        total = event["monotonic"] - began
+    finally:
+        bench.close()
+    span = (counts["last"] - counts["first"]) if counts["lines"] > 1 else total
+    return {
+        "log_lines_per_s": metric(counts["lines"] / max(span, 1e-9), "lines/s", "higher"),
+        "log_flood_total_s": metric(total, "s"),
+        "log_lines_lost": metric(args.lines - counts["lines"], "lines"),
+    }
+
+
+class SimRoot:
+    """Single-threaded stand-in for Tk's after() scheduling, for machines without a display"""
+
+    def __init__(self):
+        self._timers = []
+        self._ids = itertools.count(1)
+        self._cancelled = set()
+        self._quit = False
+
+    def after(self, ms, callback, *args):
+        after_id = next(self._ids)
+        heapq.heappush(self._timers, (time.monotonic() + ms / 1000, after_id, callback, args))
+        return after_id
+
+    def after_cancel(self, after_id):
+        self._cancelled.add(after_id)
+
+    def quit(self):
+        self._quit = True
+
+    def mainloop(self):
+        while self._timers and not self._quit:
+            when, after_id, callback, args = heapq.heappop(self._timers)
+            if after_id in self._cancelled:
+                self._cancelled.discard(after_id)
+                continue
+            delay = when - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            callback(*args)
+
+
+def simulated_ui(core):
+    """Wire the GUI's event path (UI queue, status messages, log model) to a SimRoot"""
+    import event_loop
+
+    root = SimRoot()
+    model = log_model.LogModel()
+    ui = event_loop.UiQueue(root)
+
+    def on_supervisor_event(event):
+        message = launcher_core.describe_event(event)
+        if message:
+            stream = event["stream"] if event["type"] == "output" else log_model.LAUNCHER
+            model.append(f"[{time.strftime('%H:%M:%S')}] [{event['app']}] {message}", stream)
+
+    def render():
+        model.drain()
+        root.after(int(1000 / log_model.DEFAULT_FPS), render)
+
+    core.supervisor.add_listener(lambda event: ui.post(on_supervisor_event, event))
+    ui.start()
+    root.after(0, render)
+    return root, ui, model
+
+
+def tk_ui(core):
+    """Return the real launcher window around core, or None when Tk cannot open one"""
+    try:
+        import universal_launcher
+        return universal_launcher.UniversalWebAppLauncher(core=core)
+    except Exception:
+        return None
+
+
+def case_ui_flood(args):
+    bench = Bench([app_entry("flood", "flood", args.lines)])
+    core = bench.open_core()
+    gui = tk_ui(core) if args.ui != "sim" else None
+    if gui is None and args.ui == "tk":
+        raise RuntimeError("Tk cannot open a window here (no display?)")
+    if gui is not None:
+        root, ui, model = gui.root, gui.ui, gui.log_model
+    else:
+        root, ui, model = simulated_ui(core)
+    waiter = EventWaiter(core.supervisor)
+    lags = []
+    state = {"expected": None, "exited_at": None}
+
+    def beat():
+        now = time.monotonic()
+        if state["expected"] is not None:
+            lags.append(max(0.0, now - state["expected"]) * 1000)
+        if state["exited_at"] is None:
+            try:
+                waiter.wait("flood", ("exited",), timeout=0)
+                state["exited_at"] = now
+            except TimeoutError:
+                pass
+        elif model.total >= args.lines:
+            root.quit()
+            return
+        elif now - state["exited_at"] > 30:
+            root.quit()
+            return
+        state["expected"] = time.monotonic() + HEARTBEAT_MS / 1000
+        root.after(HEARTBEAT_MS, beat)
+
+    try:
+        core.supervisor.start("flood")
+        root.after(0, beat)
+        root.mainloop()
+    finally:
+        ui.stop()
+        bench.close()
+        if gui is not None:
+            gui.root.destroy()
+    return {
+        "ui_lag_p95_ms": metric(journal.percentile(lags, 0.95) or 0.0, "ms"),
+        "ui_lag_max_ms": metric(max(lags, default=0.0), "ms"),
+        "ui_lines_shown": metric(model.total, "lines", "higher"),
+        "ui_toolkit": "tk" if gui is not None else "simulated",
+    }
+
+
+def measure_stop(entry, repeat):
+    """Stop-to-port-free times over repeat start/stop cycles"""
+    bench = Bench([entry])
+    core = bench.open_core()
+    waiter = EventWaiter(core.supervisor)
+    samples = []
+    try:
+        for _ in range(repeat):
+            since = waiter.mark()
+            core.supervisor.start("app")
+            event = waiter.wait("app", ("ready", "not_ready", "exited"), since)
+            if event["type"] != "ready":
+                raise RuntimeError(f"stand-in did not become ready: {event}")
+            port = core.supervisor.get("app").port
+            began = time.monotonic()
+            core.supervisor.stop("app")
+            wait_port_free("127.0.0.1", port)
+            samples.append(time.monotonic() - began)
+            core.supervisor.stop("app", wait=True)
+    finally:
+        bench.close()
+    return samples
+
+
+def case_stop(args):
+    repeat = max(1, args.repeat // 3)
+    polite = measure_stop(app_entry("app", "fast"), repeat)
+    stubborn = measure_stop(app_entry("app", "stubborn", 3, stop_grace=STOP_GRACE), repeat)
+    return {
+        "stop_to_port_free_s": metric(statistics.median(polite), "s"),
+        "stop_to_port_free_stubborn_s": metric(statistics.median(stubborn), "s"),
+        # Time beyond the grace period a SIGTERM-ignoring tree is given
+        "stop_to_port_free_stubborn_overhead_s": metric(statistics.median(stubborn) - STOP_GRACE, "s"),
+    }
+
+
+def run_case(name, args):
+    """Run one case in this process and return its metrics (plus peak memory)"""
+    results = globals()[f"case_{name}"](args)
+    peak = peak_rss_mb()
+    if peak is not None:
+        results[f"peak_rss_{name}_mb"] = metric(peak, "MB")
+    return results
+
+
+def run_isolated(name, args):
+    """Run one case in a child process and return its metrics"""
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+        result_file = f.name
+    command = [sys.executable, os.path.abspath(__file__), "--case", name, "--result-file", result_file,
+               "--repeat", str(args.repeat), "--lines", str(args.lines), "--ui", args.ui]
+    try:
+        completed = subprocess.run(command, timeout=CASE_TIMEOUT)
+        if completed.returncode != 0:
+            raise RuntimeError(f"case {name} failed with exit code {completed.returncode}")
+        with open(result_file, "r") as f:
+            return json.load(f)
+    finally:
+        os.remove(result_file)
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """Return {metric: comparison} for the metrics present in both result sets"""
+    comparison = {}
+    for name, entry in current["metrics"].items():
+        base = baseline.get("metrics", {}).get(name)
+        if not isinstance(entry, dict) or not isinstance(base, dict):
+            continue
+        new, old = entry["value"], base["value"]
+        change = (new - old) / abs(old) if old else 0.0
+        worse = -change if entry.get("better") == "higher" else change
+        if abs(new - old) <= NOISE.get(entry["unit"], 0.0):
+            status = "same"
+        elif worse > threshold:
+            status = "regressed"
+        elif worse < -threshold:
+            status = "improved"
+        else:
+            status = "same"
+        comparison[name] = {"baseline": old, "current": new, "change": round(change, 4), "status": status}
+    return comparison
+
+
+def format_comparison(current, comparison):
+    width = max([len(name) for name in current["metrics"]] + [6])
+    lines = [f"{'Metric':<{width}}  {'Current':>14}  {'Baseline':>14}  {'Change':>8}"]
+    for name, entry in current["metrics"].items():
+        if not isinstance(entry, dict):
+            lines.append(f"{name:<{width}}  {entry:>14}")
+            continue
+        value = f"{entry['value']:.4g} {entry['unit']}"
+        row = comparison.get(name)
+        if row is None:
+            lines.append(f"{name:<{width}}  {value:>14}")
+            continue
+        flag = {"regressed": "  ❌", "improved": "  ✓"}.get(row["status"], "")
+        lines.append(f"{name:<{width}}  {value:>14}  {row['baseline']:>14.4g}  {row['change']:>+8.1%}{flag}")
+    return "\n".join(lines)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark the launcher against local stand-in servers.")
+    parser.add_argument("cases", nargs="*", metavar="CASE",
+                        help=f"cases to run: {', '.join(CASES)} (default: all)")
+    parser.add_argument("--repeat", type=int, default=10, help="start/stop cycles for the latency cases")
+    parser.add_argument("--lines", type=int, default=200000, help="lines the log flooder writes")
+    parser.add_argument("--ui", choices=["auto", "tk", "sim"], default="auto",
+                        help="UI for ui_flood: the real Tk window if available, or a simulated main loop")
+    parser.add_argument("--output", metavar="FILE", help="write the results as JSON")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline results to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="relative change counted as a regression (default 0.2)")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.cases if name not in CASES]
+    if unknown:
+        parser.error(f"unknown case: {', '.join(unknown)}")
+
+    if args.case:
+        results = run_case(args.case, args)
+        with open(args.result_file, "w") as f:
+            json.dump(results, f)
+        return 0
+
+    current = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "repeat": args.repeat,
+            "lines": args.lines,
+        },
+        "metrics": {},
+    }
+    for name in args.cases or CASES:
+        print(f"Running {name}...", file=sys.stderr)
+        current["metrics"].update(run_isolated(name, args))
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+    comparison = compare(current, baseline, args.threshold) if baseline else {}
+    if baseline:
+        current["comparison"] = comparison
+
+    print(format_comparison(current, comparison))
+    for path in filter(None, [args.output, args.baseline if args.save_baseline else None]):
+        with open(path, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"✓ Results written to {path}", file=sys.stderr)
+
+    regressions = [name for name, row in comparison.items() if row["status"] == "regressed"]
+    if regressions:
+        print(f"❌ Regressed: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Stand-in servers for the launcher benchmarks.
+Each mode mimics one kind of app the launcher has to handle and listens on
+$PORT like a real start script would:
+
+    fast              bind and serve HTTP at once
+    slow [DELAY]      sleep DELAY seconds (default 1.5) before binding
+    flood [LINES]     write LINES lines (default 200000) split over stdout and
+                      stderr as fast as possible, then exit
+    stubborn [N]      ignore SIGTERM, bind, and start N children (default 3)
+                      that inherit the listening socket and ignore it too
+"""
+
+import http.server
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+
+class QuietHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = b"ok\n"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve():
+    port = int(os.environ.get("PORT", "5000"))
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", port), QuietHandler)
+    server.serve_forever()
+
+
+def flood(lines):
+    stdout, stderr = sys.stdout, sys.stderr
+    for number in range(lines):
+        stream = stderr if number % 4 == 3 else stdout
+        stream.write(f"request {number} GET /api/items?page={number % 50} 200 {number % 97}ms\n")
+    stdout.flush()
+    stderr.flush()
+
+
+def stubborn(children):
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    port = int(os.environ.get("PORT", "5000"))
+    listener = socket.socket()
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind(("127.0.0.1", port))
+    listener.listen(16)
+    # Workers that outlive a polite stop and keep the port busy, like a
+    # pre-forking server whose master does not pass SIGTERM on
+    for _ in range(children):
+        subprocess.Popen([sys.executable, __file__, "child"], pass_fds=[listener.fileno()])
+    while True:
+        connection, _ = listener.accept()
+        connection.sendall(b"HTTP/1.1 200 OK\r\nContent-Length: 3\r\nConnection: close\r\n\r\nok\n")
+        connection.close()
+
+
+def child():
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    while True:
+        time.sleep(60)
+
+
+def main(argv):
+    mode = argv[0] if argv else "fast"
+    argument = argv[1] if len(argv) > 1 else None
+    if mode == "fast":
+        serve()
+    elif mode == "slow":
+        time.sleep(float(argument or 1.5))
+        serve()
+    elif mode == "flood":
+        flood(int(argument or 200000))
+    elif mode == "stubborn":
+        stubborn(int(argument or 3))
+    elif mode == "child":
+        child()
+    else:
+        print(f"Unknown mode: {mode}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
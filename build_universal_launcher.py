@@ -28,8 +28,8 @@ def clean_build_dirs():
             shutil.rmtree(dir_name)
             print(f"✓ Cleaned {dir_name} directory")
 
-def build_executable():
-    """Build the executable using PyInstaller"""
+def build_executable(onedir=False):
+    """Build the executable using PyInstaller (the auto-start launcher as a folder if onedir)"""
     print("Building Universal Web App Launcher executables...")
     
     # Build regular launcher
@@ -63,9 +63,10 @@ def build_executable():
     ]
     
     # Build auto-start launcher
+    # A one-folder bundle starts faster: nothing is unpacked to a temp dir on every launch
     cmd2 = [
         sys.executable, "-m", "PyInstaller",
-        "--onefile",                           # Create a single executable file
+        "--onedir" if onedir else "--onefile", # One folder, or a single executable file
         "--windowed",                          # Remove console window (for GUI)
         "--name=AutoStartLauncher",            # Name of the executable
         "--distpath=dist",                     # Output directory
@@ -118,7 +119,14 @@ def verify_files():
     
     return True
 
-def verify_executables():
+def auto_launcher_path(onedir=False):
+    """Return the path of the built auto-start launcher"""
+    name = "AutoStartLauncher.exe" if sys.platform == "win32" else "AutoStartLauncher"
+    if onedir:
+        return os.path.join("dist", "AutoStartLauncher", name)
+    return os.path.join("dist", name)
+
+def verify_executables(onedir=False):
     """Verify that executables were created successfully"""
     dist_dir = "dist"
     if not os.path.exists(dist_dir):
@@ -127,12 +135,13 @@ def verify_executables():
     
     executables = []
     if sys.platform == "win32":
-        executables = ["UniversalWebAppLauncher.exe", "AutoStartLauncher.exe"]
+        executables = [os.path.join(dist_dir, "UniversalWebAppLauncher.exe")]
     else:
-        executables = ["UniversalWebAppLauncher", "AutoStartLauncher"]
+        executables = [os.path.join(dist_dir, "UniversalWebAppLauncher")]
+    executables.append(auto_launcher_path(onedir))
     
-    for exe in executables:
-        exe_path = os.path.join(dist_dir, exe)
+    for exe_path in executables:
+        exe = os.path.basename(exe_path)
         if not os.path.exists(exe_path):
             print(f"❌ {exe} not created!")
             return False
@@ -149,6 +158,7 @@ def verify_executables():
 
 def main():
     """Main build process"""
+    onedir = "--onedir" in sys.argv[1:]
     print("🚀 Universal Web App Launcher Build Script")
     print("=" * 50)
     
@@ -168,21 +178,22 @@ def main():
     clean_build_dirs()
     
     # Build executable
-    if build_executable():
+    if build_executable(onedir):
         # Verify executables were created
-        if not verify_executables():
+        if not verify_executables(onedir):
             print("❌ Executable verification failed!")
             sys.exit(1)
         
         regular_exe = os.path.abspath("dist/UniversalWebAppLauncher")
-        auto_exe = os.path.abspath("dist/AutoStartLauncher")
+        auto_exe = os.path.abspath(auto_launcher_path(onedir))
         if sys.platform == "win32":
             regular_exe += ".exe"
-            auto_exe += ".exe"
             
         print(f"🎉 Build completed successfully!")
         print(f"Regular launcher: {regular_exe}")
         print(f"Auto-start launcher: {auto_exe}")
+        if onedir:
+            print("   (one-folder build: copy the whole dist/AutoStartLauncher folder)")
         
         # Display final instructions
         print("\n" + "=" * 50)
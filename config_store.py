@@ -0,0 +1,284 @@
+"""
+Per-user configuration store.
+Settings live in one JSON document in the user's config folder (%APPDATA%,
+~/Library/Application Support or $XDG_CONFIG_HOME) instead of the current
+directory. Each app profile (path, start command, env, port, restart policy,
+readiness settings) is kept in its own file under profiles/ and only parsed
+when it is first used, so a long list of profiles costs start-up nothing.
+Every file is written to a temp file and renamed over the old one, so a
+crash can never leave a truncated config behind, and saves are debounced:
+a burst of changes becomes a single write shortly after the last of them.
+"""
+
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+
+APP_DIR_NAME = "UniversalWebAppLauncher"
+CONFIG_NAME = "launcher_config.json"
+PROFILE_DIR = "profiles"
+FORMAT_VERSION = 2
+SAVE_DELAY = 0.5
+MAX_SAVE_WAIT = 2.0        # save even if changes never stop for this long
+RECENT_SIZE = 10
+
+_UNSAFE_NAME = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def user_config_dir():
+    """Return the per-user folder for the launcher's files"""
+    if os.name == "nt":
+        base = os.environ.get("APPDATA") or os.path.expanduser("~")
+        return os.path.join(base, APP_DIR_NAME)
+    if sys.platform == "darwin":
+        return os.path.join(os.path.expanduser("~/Library/Application Support"), APP_DIR_NAME)
+    base = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+    return os.path.join(base, "universal-web-app-launcher")
+
+
+def default_config_path():
+    return user_file(CONFIG_NAME)
+
+
+def user_file(name):
+    """Return the path of one of the launcher's files (or folders) in the per-user folder"""
+    return os.path.join(user_config_dir(), name)
+
+
+def atomic_write(path, text):
+    """Replace path with text: write a temp file in the same folder, then rename it over path"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def read_json(path):
+    """Return the parsed JSON file at path, or None if it does not exist"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+class ConfigStore:
+    """The launcher's settings, profiles and recently used paths, saved atomically"""
+
+    def __init__(self, path=None, events=None, legacy_path=None, save_delay=SAVE_DELAY):
+        self.path = path or default_config_path()
+        self.dir = os.path.dirname(os.path.abspath(self.path))
+        self.profile_dir = os.path.join(self.dir, PROFILE_DIR)
+        self.events = events
+        self.legacy_path = legacy_path
+        self.save_delay = save_delay
+        self._doc = None
+        self._profiles = {}
+        self._dirty = False
+        self._dirty_profiles = set()
+        self._removed_files = set()
+        self._timer = None
+        self._first_change = 0.0
+        self._lock = threading.RLock()
+
+    @property
+    def doc(self):
+        """The main document, read on first use"""
+        with self._lock:
+            if self._doc is None:
+                self._doc = self._read()
+            return self._doc
+
+    def _read(self):
+        try:
+            doc = read_json(self.path)
+            if doc is None and self.legacy_path and os.path.abspath(self.legacy_path) != os.path.abspath(self.path):
+                # First run with a per-user store: adopt the old config from the working directory
+                doc = read_json(self.legacy_path)
+                if doc is not None:
+                    self._dirty = True
+        except (OSError, ValueError) as e:
+            print(f"Error loading config: {e}")
+            doc = None
+        if not isinstance(doc, dict):
+            doc = {}
+        return self._upgrade(doc)
+
+    def _upgrade(self, doc):
+        """Convert a single-file config (inline "apps", one "app_path") to profiles and a recent list"""
+        doc.setdefault("profiles", {})
+        doc.setdefault("recent", [])
+        if "apps" in doc:
+            for entry in doc.pop("apps"):
+                name = entry.get("name") or os.path.basename(os.path.normpath(entry["path"]))
+                entry = dict(entry, name=name, path=os.path.abspath(entry["path"]))
+                self._profiles[name] = entry
+                doc["profiles"][name] = {"file": self._file_for(name, doc["profiles"]), "path": entry["path"]}
+                self._dirty_profiles.add(name)
+            self._dirty = True
+        if "app_path" in doc:
+            app_path = doc.pop("app_path")
+            if app_path:
+                doc["recent"] = [os.path.abspath(app_path)] + doc["recent"]
+            self._dirty = True
+        doc["version"] = FORMAT_VERSION
+        return doc
+
+    @staticmethod
+    def _file_for(name, index):
+        base = _UNSAFE_NAME.sub("_", name) or "app"
+        taken = {entry["file"] for entry in index.values()}
+        candidate, counter = base + ".json", 2
+        while candidate in taken:
+            candidate = f"{base}-{counter}.json"
+            counter += 1
+        return candidate
+
+    def get(self, key, default=None):
+        return self.doc.get(key, default)
+
+    def set(self, key, value):
+        """Set a top-level setting (None removes it); saved by the next save"""
+        with self._lock:
+            doc = self.doc
+            if value is None:
+                if key in doc:
+                    del doc[key]
+                    self._dirty = True
+            elif doc.get(key) != value:
+                doc[key] = value
+                self._dirty = True
+
+    def profile_names(self):
+        return list(self.doc["profiles"])
+
+    def profile_for_path(self, path):
+        """Return the name of the profile for an app folder, or None (without parsing profiles)"""
+        target = os.path.normcase(os.path.abspath(path))
+        for name, entry in self.doc["profiles"].items():
+            if os.path.normcase(entry.get("path", "")) == target:
+                return name
+        return None
+
+    def profile(self, name):
+        """Return a profile's settings, reading its file on first use (None if unknown)"""
+        with self._lock:
+            entry = self.doc["profiles"].get(name)
+            if entry is None:
+                return None
+            if name not in self._profiles:
+                try:
+                    data = read_json(os.path.join(self.profile_dir, entry["file"]))
+                except (OSError, ValueError) as e:
+                    print(f"Error loading profile {name}: {e}")
+                    data = None
+                if data is None:
+                    return None
+                self._profiles[name] = data
+            return dict(self._profiles[name])
+
+    def put_profile(self, name, data):
+        """Add or update a profile; unchanged profiles are not rewritten"""
+        with self._lock:
+            index = self.doc["profiles"]
+            if name in index and self._profiles.get(name) == data:
+                return
+            if name not in index:
+                index[name] = {"file": self._file_for(name, index), "path": data.get("path", "")}
+                self._dirty = True
+            elif index[name].get("path") != data.get("path", ""):
+                index[name]["path"] = data.get("path", "")
+                self._dirty = True
+            self._profiles[name] = dict(data)
+            self._dirty_profiles.add(name)
+
+    def remove_profile(self, name):
+        with self._lock:
+            entry = self.doc["profiles"].pop(name, None)
+            if entry is None:
+                return
+            self._profiles.pop(name, None)
+            self._dirty_profiles.discard(name)
+            self._removed_files.add(entry["file"])
+            self._dirty = True
+
+    def recent(self):
+        """Return the most recently used app folders, newest first"""
+        return list(self.doc["recent"])
+
+    def touch_recent(self, path):
+        """Move path to the front of the recently used list"""
+        with self._lock:
+            path = os.path.abspath(path)
+            recent = [path] + [item for item in self.doc["recent"] if item != path]
+            self.set("recent", recent[:RECENT_SIZE])
+
+    def save_soon(self):
+        """Save after SAVE_DELAY; further changes push the save back (never past MAX_SAVE_WAIT)"""
+        if self.events is None:
+            self.save()
+            return
+        with self._lock:
+            now = time.monotonic()
+            if self._timer is None:
+                self._first_change = now
+            else:
+                self._timer.cancel()
+            delay = min(self.save_delay, max(0.0, self._first_change + MAX_SAVE_WAIT - now))
+            self._timer = self.events.call_later(delay, self._save_later)
+
+    def _save_later(self):
+        with self._lock:
+            self._timer = None
+        self.events.spawn(self._save_async())
+
+    async def _save_async(self):
+        await self.events.run_blocking(self.save)
+
+    def save(self):
+        """Write whatever changed (blocks on the disk)"""
+        with self._lock:
+            if self._doc is None:
+                return
+            try:
+                in_use = {entry["file"] for entry in self._doc["profiles"].values()}
+                for file_name in self._removed_files - in_use:
+                    try:
+                        os.remove(os.path.join(self.profile_dir, file_name))
+                    except FileNotFoundError:
+                        pass
+                self._removed_files.clear()
+                for name in sorted(self._dirty_profiles):
+                    entry = self._doc["profiles"].get(name)
+                    if entry is not None:
+                        atomic_write(os.path.join(self.profile_dir, entry["file"]),
+                                     json.dumps(self._profiles[name], indent=2))
+                self._dirty_profiles.clear()
+                if self._dirty:
+                    atomic_write(self.path, json.dumps(self._doc, indent=2))
+                    self._dirty = False
+            except OSError as e:
+                print(f"Error saving config: {e}")
+
+    def close(self):
+        """Write out pending changes now"""
+        with self._lock:
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+        self.save()
@@ -0,0 +1,376 @@
+"""
+Local control API for scripting the launcher.
+A small asyncio HTTP server on 127.0.0.1 (or a Unix domain socket) exposes
+start, stop, restart, status and log tails for every app as JSON, plus a
+long-poll wait for a status and a streaming feed of supervisor events:
+
+    GET  /apps                          status of every app
+    GET  /apps/<name>                   status of one app
+    POST /apps/<name>/start|stop|restart
+    GET  /apps/<name>/logs?lines=100    last lines of the app's output
+    GET  /apps/<name>/wait?status=ready&timeout=30
+    POST /apps/<name>/load-probe?requests=1000&concurrency=10&path=/   run a load probe
+    GET  /groups                        configured groups and their apps
+    POST /groups/<name>/start|stop      start in dependency order / stop in reverse
+    GET  /events?app=<name>&types=ready,exited&output=1   newline-delimited JSON
+"""
+
+import asyncio
+import hmac
+import json
+import os
+import stat
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from load_probe import ProbeError
+from supervisor import READY, LaunchError
+
+DEFAULT_HOST = "127.0.0.1"
+MAX_REQUEST_BYTES = 65536
+SUBSCRIBER_QUEUE = 1000
+DEFAULT_WAIT_TIMEOUT = 30.0
+CLOSE_TIMEOUT = 1.0
+LOCAL_HOST_NAMES = ("127.0.0.1", "localhost")
+STATUS_REASONS = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 403: "Forbidden", 404: "Not Found",
+                  405: "Method Not Allowed", 408: "Request Timeout", 409: "Conflict",
+                  500: "Internal Server Error"}
+
+
+class ApiError(Exception):
+    """An error answered with an HTTP status and a JSON message"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _remove_socket(path):
+    """Remove a stale socket file at path; raises FileExistsError if something else is there"""
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"{path} exists and is not a socket")
+    os.remove(path)
+
+
+def _number(values, key, default, kind):
+    """Return values[key] converted with kind, or default; raises ApiError(400) if it is not a number"""
+    value = values.get(key)
+    if not value:
+        return default
+    try:
+        return kind(value)
+    except ValueError:
+        raise ApiError(400, f"'{key}' must be a number, not '{value}'")
+
+
+class ControlServer:
+    """Serve the control API on the supervisor's event loop"""
+
+    def __init__(self, supervisor, port=None, host=DEFAULT_HOST, socket_path=None, token=None, groups=None,
+                 probes=None):
+        self.supervisor = supervisor
+        self.groups = groups
+        self.probes = probes
+        self.host = host
+        self.port = port
+        self.socket_path = socket_path
+        self.token = token
+        self.address = None
+        self.loop = None
+        self._hosts = ()
+        self._server = None
+        self._subscribers = set()
+        self._output_subscribers = 0
+        self._changed = None
+
+    @property
+    def enabled(self):
+        return self.port is not None or bool(self.socket_path)
+
+    def start(self):
+        """Start serving; returns the address or None"""
+        if self._server or not self.enabled:
+            return self.address
+        events = self.supervisor.events
+        self.loop = events.start()
+        events.submit(self._serve()).result()
+        if self.address:
+            self.supervisor.add_listener(self.on_event)
+        return self.address
+
+    def stop(self):
+        if self._server:
+            self.supervisor.events.submit(self._close()).result()
+
+    async def _serve(self):
+        self._changed = asyncio.Event()
+        try:
+            if self.socket_path:
+                _remove_socket(self.socket_path)
+                # Only this user may connect; the umask covers the window before a chmod could
+                umask = os.umask(0o077)
+                try:
+                    self._server = await asyncio.start_unix_server(self._handle, path=self.socket_path)
+                finally:
+                    os.umask(umask)
+                self.address = self.socket_path
+            else:
+                self._server = await asyncio.start_server(self._handle, self.host, self.port)
+                port = self._server.sockets[0].getsockname()[1]
+                self.address = f"http://{self.host}:{port}"
+                self._hosts = tuple(f"{name}:{port}" for name in LOCAL_HOST_NAMES)
+        except OSError as e:
+            print(f"Error starting control API: {e}")
+
+    async def _close(self):
+        server, self._server = self._server, None
+        server.close()
+        # Event streams never end on their own
+        for subscriber in list(self._subscribers):
+            subscriber.close()
+        try:
+            # Long-poll waiters still hold connections; do not wait out their timeouts
+            await asyncio.wait_for(server.wait_closed(), CLOSE_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+        if self.socket_path:
+            try:
+                _remove_socket(self.socket_path)
+            except OSError as e:
+                print(f"Error removing control socket: {e}")
+
+    # -- events ------------------------------------------------------------
+
+    def on_event(self, event):
+        # Usually called on the loop already; output is only forwarded when a stream asked for it
+        if event["type"] == "output" and not self._output_subscribers:
+            return
+        if self.supervisor.events.in_loop():
+            self._dispatch(event)
+        else:
+            self.loop.call_soon_threadsafe(self._dispatch, event)
+
+    def _dispatch(self, event):
+        if event["type"] != "output":
+            # Wake every long-poll waiter; they re-check their condition
+            self._changed.set()
+            self._changed = asyncio.Event()
+        for subscriber in list(self._subscribers):
+            subscriber.offer(event)
+
+    # -- HTTP --------------------------------------------------------------
+
+    async def _handle(self, reader, writer):
+        try:
+            method, target, headers = await self._read_request(reader)
+            self._check_origin(headers)
+            if self.token and not hmac.compare_digest(headers.get("authorization", "").encode("utf-8"),
+                                                      f"Bearer {self.token}".encode("utf-8")):
+                raise ApiError(401, "Missing or wrong token")
+            url = urlsplit(target)
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            parts = [unquote(part) for part in url.path.strip("/").split("/") if part]
+
+            if parts == ["events"] and method == "GET":
+                await self._stream_events(writer, query)
+                return
+            status, body = await self._route(method, parts, query)
+        except ApiError as e:
+            status, body = e.status, {"error": str(e)}
+        except (ConnectionError, asyncio.IncompleteReadError):
+            writer.close()
+            return
+        except Exception as e:
+            # Bad requests raise ApiError(400); anything else is the launcher's fault
+            print(f"Error in control API: {e}")
+            status, body = 500, {"error": f"Internal error: {e}"}
+
+        data = json.dumps(body).encode("utf-8")
+        writer.write(self._head(status, "application/json", len(data)) + data)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+    async def _read_request(self, reader):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.LimitOverrunError:
+            raise ApiError(400, "Request too large")
+        if len(head) > MAX_REQUEST_BYTES:
+            raise ApiError(400, "Request too large")
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            raise ApiError(400, "Malformed request line")
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            if name:
+                headers[name.strip().lower()] = value.strip()
+        length = _number(headers, "content-length", 0, int)
+        if length:
+            await reader.readexactly(min(length, MAX_REQUEST_BYTES))
+        return method.upper(), target, headers
+
+    def _check_origin(self, headers):
+        """Refuse requests a web page could have sent: browsers add Origin, DNS rebinding shows in Host"""
+        if "origin" in headers:
+            raise ApiError(403, "Cross-origin requests are not allowed")
+        if self._hosts and headers.get("host", "").lower() not in self._hosts:
+            raise ApiError(403, "Unexpected Host header")
+
+    @staticmethod
+    def _head(status, content_type, length=None):
+        lines = [f"HTTP/1.1 {status} {STATUS_REASONS.get(status, 'OK')}",
+                 f"Content-Type: {content_type}", "Connection: close", "Cache-Control: no-store"]
+        if length is not None:
+            lines.append(f"Content-Length: {length}")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+    def _app(self, name):
+        app = self.supervisor.get(name)
+        if app is None:
+            raise ApiError(404, f"No app named '{name}'")
+        return app
+
+    async def _route(self, method, parts, query):
+        if parts == ["apps"]:
+            if method != "GET":
+                raise ApiError(405, "Use GET")
+            return 200, self.supervisor.snapshot()
+        if parts and parts[0] == "groups" and self.groups is not None:
+            return await self._route_group(method, parts)
+        if len(parts) < 2 or parts[0] != "apps":
+            raise ApiError(404, "Unknown endpoint")
+
+        app = self._app(parts[1])
+        action = parts[2] if len(parts) > 2 else None
+        if action is None:
+            return 200, app.snapshot()
+        if action in ("start", "stop", "restart"):
+            if method != "POST":
+                raise ApiError(405, "Use POST")
+            # Starting resolves commands and spawns; keep it off the event loop
+            await self.supervisor.events.run_blocking(self._control, action, app.name)
+            return 200, app.snapshot()
+        if action == "logs":
+            return 200, {"name": app.name, "lines": app.tail(_number(query, "lines", 100, int))}
+        if action == "wait":
+            return await self._wait(app, query.get("status", READY),
+                                    _number(query, "timeout", DEFAULT_WAIT_TIMEOUT, float))
+        if action == "load-probe" and self.probes is not None:
+            if method != "POST":
+                raise ApiError(405, "Use POST")
+            try:
+                return 200, await self.probes.probe(
+                    app.name, requests=_number(query, "requests", 0, int) or None,
+                    concurrency=_number(query, "concurrency", 0, int) or None, path=query.get("path"))
+            except ProbeError as e:
+                raise ApiError(409, str(e))
+        raise ApiError(404, "Unknown endpoint")
+
+    async def _route_group(self, method, parts):
+        if len(parts) == 1:
+            if method != "GET":
+                raise ApiError(405, "Use GET")
+            return 200, self.groups.groups
+        if len(parts) != 3 or parts[2] not in ("start", "stop"):
+            raise ApiError(404, "Unknown endpoint")
+        if parts[1] not in self.groups.groups:
+            raise ApiError(404, f"No group named '{parts[1]}'")
+        if method != "POST":
+            raise ApiError(405, "Use POST")
+        try:
+            if parts[2] == "start":
+                run = await self.supervisor.events.run_blocking(self.groups.start_group, parts[1])
+                return 200, run.summary()
+            await self.supervisor.events.run_blocking(self.groups.stop_group, parts[1])
+            return 200, {"group": parts[1], "apps": self.groups.members(parts[1])}
+        except LaunchError as e:
+            raise ApiError(409, str(e))
+
+    def _control(self, action, name):
+        try:
+            if action == "start":
+                self.supervisor.start(name)
+            elif action == "stop":
+                self.supervisor.stop(name)
+            else:
+                self.supervisor.restart(name)
+        except (LaunchError, OSError) as e:
+            raise ApiError(409, str(e))
+
+    async def _wait(self, app, wanted, timeout):
+        """Long-poll until app reaches one of the wanted statuses"""
+        wanted = set(wanted.split(","))
+        deadline = self.loop.time() + timeout
+        while app.status not in wanted:
+            remaining = deadline - self.loop.time()
+            if remaining <= 0:
+                raise ApiError(408, f"'{app.name}' is {app.status}, not {'/'.join(sorted(wanted))}")
+            try:
+                await asyncio.wait_for(self._changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+        return 200, app.snapshot()
+
+    async def _stream_events(self, writer, query):
+        subscriber = _Subscriber(
+            app=query.get("app"),
+            types=set(query["types"].split(",")) if query.get("types") else None,
+            output=query.get("output") in ("1", "true", "yes"),
+        )
+        if subscriber.app is not None:
+            self._app(subscriber.app)
+        writer.write(self._head(200, "application/x-ndjson"))
+        self._subscribers.add(subscriber)
+        if subscriber.output:
+            self._output_subscribers += 1
+        try:
+            while True:
+                event = await subscriber.queue.get()
+                if event is None:
+                    break
+                writer.write(json.dumps(event).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._subscribers.discard(subscriber)
+            if subscriber.output:
+                self._output_subscribers -= 1
+            writer.close()
+
+
+class _Subscriber:
+    """One /events stream and its bounded queue (the oldest events are dropped)"""
+
+    def __init__(self, app=None, types=None, output=False):
+        self.app = app
+        self.types = types
+        self.output = output
+        self.queue = asyncio.Queue(SUBSCRIBER_QUEUE)
+
+    def offer(self, event):
+        if self.app is not None and event["app"] != self.app:
+            return
+        if event["type"] == "output" and not self.output:
+            return
+        if self.types is not None and event["type"] not in self.types:
+            return
+        self._put(event)
+
+    def _put(self, event):
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    def close(self):
+        """End the stream once the queued events are written"""
+        self._put(None)
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Environment preparation cache.
+An app can name a prepare step ("prepare": "pip install -r requirements.txt")
+that installs its dependencies before the server starts. The app's dependency
+manifests and lockfiles are fingerprinted by content; the step only runs when
+the fingerprint differs from the last successful run, so an unchanged app
+goes straight to its run command. Files are only re-hashed when their size or
+modification time changed. The time each skipped step would have taken is
+recorded per app.
+"""
+
+import fnmatch
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+
+from config_store import atomic_write, user_file
+
+CACHE_FILE = "env_cache.json"
+# Manifests and lockfiles in the app folder (not searched recursively)
+DEFAULT_MANIFESTS = (
+    "requirements*.txt", "constraints*.txt", "pyproject.toml", "setup.py", "setup.cfg", "Pipfile",
+    "Pipfile.lock", "poetry.lock", "uv.lock", "package.json", "package-lock.json", "npm-shrinkwrap.json",
+    "yarn.lock", "pnpm-lock.yaml", "Gemfile", "Gemfile.lock", "composer.json", "composer.lock", "go.mod",
+    "go.sum", "Cargo.toml", "Cargo.lock",
+)
+HASH_CHUNK = 1 << 20
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Fingerprint:
+    """Content hash of an app's prepare command and dependency files"""
+
+    def __init__(self, value, files):
+        self.value = value
+        self.files = files  # {relative path: [size, mtime_ns, sha256]}
+
+    def changes(self, previous_files):
+        """Return the files added, removed or changed since previous_files"""
+        changed = [name for name, entry in self.files.items()
+                   if previous_files.get(name, [None, None, None])[2] != entry[2]]
+        removed = [name for name in previous_files if name not in self.files]
+        return sorted(changed + removed)
+
+
+class EnvCache:
+    """Fingerprints of the last successful prepare step of each app, kept on disk"""
+
+    def __init__(self, path=None):
+        self.path = path or user_file(CACHE_FILE)
+        self._entries = None
+        self._lock = threading.Lock()
+
+    @property
+    def entries(self):
+        with self._lock:
+            if self._entries is None:
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        self._entries = json.load(f).get("apps", {})
+                except FileNotFoundError:
+                    self._entries = {}
+                except (OSError, ValueError, AttributeError) as e:
+                    print(f"Error loading environment cache: {e}")
+                    self._entries = {}
+            return self._entries
+
+    def fingerprint(self, name, definition):
+        """Fingerprint an app's dependency files (re-hashing only files whose size or mtime changed)"""
+        known = self.entries.get(name, {}).get("files", {})
+        patterns = definition.prepare_files or DEFAULT_MANIFESTS
+        files = {}
+        try:
+            listing = sorted(os.listdir(definition.path))
+        except OSError:
+            listing = []
+        for file_name in listing:
+            if not any(fnmatch.fnmatch(file_name, pattern) for pattern in patterns):
+                continue
+            path = os.path.join(definition.path, file_name)
+            try:
+                stat = os.stat(path)
+                if not os.path.isfile(path):
+                    continue
+                entry = known.get(file_name)
+                if entry and entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns:
+                    files[file_name] = entry
+                else:
+                    files[file_name] = [stat.st_size, stat.st_mtime_ns, file_hash(path)]
+            except OSError:
+                continue
+
+        digest = hashlib.sha256(definition.prepare.encode("utf-8"))
+        for file_name, entry in sorted(files.items()):
+            digest.update(f"\0{file_name}\0{entry[2]}".encode("utf-8"))
+        return Fingerprint(digest.hexdigest(), files)
+
+    def check(self, name, fingerprint):
+        """Return (is current, changed files) for a fingerprint"""
+        entry = self.entries.get(name)
+        if entry is None:
+            return False, []
+        if entry.get("fingerprint") == fingerprint.value:
+            return True, []
+        return False, fingerprint.changes(entry.get("files", {}))
+
+    def record(self, name, fingerprint, duration):
+        """Remember a successful prepare step"""
+        entries = self.entries
+        with self._lock:
+            entry = entries.setdefault(name, {})
+            entry.update(fingerprint=fingerprint.value, files=fingerprint.files,
+                         duration=round(duration, 3), prepared_at=round(time.time(), 3))
+        self.save()
+
+    def skipped(self, name, fingerprint):
+        """Count a skipped prepare step; returns (seconds saved now, seconds saved in total)"""
+        entries = self.entries
+        with self._lock:
+            entry = entries[name]
+            saved = entry.get("duration", 0.0)
+            entry["files"] = fingerprint.files
+            entry["skips"] = entry.get("skips", 0) + 1
+            entry["saved_total"] = round(entry.get("saved_total", 0.0) + saved, 3)
+            total = entry["saved_total"]
+        self.save()
+        return saved, total
+
+    def clear(self, name=None):
+        """Forget one app's fingerprint (or every app's), forcing its prepare step to run"""
+        entries = self.entries
+        with self._lock:
+            if name is None:
+                entries.clear()
+            else:
+                entries.pop(name, None)
+        self.save()
+
+    def save(self):
+        with self._lock:
+            text = json.dumps({"apps": self._entries or {}}, indent=2)
+            try:
+                atomic_write(self.path, text)
+            except OSError as e:
+                print(f"Error saving environment cache: {e}")
+
+
+def format_cache(entries):
+    """Return the cache as a text table"""
+    width = max([len(name) for name in entries] + [3])
+    lines = [f"{'App':<{width}}  {'Prepared':<16}  {'Took':>8}  {'Skips':>5}  {'Saved':>9}"]
+    for name in sorted(entries):
+        entry = entries[name]
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry.get("prepared_at", 0)))
+        lines.append(f"{name:<{width}}  {when:<16}  {entry.get('duration', 0):>7.1f}s  "
+                     f"{entry.get('skips', 0):>5}  {entry.get('saved_total', 0):>8.1f}s")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    # Only the command line needs it; keep it off the launcher's start-up path
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Show the environment cache, or force a prepare step.")
+    parser.add_argument("cache", nargs="?", default=user_file(CACHE_FILE),
+                        help="cache file (default: the one in the per-user config folder)")
+    parser.add_argument("--clear", metavar="APP", help="forget APP's fingerprint ('all' for every app)")
+    args = parser.parse_args(argv)
+
+    cache = EnvCache(args.cache)
+    if args.clear:
+        cache.clear(None if args.clear == "all" else args.clear)
+        print(f"✓ The next start of {args.clear} runs its prepare step")
+        return 0
+    if not cache.entries:
+        print(f"No prepared apps in {args.cache}", file=sys.stderr)
+        return 1
+    print(format_cache(cache.entries))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
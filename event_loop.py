@@ -0,0 +1,181 @@
+"""
+The launcher's event loop.
+Process output, exit detection, readiness and liveness probes, restart
+backoff, shutdown escalation, folder watching and the control API all run
+as callbacks and coroutines on one asyncio loop in a background thread, so
+the number of threads stays the same however many apps run and however
+many events they produce. The few blocking calls left (ps/lsof scans,
+taskkill, folder scans) go to a small fixed pool of worker threads.
+Tk code never touches the loop directly: events are handed over through a
+UiQueue that the Tk main loop drains with root.after.
+"""
+
+import asyncio
+import concurrent.futures
+import queue
+import threading
+
+BLOCKING_WORKERS = 4
+UI_DRAIN_MS = 50
+UI_BATCH = 2000
+
+
+class EventLoop:
+    """An asyncio loop running in a daemon thread, started on first use"""
+
+    def __init__(self, workers=BLOCKING_WORKERS):
+        self.loop = None
+        self.executor = concurrent.futures.ThreadPoolExecutor(workers, thread_name_prefix="launcher-blocking")
+        self._thread = None
+        self._running = set()
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                ready = threading.Event()
+                self._thread = threading.Thread(target=self._run, args=(ready,), name="event-loop", daemon=True)
+                self._thread.start()
+                ready.wait()
+        return self.loop
+
+    def _run(self, ready):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.set_default_executor(self.executor)
+        ready.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            # Cancel what is still waiting (readiness probes, sleeps) so it can unwind
+            pending = asyncio.all_tasks(self.loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                self.loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self.loop.close()
+
+    def stop(self):
+        """Stop the loop; pending callbacks are dropped"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            if thread is not threading.current_thread():
+                thread.join()
+        self.executor.shutdown(wait=False)
+
+    def in_loop(self):
+        """Return True when called from the loop thread"""
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def call_soon(self, callback, *args):
+        """Run callback(*args) on the loop (callable from any thread)"""
+        self.start().call_soon_threadsafe(callback, *args)
+
+    def call_later(self, delay, callback, *args):
+        """Run callback(*args) on the loop after delay seconds; returns a cancellable handle"""
+        handle = LaterHandle(self)
+
+        def schedule():
+            if not handle.cancelled:
+                handle.timer = self.loop.call_later(delay, handle.fire, callback, args)
+
+        if self.in_loop():
+            schedule()
+        else:
+            self.call_soon(schedule)
+        return handle
+
+    def submit(self, coroutine):
+        """Run a coroutine on the loop; returns a concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.start())
+
+    def spawn(self, coroutine):
+        """Run a coroutine on the loop without waiting for it (callable from any thread)"""
+        future = self.submit(coroutine)
+        # Hold on to it until it finishes: the loop only keeps weak references to tasks
+        self._running.add(future)
+        future.add_done_callback(self._finished)
+
+    def _finished(self, future):
+        self._running.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            print(f"Error in event loop task: {future.exception()}")
+
+    def run_blocking(self, func, *args):
+        """Await func(*args) on the worker pool (from a coroutine on the loop)"""
+        return self.loop.run_in_executor(self.executor, func, *args)
+
+    def add_reader(self, fd, callback, *args):
+        """Call callback(*args) on the loop whenever fd is readable (POSIX)"""
+        self.call_soon(self.loop.add_reader, fd, callback, *args)
+
+    def remove_reader(self, fd):
+        if self.in_loop():
+            self.loop.remove_reader(fd)
+        else:
+            self.call_soon(self.loop.remove_reader, fd)
+
+
+class LaterHandle:
+    """A call_later handle that can be cancelled from any thread"""
+
+    def __init__(self, events):
+        self.events = events
+        self.timer = None
+        self.cancelled = False
+
+    def fire(self, callback, args):
+        if not self.cancelled:
+            callback(*args)
+
+    def cancel(self):
+        self.cancelled = True
+        timer = self.timer
+        if timer is not None:
+            if self.events.in_loop():
+                timer.cancel()
+            else:
+                self.events.call_soon(timer.cancel)
+
+
+class UiQueue:
+    """Hand work from other threads to the Tk main loop, which drains it with root.after"""
+
+    def __init__(self, root, interval_ms=UI_DRAIN_MS):
+        self.root = root
+        self.interval_ms = interval_ms
+        self._queue = queue.SimpleQueue()
+        self._after_id = None
+
+    def post(self, callback, *args):
+        """Queue callback(*args) to run on the Tk thread (callable from any thread)"""
+        self._queue.put((callback, args))
+
+    def start(self):
+        if self._after_id is None:
+            self._after_id = self.root.after(0, self._tick)
+
+    def stop(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _tick(self):
+        try:
+            self.drain()
+        finally:
+            self._after_id = self.root.after(self.interval_ms, self._tick)
+
+    def drain(self, limit=UI_BATCH):
+        """Run queued callbacks (at most limit, so a flood cannot freeze the window)"""
+        for _ in range(limit):
+            try:
+                callback, args = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"Error in UI callback: {e}")
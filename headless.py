@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Headless mode for the Universal Web App Launcher.
+Uses the same configuration, start-script discovery and process supervision
+as the GUI without importing Tk. Logs stream to stdout (and optionally a
+file) and the launcher exits with the child's status.
+"""
+
+import argparse
+import signal
+import sys
+import threading
+import time
+
+import launcher_core
+import metrics
+import supervisor
+
+FLUSH_INTERVAL = 0.2
+STOP_GRACE = 10.0
+
+
+def build_parser():
+    """Return the argument parser for headless mode"""
+    parser = argparse.ArgumentParser(
+        description="Launch web apps without a GUI and stream their logs."
+    )
+    parser.add_argument("--headless", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--auto-start", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--app", action="append", default=[], metavar="PATH",
+                        help="app folder to launch (repeatable); defaults to the saved app path")
+    parser.add_argument("--name", action="append", default=[],
+                        help="configured app to launch by name (repeatable)")
+    parser.add_argument("--group", action="append", default=[],
+                        help="configured app group to launch in dependency order (repeatable)")
+    parser.add_argument("--all", action="store_true", help="launch every configured app")
+    parser.add_argument("--config", help="configuration file (default: the per-user config)")
+    parser.add_argument("--log-file", help="also append logs to this file")
+    parser.add_argument("--open-browser", action="store_true", help="open the browser once an app is ready")
+    parser.add_argument("--metrics-file", metavar="PATH",
+                        help="keep resource metrics in this file (Prometheus text for .prom, else JSON)")
+    parser.add_argument("--control-port", type=int, metavar="PORT",
+                        help="serve the control API on 127.0.0.1:PORT (0 picks a free port)")
+    parser.add_argument("--control-socket", metavar="PATH", help="serve the control API on a Unix socket")
+    parser.add_argument("--watch", action="store_true", help="restart the apps when files in their folder change")
+    return parser
+
+
+def exit_status(returncode):
+    """Map a child return code to a shell exit status"""
+    if returncode is None:
+        return 1
+    if returncode < 0:
+        return 128 - returncode
+    return returncode
+
+
+class HeadlessRunner:
+    """Run apps through the supervisor and print their events"""
+
+    def __init__(self, core, log_file=None, open_browser=False, metrics_file=None):
+        self.core = core
+        self.supervisor = core.supervisor
+        self.open_browser = open_browser
+        self.metrics_file = metrics_file
+        self._next_export = 0.0
+        self.log_file = open(log_file, "a", encoding="utf-8") if log_file else None
+        self.return_codes = {}
+        self.changed = threading.Event()
+        self.stop_requested = False
+        self._write_lock = threading.Lock()
+        self._live_pids = set()
+        self.supervisor.add_listener(self.on_event)
+
+    def write(self, line):
+        with self._write_lock:
+            sys.stdout.write(line + "\n")
+            if self.log_file:
+                self.log_file.write(line + "\n")
+
+    def flush(self):
+        with self._write_lock:
+            sys.stdout.flush()
+            if self.log_file:
+                self.log_file.flush()
+
+    def on_event(self, event):
+        line = launcher_core.format_event(event)
+        if line:
+            self.write(line)
+
+        kind = event["type"]
+        if kind == "started":
+            app = self.supervisor.get(event["app"])
+            # Kept-running apps are left up on exit, so there is no exit status to wait for
+            if not (app and app.definition.keep_running):
+                self._live_pids.add(event["pid"])
+        elif kind == "exited":
+            self.return_codes[event["app"]] = event["returncode"]
+            self._live_pids.discard(event["pid"])
+            self.changed.set()
+        elif kind in ("stopped", "crash_loop", "restart_scheduled"):
+            self.changed.set()
+        elif kind == "ready" and self.open_browser and event.get("initial"):
+            self.core.open_browser(event["app"], event["url"])
+
+    def export_metrics(self, force=False):
+        """Rewrite the metrics file once per sampling interval"""
+        if not self.metrics_file:
+            return
+        now = time.monotonic()
+        if not force and now < self._next_export:
+            return
+        self._next_export = now + max(self.core.metrics.interval, metrics.DEFAULT_INTERVAL)
+        try:
+            self.core.metrics.export(self.metrics_file)
+        except OSError as e:
+            self.write(f"⚠️ Could not write metrics file: {e}")
+
+    def request_stop(self, signum=None, frame=None):
+        self.stop_requested = True
+        self.changed.set()
+
+    def active(self):
+        """Return True while any app is running or waiting to restart"""
+        if self.core.groups.busy() and not self.stop_requested:
+            return True
+        return any((app.is_running or app.start_after_stop
+                    or app.status in (supervisor.BACKOFF, supervisor.PREPARING, supervisor.STARTING))
+                   and not (self.stop_requested and app.definition.keep_running)
+                   for app in list(self.supervisor.apps.values()))
+
+    def run(self, names, label="apps"):
+        """Start the named apps (and their dependencies) in dependency order and
+        block until they have all ended"""
+        try:
+            group_run = self.core.groups.start(names, label=label)
+        except supervisor.LaunchError as e:
+            self.write(f"❌ {e}")
+            self.flush()
+            return 2
+        # Dependencies pulled in by the graph count as started apps too
+        started = [name for name in group_run.graph if name not in group_run.errors]
+        if not started:
+            self.flush()
+            return 1
+
+        stop_deadline = None
+        while True:
+            self.changed.wait(FLUSH_INTERVAL)
+            self.changed.clear()
+            self.flush()
+            self.export_metrics()
+
+            if self.stop_requested and stop_deadline is None:
+                self.write("Stopping...")
+                self.core.groups.stop_all(wait=True, keep_running=True)
+                stop_deadline = time.monotonic() + STOP_GRACE
+
+            if not self.active():
+                # Give stopped children a moment to report their exit status
+                if not self._live_pids or stop_deadline is None or time.monotonic() > stop_deadline:
+                    break
+
+        self.flush()
+        self.export_metrics(force=True)
+        self.core.close()
+        if self.log_file:
+            self.log_file.close()
+
+        # Apps left running on purpose count as success; apps never started (blocked) as failure
+        codes = [0 if self.supervisor.get(name).is_running else self.return_codes.get(name)
+                 for name in started]
+        if len(codes) == 1:
+            return exit_status(codes[0])
+        return next((exit_status(code) for code in codes if code != 0), 0)
+
+
+def main(argv=None):
+    """Entry point for headless mode; returns the process exit status"""
+    args = build_parser().parse_args(argv)
+
+    core = launcher_core.LauncherCore(args.config)
+    core.load_config()
+    if args.control_port is not None:
+        core.control.port = args.control_port
+    if args.control_socket:
+        core.control.socket_path = args.control_socket
+
+    names = []
+    for name in args.name:
+        if core.supervisor.get(name) is None:
+            print(f"❌ No configured app named '{name}'", file=sys.stderr)
+            return 2
+        names.append(name)
+    for group in args.group:
+        if group not in core.groups.groups:
+            print(f"❌ No configured group named '{group}'", file=sys.stderr)
+            return 2
+        names.extend(name for name in core.groups.members(group) if name not in names)
+    if args.all:
+        names.extend(name for name in core.supervisor.apps if name not in names)
+
+    paths = args.app or ([] if names else [core.app_path])
+    for path in paths:
+        error = core.check_app_folder(path)
+        if error:
+            print(f"❌ {error}", file=sys.stderr)
+            return 2
+        app = core.app_for_path(path, create=True)
+        if app.name not in names:
+            names.append(app.name)
+
+    if args.watch:
+        for name in names:
+            core.supervisor.get(name).definition.watch = True
+
+    runner = HeadlessRunner(core, log_file=args.log_file, open_browser=args.open_browser,
+                            metrics_file=args.metrics_file)
+    address = core.start()
+    if address:
+        runner.write(f"Control API listening on {address}")
+    signal.signal(signal.SIGINT, runner.request_stop)
+    signal.signal(signal.SIGTERM, runner.request_stop)
+    label = args.group[0] if len(args.group) == 1 and not (args.name or args.app or args.all) else "apps"
+    return runner.run(names, label)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Lifecycle journal for launch-latency analysis.
+Every step of an app's life (config load, dependency preparation,
+start-script discovery, spawn, first output line, port bound, ready, browser
+opened, stop requested and exit) is appended to a JSONL file with a
+monotonic timestamp and the time since the step it follows. Records are
+buffered and written in batches on the worker pool, so the event loop never
+waits on the disk.
+
+Run this file to summarise time-to-ready per app across launcher runs:
+    python journal.py [launcher_journal.jsonl] [--app NAME]
+"""
+
+import json
+import math
+import os
+import sys
+import threading
+import time
+
+from config_store import user_file
+
+JOURNAL_FILE = "launcher_journal.jsonl"
+FLUSH_INTERVAL = 1.0
+MAX_BYTES = 5 * 1024 * 1024
+
+
+def percentile(values, fraction):
+    """Return the nearest-rank percentile of values (None for no values)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(len(ordered) * fraction)) - 1]
+
+
+class AppRun:
+    """Monotonic timestamps of one app run, for the durations between steps"""
+
+    def __init__(self, spawned, pid, reattached=False):
+        self.spawned = spawned
+        self.pid = pid
+        self.reattached = reattached
+        self.first_output = None
+        self.port_open = None
+        self.ready = None
+        self.stop_requested = None
+
+
+class LifecycleJournal:
+    """Supervisor listener that appends lifecycle steps to a JSONL journal"""
+
+    def __init__(self, supervisor, path=None):
+        self.supervisor = supervisor
+        self.path = user_file(JOURNAL_FILE) if path is None else path
+        self.session = os.urandom(6).hex()
+        self._runs = {}
+        # Runs replaced by a restart before their exit came in, by (app, pid)
+        self._ending = {}
+        self._buffer = []
+        self._flush_timer = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        supervisor.add_listener(self.on_event)
+
+    def record(self, app_name, step, timestamp=None, **data):
+        """Queue one journal record; timestamp is a time.monotonic() value (default now)"""
+        if not self.path:
+            return
+        entry = {
+            "session": self.session,
+            "t": round(time.monotonic() if timestamp is None else timestamp, 6),
+            "time": round(time.time(), 3),
+            "app": app_name,
+            "step": step,
+        }
+        entry.update(data)
+        with self._lock:
+            self._buffer.append(entry)
+            if self._flush_timer is None:
+                self._flush_timer = self.supervisor.events.call_later(FLUSH_INTERVAL, self._flush_soon)
+
+    def on_event(self, event):
+        kind = event["type"]
+        name = event["app"]
+        now = event["monotonic"]
+        run = self._runs.get(name)
+
+        if kind in ("started", "reattached") and run is not None:
+            self._ending[(name, run.pid)] = run
+
+        if kind == "started":
+            spawned = now
+            self._runs[name] = AppRun(spawned, event["pid"])
+            self.record(name, "discover", spawned - event["spawn"] - event["discovery"],
+                        duration=round(event["discovery"], 6), command=event["command"])
+            self.record(name, "spawn", spawned, duration=round(event["spawn"], 6), pid=event["pid"])
+        elif kind == "reattached":
+            self._runs[name] = AppRun(now, event["pid"], reattached=True)
+            self.record(name, "reattach", now, pid=event["pid"], port=event["port"])
+        elif kind == "exited":
+            if run is not None and run.pid == event["pid"]:
+                del self._runs[name]
+            else:
+                run = self._ending.pop((name, event["pid"]), None)
+                if run is None:
+                    return
+            stop = round(now - run.stop_requested, 6) if run.stop_requested is not None else None
+            self.record(name, "exit", now, returncode=event["returncode"],
+                        uptime=round(now - run.spawned, 6), since_stop=stop)
+        elif kind == "prepared" or kind == "prepare_failed":
+            self.record(name, "prepare", now - event["duration"], duration=round(event["duration"], 6),
+                        returncode=event.get("returncode", 0))
+        elif kind == "prepare_skipped":
+            self.record(name, "prepare_skipped", now, duration=round(event["check"], 6),
+                        saved=round(event["saved"], 6))
+        elif run is None or (run.reattached and kind in ("output", "port_open", "port_detected")):
+            return
+        elif kind == "output":
+            if run.first_output is None:
+                run.first_output = now
+                self.record(name, "first_output", now, since_spawn=round(now - run.spawned, 6),
+                            stream=event["stream"])
+        elif kind == "port_open" or kind == "port_detected":
+            if run.port_open is None:
+                run.port_open = now
+                self.record(name, "port_bound", now, since_spawn=round(now - run.spawned, 6),
+                            port=event["port"])
+        elif kind == "ready":
+            run.ready = now
+            if run.reattached:
+                # Not a cold start, so it says nothing about launch latency
+                self.record(name, "ready", now, url=event["url"], reattached=True)
+            else:
+                self.record(name, "ready", now, since_spawn=round(event["elapsed"], 6),
+                            source=event["source"], url=event["url"])
+        elif kind == "not_ready":
+            self.record(name, "not_ready", now, since_spawn=round(now - run.spawned, 6))
+        elif kind == "browser_opened":
+            since = round(now - run.ready, 6) if run.ready is not None else None
+            self.record(name, "browser_open", now, since_ready=since, url=event["url"])
+        elif kind == "stop_requested":
+            if run.pid != event["pid"]:
+                return  # a prepare step, not the server
+            run.stop_requested = now
+            self.record(name, "stop_requested", now, uptime=round(now - run.spawned, 6))
+
+    def _flush_soon(self):
+        with self._lock:
+            self._flush_timer = None
+        self.supervisor.events.spawn(self._flush())
+
+    async def _flush(self):
+        await self.supervisor.events.run_blocking(self.flush)
+
+    def flush(self):
+        """Write every buffered record (blocks on the disk)"""
+        with self._lock:
+            entries, self._buffer = self._buffer, []
+        if not entries:
+            return
+        data = "".join(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries)
+        with self._write_lock:
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                if os.path.exists(self.path) and os.path.getsize(self.path) + len(data) > MAX_BYTES:
+                    os.replace(self.path, self.path + ".1")
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(data)
+            except OSError as e:
+                print(f"Error writing journal: {e}")
+
+    def close(self):
+        """Write out what is still buffered"""
+        with self._lock:
+            timer, self._flush_timer = self._flush_timer, None
+        if timer is not None:
+            timer.cancel()
+        self.flush()
+
+
+def read_journal(path):
+    """Yield the records of a journal (and its rotated predecessor), oldest first"""
+    for candidate in (path + ".1", path):
+        try:
+            f = open(candidate, "r", encoding="utf-8")
+        except FileNotFoundError:
+            continue
+        with f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def summarize(records, app=None):
+    """Return {app: stats} with time-to-ready and time-to-first-output percentiles"""
+    samples = {}
+    for record in records:
+        name = record.get("app")
+        if name is None or (app is not None and name != app):
+            continue
+        stats = samples.setdefault(name, {"ready": [], "first_output": [], "not_ready": 0, "runs": 0,
+                                          "saved": 0.0})
+        step = record.get("step")
+        if step == "spawn":
+            stats["runs"] += 1
+        elif step == "ready" and "since_spawn" in record:
+            stats["ready"].append(record["since_spawn"])
+        elif step == "first_output":
+            stats["first_output"].append(record["since_spawn"])
+        elif step == "not_ready":
+            stats["not_ready"] += 1
+        elif step == "prepare_skipped":
+            stats["saved"] += record.get("saved", 0.0)
+
+    summary = {}
+    for name, stats in samples.items():
+        summary[name] = {
+            "runs": stats["runs"],
+            "ready": len(stats["ready"]),
+            "not_ready": stats["not_ready"],
+            "ready_p50": percentile(stats["ready"], 0.5),
+            "ready_p95": percentile(stats["ready"], 0.95),
+            "first_output_p50": percentile(stats["first_output"], 0.5),
+            "prepare_saved": round(stats["saved"], 3),
+        }
+    return summary
+
+
+def format_summary(summary):
+    """Return the summary as a text table"""
+    def seconds(value):
+        return "-" if value is None else f"{value:.2f}s"
+
+    width = max([len(name) for name in summary] + [3])
+    lines = [f"{'App':<{width}}  {'Runs':>5}  {'Ready':>5}  {'p50':>8}  {'p95':>8}  {'1st out':>8}  {'Saved':>8}"]
+    for name in sorted(summary):
+        stats = summary[name]
+        lines.append(f"{name:<{width}}  {stats['runs']:>5}  {stats['ready']:>5}  "
+                     f"{seconds(stats['ready_p50']):>8}  {seconds(stats['ready_p95']):>8}  "
+                     f"{seconds(stats['first_output_p50']):>8}  {seconds(stats['prepare_saved'] or None):>8}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    # Only the command line needs it; keep it off the launcher's start-up path
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Summarise app time-to-ready from the launcher journal.")
+    parser.add_argument("journal", nargs="?", default=user_file(JOURNAL_FILE),
+                        help="journal file (default: the one in the per-user config folder)")
+    parser.add_argument("--app", help="only this app")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    summary = summarize(read_journal(args.journal), args.app)
+    if not summary:
+        print(f"No app runs recorded in {args.journal}", file=sys.stderr)
+        return 1
+    print(json.dumps(summary, indent=2) if args.json else format_summary(summary))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
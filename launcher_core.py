@@ -0,0 +1,356 @@
+"""
+Tk-free launcher core shared by the GUI and headless mode.
+Owns the configuration, the supervisor and the wording of status messages,
+so front-ends only decide how to display them.
+"""
+
+import os
+import threading
+import time
+
+import app_groups
+import config_store
+import control_api
+import env_cache
+import journal
+import load_probe
+import log_files
+import metrics
+import project_detect
+import readiness
+import resource_limits
+import state_file
+import supervisor
+import watcher
+
+# Where older versions kept the config: the working directory (adopted on first run)
+CONFIG_FILE = "launcher_config.json"
+
+
+def describe_event(event):
+    """Return the status log message for a supervisor event"""
+    kind = event["type"]
+
+    if kind == "output":
+        if event["stream"] == "stderr":
+            return f"Server [stderr]: {event['line']}"
+        return f"Server: {event['line']}"
+    if kind == "started":
+        return f"✓ Server started: {event['command']} (pid {event['pid']})"
+    if kind == "ready":
+        return f"✓ Server ready in {event['elapsed']:.2f}s at {event['url']}"
+    if kind == "reattached":
+        return f"🔗 Reattached to running server (pid {event['pid']}) on port {event['port']}"
+    if kind == "port_reassigned":
+        return f"⚠️ Port {event['preferred']} is in use - using port {event['port']} (passed as PORT)"
+    if kind == "port_detected":
+        return f"Server is listening on port {event['port']}"
+    if kind == "url_detected":
+        return f"Detected server URL: {event['url']}"
+    if kind == "files_changed":
+        paths = event["paths"]
+        shown = ", ".join(paths[:3]) + (f" and {len(paths) - 3} more" if len(paths) > 3 else "")
+        return f"🔄 Files changed ({shown}) - restarting"
+    if kind == "not_ready":
+        return f"⚠️ Server not ready after {event['timeout']:g}s"
+    if kind == "stopped":
+        forced = " (killed after grace period)" if event["forced"] else ""
+        return f"✓ Server stopped in {event['duration']:.2f}s{forced}"
+    if kind == "exited":
+        return f"Server process ended (exit code {event['returncode']})"
+    if kind == "restart_scheduled":
+        return f"🔄 Restarting in {event['delay']:.1f}s (restart #{event['attempt']})"
+    if kind == "start_failed":
+        return f"❌ Failed to start server: {event['error']}"
+    if kind == "group_ready":
+        path = " → ".join(event["path"])
+        return (f"✓ {event['apps']} apps ready in {event['elapsed']:.2f}s "
+                f"(critical path {path}: {event['critical']:.2f}s)")
+    if kind == "group_failed":
+        failed = ", ".join(f"{name} ({reason})" for name, reason in event["failed"].items())
+        blocked = f"; not started: {', '.join(event['blocked'])}" if event["blocked"] else ""
+        return f"❌ Group did not come up: {failed}{blocked}"
+    if kind == "restart_failed":
+        return f"❌ Restart failed: {event['error']}"
+    if kind == "crash_loop":
+        return f"❌ Crash loop: {event['restarts']} restarts within {event['window']:g}s - giving up"
+    if kind == "unhealthy":
+        return f"⚠️ Server stopped answering ({event['failures']} failed liveness probes)"
+    if kind == "prepare_started":
+        changed = f" ({', '.join(event['changed'])} changed)" if event["changed"] else ""
+        return f"📦 Preparing environment{changed}: {event['command']}"
+    if kind == "prepare_output":
+        return f"Prepare: {event['line']}"
+    if kind == "prepared":
+        return f"✓ Environment prepared in {event['duration']:.1f}s"
+    if kind == "prepare_failed":
+        return f"❌ Prepare step failed (exit code {event['returncode']}) - server not started"
+    if kind == "prepare_skipped":
+        return (f"⚡ Dependencies unchanged - prepare step skipped, saving ~{event['saved']:.1f}s "
+                f"({event['total_saved']:.0f}s so far)")
+    if kind == "limit_warning":
+        return f"⚠️ Resource limits: {event['message']}"
+    if kind == "limit_exceeded":
+        return f"⚠️ Limit hit: {event['message']}"
+    return None
+
+
+def format_event(event):
+    """Return a timestamped, app-prefixed log line for an event (or None)"""
+    message = describe_event(event)
+    if message is None:
+        return None
+    timestamp = time.strftime("%H:%M:%S", time.localtime(event["time"]))
+    return f"[{timestamp}] [{event['app']}] {message}"
+
+
+class EventBuffer:
+    """Supervisor listener that holds events until a front-end attaches, then forwards them"""
+
+    def __init__(self, supervisor):
+        self.events = []
+        self.callback = None
+        self._lock = threading.Lock()
+        supervisor.add_listener(self.on_event)
+
+    def on_event(self, event):
+        with self._lock:
+            if self.callback is None:
+                self.events.append(event)
+                return
+        self.callback(event)
+
+    def attach(self, callback):
+        """Replay the held events to callback and forward every later one (callback must not block)"""
+        with self._lock:
+            for event in self.events:
+                callback(event)
+            self.events = []
+            self.callback = callback
+
+
+class LauncherCore:
+    """Configuration plus the supervisor that runs the configured apps"""
+
+    def __init__(self, config_file=None):
+        self.app_path = ""
+        self.health_path = ""
+        self.ready_timeout = readiness.DEFAULT_TIMEOUT
+        self.metrics_interval = metrics.DEFAULT_INTERVAL
+        self.supervisor = supervisor.Supervisor()
+        # Without an explicit file the per-user store is used, adopting an old working-directory config
+        self.store = config_store.ConfigStore(config_file, events=self.supervisor.events,
+                                              legacy_path=None if config_file else CONFIG_FILE)
+        self.config_file = self.store.path
+        self.metrics = metrics.MetricsSampler(self.supervisor, self.metrics_interval)
+        self.log_files = log_files.LogFileSink(
+            self.supervisor, describe_event, log_dir=os.path.join(self.store.dir, log_files.DEFAULT_LOG_DIR))
+        self.groups = app_groups.GroupManager(self.supervisor)
+        self.probes = load_probe.LoadProbe(self.supervisor)
+        self.limit_monitor = resource_limits.LimitMonitor(self.supervisor, self.supervisor.limits)
+        self.control = control_api.ControlServer(self.supervisor, groups=self.groups, probes=self.probes)
+        self.state = state_file.StateKeeper(
+            self.supervisor, os.path.join(self.store.dir, state_file.STATE_FILE))
+        self.watches = watcher.WatchManager(self.supervisor)
+        self.journal = journal.LifecycleJournal(
+            self.supervisor, os.path.join(self.store.dir, journal.JOURNAL_FILE))
+        self.probes.path = os.path.join(self.store.dir, load_probe.RESULTS_FILE)
+        self.supervisor.env_cache.path = os.path.join(self.store.dir, env_cache.CACHE_FILE)
+        self.supervisor.capture_dir = os.path.join(self.store.dir, supervisor.DEFAULT_CAPTURE_DIR)
+        self.address = None
+        self._started = False
+        self._profiles_loaded = False
+
+    def start(self):
+        """Start the background services (resource sampling, log files, control API)
+        and reattach to servers a previous run left running.
+
+        Returns the control API address, or None when it is disabled.
+        Calling it again does nothing but return the address.
+        """
+        if self._started:
+            return self.address
+        self._started = True
+        self.metrics.start()
+        self.limit_monitor.start()
+        self.log_files.start()
+        self.address = self.control.start()
+        self.state.reattach()
+        return self.address
+
+    def close(self):
+        """Stop the background services, writing out pending log lines"""
+        self.watches.stop_all()
+        self.state.save()
+        self.control.stop()
+        self.metrics.stop()
+        self.limit_monitor.stop()
+        for app in list(self.supervisor.apps.values()):
+            if not app.is_running:
+                self.supervisor.limits.cgroups.remove(app.name)
+        self.log_files.stop()
+        self.journal.close()
+        self.store.close()
+        self.supervisor.events.stop()
+
+    def open_browser(self, app_name, url):
+        """Open url in the browser and journal it against the app"""
+        # Imported here: it is slow to import and not needed to get a server running
+        import webbrowser
+        webbrowser.open(url)
+        if self.supervisor.get(app_name) is not None:
+            self.supervisor.emit(app_name, "browser_opened", url=url)
+
+    def log_file_for(self, app_name):
+        """Return the on-disk log of an app, or None if file logging is off"""
+        if not self.log_files.log_dir:
+            return None
+        return self.log_files.path_for(app_name)
+
+    def app_defaults(self):
+        """Return the settings new app definitions inherit"""
+        return {"health_path": self.health_path, "ready_timeout": self.ready_timeout}
+
+    def app_for_path(self, path, create=False):
+        """Return the managed app for a folder, registering it if create is set"""
+        path = path.strip()
+        if not path:
+            return None
+
+        app = self.supervisor.find_by_path(path)
+        if app is None and create:
+            base_name = os.path.basename(os.path.normpath(path)) or "app"
+            definition = supervisor.AppDefinition.from_dict(
+                {"name": self.supervisor.unique_name(base_name), "path": path},
+                defaults=self.app_defaults()
+            )
+            app = self.supervisor.add_app(definition)
+        return app
+
+    def check_app_folder(self, path):
+        """Return an error message if path cannot be launched, else None"""
+        if not path:
+            return "No app path given. Please select an app folder."
+        if not os.path.exists(path):
+            return f"Saved path no longer exists: {path}"
+        app = self.supervisor.find_by_path(path)
+        if not (app and app.definition.command) and not project_detect.best_candidate(path):
+            return f"No start script or known project type found in: {path}"
+        return None
+
+    def start_saved_app(self):
+        """Start the saved app (after what it depends on) if its folder can be launched.
+
+        Returns the app, or None if nothing was started; the caller reports why.
+        """
+        if self.check_app_folder(self.app_path):
+            return None
+        app = self.app_for_path(self.app_path, create=True)
+        if app.is_running:
+            return None
+        try:
+            if app.definition.depends_on:
+                self.groups.start([app.name], label=app.name)
+            else:
+                self.supervisor.start(app.name)
+        except (supervisor.LaunchError, OSError):
+            return None
+        return app
+
+    def load_config(self, lazy=False):
+        """Load settings and app profiles from the config store.
+
+        With lazy set only the most recently used app (and what it depends on)
+        is registered; load_profiles() registers the rest later.
+        """
+        began = time.monotonic()
+        try:
+            store = self.store
+            recent = store.recent()
+            self.app_path = recent[0] if recent else ""
+            self.health_path = store.get("health_path", "")
+            self.ready_timeout = float(store.get("ready_timeout", readiness.DEFAULT_TIMEOUT))
+            self.metrics_interval = float(store.get("metrics_interval", metrics.DEFAULT_INTERVAL))
+            self.metrics.interval = self.metrics_interval
+            # Relative folders are taken from the config folder, not the working directory
+            log_dir = store.get("log_dir", log_files.DEFAULT_LOG_DIR)
+            self.log_files.log_dir = os.path.join(store.dir, log_dir) if log_dir else ""
+            self.log_files.max_bytes = int(store.get("log_max_bytes", log_files.DEFAULT_MAX_BYTES))
+            self.log_files.backups = int(store.get("log_backups", log_files.DEFAULT_BACKUPS))
+            self.log_files.rotate = store.get("log_rotate", log_files.ROTATE_SIZE)
+            self.supervisor.capture_dir = (self.log_files.log_dir
+                                           or os.path.join(store.dir, supervisor.DEFAULT_CAPTURE_DIR))
+            self.control.port = store.get("control_port")
+            self.control.socket_path = store.get("control_socket")
+            self.control.token = store.get("control_token")
+            self.journal.path = store.get("journal_file", self.journal.path)
+            self.probes.configure(store.get("load_probe", {}))
+            self.supervisor.limits.cgroups.root = store.get("cgroup_root")
+            self.groups.groups = {name: list(members) for name, members in store.get("groups", {}).items()}
+            if lazy:
+                name = store.profile_for_path(self.app_path) if self.app_path else None
+                self.load_profiles([name] if name else [])
+            else:
+                self.load_profiles()
+        except Exception as e:
+            print(f"Error loading config: {e}")
+        self.journal.record(None, "config_load", began, duration=round(time.monotonic() - began, 6),
+                            apps=len(self.supervisor.apps))
+
+    def load_profiles(self, names=None):
+        """Register the named profiles and the apps they depend on (all profiles if names is None)"""
+        pending = list(self.store.profile_names() if names is None else names)
+        while pending:
+            name = pending.pop()
+            if self.supervisor.get(name) is not None:
+                continue
+            data = self.store.profile(name)
+            if data is None:
+                continue
+            data["name"] = name
+            definition = supervisor.AppDefinition.from_dict(data, defaults=self.app_defaults())
+            self.supervisor.add_app(definition)
+            pending.extend(definition.depends_on)
+        if names is None:
+            self._profiles_loaded = True
+            if self._started and self.state.unclaimed:
+                self.state.reattach()
+
+    def recent_paths(self):
+        """Return the most recently used app folders, newest first"""
+        return self.store.recent()
+
+    def save_config(self):
+        """Save configuration to the store (written shortly after, in one go)"""
+        try:
+            store = self.store
+            if self.app_path:
+                store.touch_recent(self.app_path)
+            store.set("health_path", self.health_path or None)
+            for key, value, default in (
+                ("ready_timeout", self.ready_timeout, readiness.DEFAULT_TIMEOUT),
+                ("metrics_interval", self.metrics_interval, metrics.DEFAULT_INTERVAL),
+                ("log_dir", self.log_files.log_dir, os.path.join(store.dir, log_files.DEFAULT_LOG_DIR)),
+                ("log_max_bytes", self.log_files.max_bytes, log_files.DEFAULT_MAX_BYTES),
+                ("log_backups", self.log_files.backups, log_files.DEFAULT_BACKUPS),
+                ("log_rotate", self.log_files.rotate, log_files.ROTATE_SIZE),
+            ):
+                store.set(key, value if value != default else None)
+            store.set("control_port", self.control.port)
+            store.set("control_socket", self.control.socket_path)
+            store.set("control_token", self.control.token)
+            default_journal = os.path.join(store.dir, journal.JOURNAL_FILE)
+            store.set("journal_file", self.journal.path if self.journal.path != default_journal else None)
+            for app in list(self.supervisor.apps.values()):
+                data = app.definition.to_dict()
+                data["path"] = os.path.abspath(data["path"])
+                store.put_profile(app.name, data)
+            if self._profiles_loaded:
+                # Only when every profile is registered is a missing one a removed one
+                for name in store.profile_names():
+                    if self.supervisor.get(name) is None:
+                        store.remove_profile(name)
+            store.set("groups", self.groups.groups or None)
+            store.save_soon()
+        except Exception as e:
+            print(f"Error saving config: {e}")
@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Local load probe for a launched app.
+Sends a fixed number of GET requests to the app's URL over a few concurrent
+keep-alive connections on the supervisor's event loop. It reports
+throughput, latency percentiles, the error rate, and the CPU and memory the
+app's process tree used meanwhile. Every run is appended to
+load_probes.jsonl next to the config, so results can be compared across
+launches.
+"""
+
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from urllib.parse import urljoin, urlsplit
+
+from config_store import user_file
+import metrics
+import process_control
+from journal import percentile
+
+RESULTS_FILE = "load_probes.jsonl"
+DEFAULT_REQUESTS = 1000
+DEFAULT_CONCURRENCY = 10
+DEFAULT_TIMEOUT = 10.0
+SAMPLE_INTERVAL = 0.25
+READ_CHUNK = 65536
+# Compared with the app's previous run
+TRACKED = ("throughput", "p95_ms", "error_rate", "cpu_avg_percent", "rss_peak_mb")
+
+
+class ProbeError(Exception):
+    """The probe cannot run (app not running, unsupported URL, one already running)"""
+
+
+async def _discard(reader, length):
+    while length > 0:
+        data = await reader.read(min(length, READ_CHUNK))
+        if not data:
+            raise asyncio.IncompleteReadError(b"", length)
+        length -= len(data)
+
+
+async def read_response(reader):
+    """Read one HTTP/1.x response, discarding the body; returns (status, keep_alive)"""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError("connection closed by the server")
+    version, status = status_line.split(None, 2)[:2]
+    status = int(status)
+    keep_alive = version != b"HTTP/1.0"
+    length = None
+    chunked = False
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.partition(b":")
+        name, value = name.strip().lower(), value.strip().lower()
+        if name == b"content-length":
+            length = int(value)
+        elif name == b"transfer-encoding":
+            chunked = b"chunked" in value
+        elif name == b"connection":
+            keep_alive = value == b"keep-alive" or (keep_alive and value != b"close")
+
+    if chunked:
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                # Trailers end with a blank line
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                break
+            await _discard(reader, size + 2)
+    elif length is not None:
+        await _discard(reader, length)
+    elif status >= 200 and status not in (204, 304):
+        # No length: the body runs until the server closes the connection
+        while await reader.read(READ_CHUNK):
+            pass
+        keep_alive = False
+    return status, keep_alive
+
+
+class Connection:
+    """One keep-alive connection, reopened when the server closes it"""
+
+    def __init__(self, host, port, request):
+        self.host = host
+        self.port = port
+        self.request = request
+        self.reader = None
+        self.writer = None
+        self.opened = 0
+
+    async def fetch(self):
+        """Send the request and return the response status"""
+        reused = self.writer is not None
+        if not reused:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+            self.opened += 1
+        try:
+            self.writer.write(self.request)
+            await self.writer.drain()
+            status, keep_alive = await read_response(self.reader)
+        except (OSError, EOFError):
+            self.close()
+            if not reused:
+                raise
+            # The server dropped the idle connection; one retry on a fresh one
+            return await self.fetch()
+        if not keep_alive:
+            self.close()
+        return status
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+async def run_probe(url, requests=DEFAULT_REQUESTS, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT):
+    """Send requests GETs to url, concurrency at a time; returns the measurements"""
+    parts = urlsplit(url)
+    if parts.scheme != "http" or not parts.hostname:
+        raise ProbeError(f"Only http:// URLs can be probed, not {url}")
+    host = parts.hostname
+    if host in ("0.0.0.0", "::"):
+        host = "127.0.0.1"
+    target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+    request = (f"GET {target} HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+               f"User-Agent: launcher-load-probe\r\nAccept: */*\r\n\r\n").encode("latin-1")
+
+    latencies = []
+    statuses = {}
+    failures = {}
+    remaining = [requests]
+    connections = []
+
+    async def worker():
+        connection = Connection(host, parts.port or 80, request)
+        connections.append(connection)
+        try:
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                began = time.perf_counter()
+                try:
+                    status = await asyncio.wait_for(connection.fetch(), timeout)
+                except (OSError, EOFError, ValueError, asyncio.TimeoutError) as e:
+                    connection.close()
+                    kind = type(e).__name__
+                    failures[kind] = failures.get(kind, 0) + 1
+                    continue
+                latencies.append(time.perf_counter() - began)
+                statuses[status] = statuses.get(status, 0) + 1
+        finally:
+            connection.close()
+
+    began = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, requests)))))
+    duration = time.perf_counter() - began
+
+    errors = sum(failures.values()) + sum(count for status, count in statuses.items() if status >= 500)
+
+    def ms(fraction):
+        value = percentile(latencies, fraction)
+        return None if value is None else round(value * 1000, 2)
+
+    return {
+        "url": url,
+        "requests": requests,
+        "concurrency": concurrency,
+        "duration": round(duration, 3),
+        "throughput": round(requests / duration, 1) if duration > 0 else None,
+        "p50_ms": ms(0.5),
+        "p95_ms": ms(0.95),
+        "p99_ms": ms(0.99),
+        "max_ms": ms(1.0),
+        "errors": errors,
+        "error_rate": round(errors / requests, 4) if requests else 0.0,
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "failures": failures,
+        "connections": sum(connection.opened for connection in connections),
+    }
+
+
+class LoadProbe:
+    """Runs load probes against a supervisor's apps and keeps their results"""
+
+    def __init__(self, supervisor, path=None):
+        self.supervisor = supervisor
+        self.path = user_file(RESULTS_FILE) if path is None else path
+        self.requests = DEFAULT_REQUESTS
+        self.concurrency = DEFAULT_CONCURRENCY
+        self.timeout = DEFAULT_TIMEOUT
+        self.url_path = ""
+        self._running = set()
+        self._lock = threading.Lock()
+
+    def configure(self, settings):
+        """Apply the "load_probe" config settings"""
+        self.requests = int(settings.get("requests", DEFAULT_REQUESTS))
+        self.concurrency = int(settings.get("concurrency", DEFAULT_CONCURRENCY))
+        self.timeout = float(settings.get("timeout", DEFAULT_TIMEOUT))
+        self.url_path = settings.get("path", "")
+
+    def submit(self, name, **options):
+        """Probe an app from any thread; returns a concurrent.futures.Future of the result"""
+        return self.supervisor.events.submit(self.probe(name, **options))
+
+    async def probe(self, name, requests=None, concurrency=None, path=None):
+        """Probe a running app, record the result and return it"""
+        app = self.supervisor.get(name)
+        if app is None or not app.is_running:
+            raise ProbeError(f"'{name}' is not running")
+        with self._lock:
+            if name in self._running:
+                raise ProbeError(f"A load probe of '{name}' is already running")
+            self._running.add(name)
+        try:
+            path = self.url_path if path is None else path
+            url = urljoin(app.url + "/", path.lstrip("/")) if path else app.url
+            done = asyncio.Event()
+            watch = asyncio.ensure_future(self._watch(app.process.pid, done)) if metrics.available() else None
+            try:
+                result = await run_probe(url, requests or self.requests, concurrency or self.concurrency,
+                                         self.timeout)
+            finally:
+                done.set()
+            if watch is not None:
+                result.update(await watch)
+            result = dict({"app": name, "time": round(time.time(), 3)}, **result)
+            previous = await self.supervisor.events.run_blocking(self.last_result, name)
+            result["change"] = compare(result, previous)
+            await self.supervisor.events.run_blocking(self.save, result)
+            return result
+        finally:
+            with self._lock:
+                self._running.discard(name)
+
+    async def _watch(self, pid, done):
+        """Sample the app's process tree until done is set; returns the CPU and RSS figures"""
+        tree = metrics.AppMetrics(history_size=1)
+        start = None
+        cpu_peak = rss_peak = 0.0
+        while True:
+            finished = done.is_set()
+            sample = await self.supervisor.events.run_blocking(self._sample, tree, pid)
+            if sample is not None:
+                if start is None:
+                    start = (tree.last_cpu, tree.last_time)
+                else:
+                    cpu_peak = max(cpu_peak, sample["cpu_percent"])
+                rss_peak = max(rss_peak, sample["rss_bytes"])
+            if finished:
+                break
+            try:
+                await asyncio.wait_for(done.wait(), SAMPLE_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+        if start is None or tree.last_time <= start[1]:
+            return {}
+        cpu_avg = max(0.0, (tree.last_cpu - start[0]) / (tree.last_time - start[1]) * 100)
+        return {"cpu_avg_percent": round(cpu_avg, 1), "cpu_peak_percent": round(max(cpu_peak, cpu_avg), 1),
+                "rss_peak_mb": round(rss_peak / 1048576, 1)}
+
+    @staticmethod
+    def _sample(tree, pid):
+        return tree.sample(pid, process_control.children_map(), time.monotonic())
+
+    def last_result(self, name):
+        """Return the app's most recent recorded result, or None"""
+        last = None
+        for result in read_results(self.path):
+            if result.get("app") == name:
+                last = result
+        return last
+
+    def save(self, result):
+        """Append a result to the results file (blocks on the disk)"""
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(result, separators=(",", ":")) + "\n")
+        except OSError as e:
+            print(f"Error saving load probe result: {e}")
+
+
+def compare(result, previous):
+    """Return the relative change of the tracked figures since previous (None if there is none)"""
+    if previous is None:
+        return None
+    change = {}
+    for key in TRACKED:
+        old, new = previous.get(key), result.get(key)
+        if old and new is not None:
+            change[key] = round((new - old) / old, 3)
+    return change
+
+
+def read_results(path):
+    """Yield the recorded results, oldest first"""
+    try:
+        f = open(path, "r", encoding="utf-8")
+    except FileNotFoundError:
+        return
+    with f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def format_result(result):
+    """Return a one-line summary of a probe result"""
+    def ms(key):
+        return "-" if result.get(key) is None else f"{result[key]:.1f} ms"
+
+    text = (f"{result['requests']} requests x{result['concurrency']} in {result['duration']:.2f}s: "
+            f"{result['throughput'] or 0:.1f} req/s, p50 {ms('p50_ms')}, p95 {ms('p95_ms')}, "
+            f"p99 {ms('p99_ms')}, errors {result['error_rate'] * 100:.1f}%")
+    if "cpu_avg_percent" in result:
+        text += (f"  ·  CPU {result['cpu_avg_percent']:.0f}% avg / {result['cpu_peak_percent']:.0f}% peak"
+                 f"  ·  RSS {result['rss_peak_mb']:.1f} MB peak")
+    if result.get("change"):
+        labels = {"throughput": "req/s", "p95_ms": "p95", "error_rate": "errors",
+                  "cpu_avg_percent": "CPU", "rss_peak_mb": "RSS"}
+        text += "  ·  vs last run: " + ", ".join(
+            f"{labels[key]} {value * 100:+.0f}%" for key, value in result["change"].items())
+    return text
+
+
+def format_history(results):
+    """Return recorded results as a text table"""
+    def number(value, pattern):
+        return "-" if value is None else format(value, pattern)
+
+    width = max([len(result.get("app", "")) for result in results] + [3])
+    lines = [f"{'When':<16}  {'App':<{width}}  {'req/s':>8}  {'p50':>8}  {'p95':>8}  {'p99':>8}  "
+             f"{'errors':>6}  {'CPU':>5}  {'RSS':>8}"]
+    for result in results:
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(result.get("time", 0)))
+        lines.append(f"{when:<16}  {result.get('app', ''):<{width}}  "
+                     f"{number(result.get('throughput'), '.1f'):>8}  "
+                     f"{number(result.get('p50_ms'), '.1f'):>8}  {number(result.get('p95_ms'), '.1f'):>8}  "
+                     f"{number(result.get('p99_ms'), '.1f'):>8}  "
+                     f"{result.get('error_rate', 0) * 100:>5.1f}%  "
+                     f"{number(result.get('cpu_avg_percent'), '.0f'):>4}%  "
+                     f"{number(result.get('rss_peak_mb'), '.1f'):>5} MB")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    # Only the command line needs it; keep it off the launcher's start-up path
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Show recorded load probe results, or probe a URL.")
+    parser.add_argument("results", nargs="?", default=user_file(RESULTS_FILE),
+                        help="results file (default: the one in the per-user config folder)")
+    parser.add_argument("--app", help="only this app")
+    parser.add_argument("--json", action="store_true", help="print JSON")
+    parser.add_argument("--url", help="probe this URL now instead of showing results")
+    parser.add_argument("-n", "--requests", type=int, default=DEFAULT_REQUESTS, help="number of requests")
+    parser.add_argument("-c", "--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="concurrent connections")
+    args = parser.parse_args(argv)
+
+    if args.url:
+        try:
+            result = asyncio.run(run_probe(args.url, args.requests, args.concurrency))
+        except ProbeError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 2
+        print(json.dumps(result, indent=2) if args.json else format_result(result))
+        return 1 if result["errors"] else 0
+
+    results = [result for result in read_results(args.results) if args.app in (None, result.get("app"))]
+    if not results:
+        print(f"No load probe results in {args.results}", file=sys.stderr)
+        return 1
+    print(json.dumps(results, indent=2) if args.json else format_history(results))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
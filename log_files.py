@@ -0,0 +1,279 @@
+"""
+On-disk server logs.
+Every app's output and lifecycle messages are appended to logs/<app>.log in
+the config folder by a background writer that batches lines and rotates
+files by size or by day.
+LogFileReader memory-maps a log so the viewer can show the tail, page
+backwards and regex-search files far larger than RAM.
+"""
+
+import mmap
+import os
+import queue
+import re
+import threading
+import time
+
+from config_store import user_file
+
+DEFAULT_LOG_DIR = "logs"
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUPS = 5
+ROTATE_SIZE = "size"
+ROTATE_DAILY = "daily"
+FLUSH_INTERVAL = 0.5
+SEARCH_CHUNK = 1024 * 1024
+
+_UNSAFE_NAME = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def log_path(log_dir, app_name):
+    """Return the log file path for an app"""
+    return os.path.join(log_dir, (_UNSAFE_NAME.sub("_", app_name) or "app") + ".log")
+
+
+class RotatingLogFile:
+    """Append-only log file that rotates to .1, .2, ... by size or at midnight"""
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES, backups=DEFAULT_BACKUPS, rotate=ROTATE_SIZE):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.rotate = rotate
+        self._file = None
+        self._size = 0
+        self._day = None
+
+    def _open(self):
+        self._file = open(self.path, "ab")
+        self._size = self._file.tell()
+        self._day = time.strftime("%Y-%m-%d")
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        if self.backups > 0:
+            for index in range(self.backups - 1, 0, -1):
+                source = f"{self.path}.{index}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.path}.{index + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def write(self, data):
+        """Append encoded data, rotating first if the file is due"""
+        if self._file is None:
+            self._open()
+        due = False
+        if self.rotate == ROTATE_DAILY:
+            due = self._size and time.strftime("%Y-%m-%d") != self._day
+        elif self.max_bytes:
+            due = self._size and self._size + len(data) > self.max_bytes
+        if due:
+            self._rotate()
+            self._open()
+        self._file.write(data)
+        self._size += len(data)
+
+    def flush(self):
+        if self._file:
+            self._file.flush()
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+class LogFileSink:
+    """Supervisor listener that writes app logs to disk from a background thread"""
+
+    def __init__(self, supervisor, describe, log_dir=None, max_bytes=DEFAULT_MAX_BYTES,
+                 backups=DEFAULT_BACKUPS, rotate=ROTATE_SIZE):
+        self.supervisor = supervisor
+        self.describe = describe
+        # "" turns file logging off
+        self.log_dir = user_file(DEFAULT_LOG_DIR) if log_dir is None else log_dir
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.rotate = rotate
+        self._queue = queue.SimpleQueue()
+        self._files = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def path_for(self, app_name):
+        return log_path(self.log_dir, app_name)
+
+    def start(self):
+        """Begin writing logs (no-op when no log directory is configured)"""
+        if self._thread or not self.log_dir:
+            return
+        try:
+            os.makedirs(self.log_dir, exist_ok=True)
+        except OSError as e:
+            print(f"Error creating log directory: {e}")
+            return
+        self._stop.clear()
+        self.supervisor.add_listener(self.on_event)
+        self._thread = threading.Thread(target=self._run, name="log-files", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Write everything still queued and close the files"""
+        if not self._thread:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def on_event(self, event):
+        # Called from worker threads: only format and queue here
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(event["time"]))
+        if event["type"] == "output":
+            stream = " [stderr]" if event["stream"] == "stderr" else ""
+            line = f"{stamp}{stream} {event['line']}"
+        else:
+            message = self.describe(event)
+            if message is None:
+                return
+            line = f"{stamp} [launcher] {message}"
+        self._queue.put((event["app"], line))
+
+    def _run(self):
+        while not self._stop.wait(FLUSH_INTERVAL):
+            self._write_batch()
+        self._write_batch()
+        for log_file in self._files.values():
+            log_file.close()
+        self._files.clear()
+
+    def _write_batch(self):
+        batches = {}
+        while True:
+            try:
+                app_name, line = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batches.setdefault(app_name, []).append(line)
+
+        for app_name, lines in batches.items():
+            log_file = self._files.get(app_name)
+            if log_file is None:
+                log_file = self._files[app_name] = RotatingLogFile(
+                    self.path_for(app_name), self.max_bytes, self.backups, self.rotate)
+            try:
+                log_file.write(("\n".join(lines) + "\n").encode("utf-8", errors="replace"))
+                log_file.flush()
+            except OSError as e:
+                print(f"Error writing log for {app_name}: {e}")
+                log_file.close()
+
+
+class LogFileReader:
+    """Random access to a (possibly huge) log file through mmap.
+
+    The file is mapped per call, so it can keep growing and be rotated
+    (renamed) between calls, including on Windows.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def size(self):
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def _map(self):
+        f = open(self.path, "rb")
+        try:
+            if os.fstat(f.fileno()).st_size == 0:
+                return f, b""
+            return f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            f.close()
+            raise
+
+    @staticmethod
+    def _close(f, data):
+        if isinstance(data, mmap.mmap):
+            data.close()
+        f.close()
+
+    @staticmethod
+    def _decode(chunk):
+        return chunk.decode("utf-8", errors="replace").splitlines()
+
+    def page_before(self, end=None, count=200):
+        """Return (lines, start offset) for up to count lines ending at offset end (default EOF)"""
+        f, data = self._map()
+        try:
+            if end is None or end > len(data):
+                end = len(data)
+            # Step over the newline that terminates the last line, then back count newlines
+            pos = end - 1 if end and data[end - 1:end] == b"\n" else end
+            for _ in range(count):
+                pos = data.rfind(b"\n", 0, pos)
+                if pos < 0:
+                    break
+            start = pos + 1
+            return self._decode(data[start:end]), start
+        finally:
+            self._close(f, data)
+
+    def tail(self, count=200):
+        """Return (lines, start offset) for the last count lines"""
+        return self.page_before(None, count)
+
+    def page_after(self, start, count=200):
+        """Return (lines, end offset) for up to count lines starting at offset start"""
+        f, data = self._map()
+        try:
+            end = start
+            for _ in range(count):
+                newline = data.find(b"\n", end)
+                if newline < 0:
+                    end = len(data)
+                    break
+                end = newline + 1
+            return self._decode(data[start:end]), end
+        finally:
+            self._close(f, data)
+
+    def search(self, pattern, start=0, backwards=False, ignore_case=True):
+        """Return (line start, line end, line) of the next regex match, or None.
+
+        Forward searches begin at offset start; backward searches find the last
+        match that begins before it.
+        """
+        flags = re.IGNORECASE if ignore_case else 0
+        regex = re.compile(pattern.encode("utf-8"), flags | re.MULTILINE)
+        f, data = self._map()
+        try:
+            if not data:
+                return None
+            if backwards:
+                match = None
+                chunk_end = start
+                # Scan line-aligned chunks from start towards the beginning of the file
+                while chunk_end > 0 and match is None:
+                    chunk_start = max(0, chunk_end - SEARCH_CHUNK)
+                    if chunk_start:
+                        chunk_start = data.rfind(b"\n", 0, chunk_start) + 1
+                    for match in regex.finditer(data, chunk_start, chunk_end):
+                        pass
+                    chunk_end = chunk_start
+            else:
+                match = regex.search(data, start)
+            if match is None:
+                return None
+            line_start = data.rfind(b"\n", 0, match.start()) + 1
+            line_end = data.find(b"\n", match.start())
+            if line_end < 0:
+                line_end = len(data)
+            return line_start, line_end, data[line_start:line_end].decode("utf-8", errors="replace")
+        finally:
+            self._close(f, data)
@@ -0,0 +1,327 @@
+"""
+Log model for the launcher status pane.
+Any thread can append lines; they are handed off through a bounded queue
+(the oldest lines are dropped, and counted, if the UI falls behind) into a
+fixed-capacity ring buffer and flushed to the Tk widget in batches.
+Lines are also indexed by level and stream as they arrive, so filtering
+and searching only visit the lines that can match.
+"""
+
+import re
+import threading
+from bisect import bisect_right
+from collections import deque
+
+DEFAULT_CAPACITY = 100000
+DEFAULT_VIEW_LINES = 2000
+DEFAULT_FPS = 20
+CHUNK_LINES = 1024
+# Most lines moved into the widget per frame; the rest wait for the next one
+FLUSH_LINES = 5000
+
+# Levels, lowest first
+INFO = "info"
+WARNING = "warning"
+ERROR = "error"
+LEVELS = [INFO, WARNING, ERROR]
+
+# Streams
+LAUNCHER = "launcher"
+STDOUT = "stdout"
+STDERR = "stderr"
+
+ERROR_MARKERS = ("❌", "error", "Error", "ERROR", "Traceback", "Exception", "CRITICAL", "FATAL")
+WARNING_MARKERS = ("⚠️", "warn", "Warn", "WARN")
+
+
+def classify(line):
+    """Return the level of a log line from its markers"""
+    for marker in ERROR_MARKERS:
+        if marker in line:
+            return ERROR
+    for marker in WARNING_MARKERS:
+        if marker in line:
+            return WARNING
+    return INFO
+
+
+class LogFilter:
+    """Which lines to show: a minimum level, one stream and/or a text or regex match.
+
+    Text matching is case-insensitive. Raises ValueError for an invalid regex.
+    """
+
+    def __init__(self, level=None, stream=None, text="", regex=False):
+        self.level = level if level != INFO else None
+        self.stream = stream
+        self.text = text
+        self.regex = regex
+        self.needle = None
+        self.pattern = None
+        if text and regex:
+            try:
+                # Chunks are searched as one text: ^ and $ must still mean the start and end of a line
+                self.pattern = re.compile(text, re.IGNORECASE | re.MULTILINE)
+            except re.error as e:
+                raise ValueError(f"Invalid pattern: {e}") from e
+        elif text:
+            self.needle = text.lower()
+
+    @property
+    def active(self):
+        return bool(self.level or self.stream or self.text)
+
+    def levels(self):
+        """Return the levels at or above the minimum level"""
+        return LEVELS[LEVELS.index(self.level):] if self.level else LEVELS
+
+
+class _Chunk:
+    """Up to CHUNK_LINES consecutive lines with their posting lists and folded text"""
+
+    def __init__(self, first_seq):
+        self.first_seq = first_seq
+        self.lines = []
+        self.postings = {}
+        self._folded = None
+        self._offsets = None
+
+    def add(self, line, level, stream):
+        index = len(self.lines)
+        self.lines.append(line)
+        self.postings.setdefault(level, []).append(index)
+        self.postings.setdefault(stream, []).append(index)
+        self._folded = None
+
+    def folded(self):
+        """Return the lower-cased chunk text and the offset of each line in it (built once)"""
+        if self._folded is None:
+            # Lower-casing can change a line's length ("İ"), so measure the folded lines
+            folded = [line.lower() for line in self.lines]
+            offsets = []
+            position = 0
+            for line in folded:
+                offsets.append(position)
+                position += len(line) + 1
+            self._folded = "\n".join(folded)
+            self._offsets = offsets
+        return self._folded, self._offsets
+
+    def candidates(self, log_filter):
+        """Return the sorted local indexes allowed by level/stream, or None for all"""
+        result = None
+        if log_filter.level:
+            merged = []
+            for level in log_filter.levels():
+                merged.extend(self.postings.get(level, ()))
+            result = sorted(merged)
+        if log_filter.stream:
+            stream = self.postings.get(log_filter.stream, ())
+            result = stream if result is None else sorted(set(result).intersection(stream))
+        return result
+
+    def text_hits(self, log_filter):
+        """Return the sorted local indexes of lines matching the filter text"""
+        folded, offsets = self.folded()
+        hits = []
+        if log_filter.needle is not None:
+            needle = log_filter.needle
+            position = folded.find(needle)
+            while position >= 0:
+                index = bisect_right(offsets, position) - 1
+                hits.append(index)
+                # Continue at the next line: one hit per line is enough
+                next_line = offsets[index + 1] if index + 1 < len(offsets) else len(folded)
+                position = folded.find(needle, next_line)
+        else:
+            pattern = log_filter.pattern
+            match = pattern.search(folded)
+            while match:
+                index = bisect_right(offsets, match.start()) - 1
+                hits.append(index)
+                next_line = offsets[index + 1] if index + 1 < len(offsets) else len(folded)
+                match = pattern.search(folded, next_line)
+        return hits
+
+    def matches(self, log_filter):
+        """Return the local indexes of the lines that pass the filter"""
+        allowed = self.candidates(log_filter)
+        if allowed is not None and not allowed:
+            return []
+        if not log_filter.text:
+            return range(len(self.lines)) if allowed is None else allowed
+        hits = self.text_hits(log_filter)
+        if allowed is None:
+            return hits
+        allowed = set(allowed)
+        return [index for index in hits if index in allowed]
+
+
+class LogIndex:
+    """Lines grouped into chunks with per-level and per-stream posting lists"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.chunks = deque()
+        self.total = 0
+
+    def add(self, line, stream):
+        chunks = self.chunks
+        if not chunks or len(chunks[-1].lines) >= CHUNK_LINES:
+            if chunks:
+                # Fold the finished chunk now so the first search does not pay for it
+                chunks[-1].folded()
+            chunks.append(_Chunk(self.total))
+            # Whole chunks fall out once every line in them is past capacity
+            while chunks[0].first_seq + CHUNK_LINES <= self.total - self.capacity:
+                chunks.popleft()
+        chunks[-1].add(line, classify(line), stream)
+        self.total += 1
+
+    def query(self, log_filter, since=0, limit=None):
+        """Return the newest matching lines (oldest first) with sequence number >= since"""
+        oldest = max(since, self.total - self.capacity)
+        found = []
+        for chunk in reversed(self.chunks):
+            if chunk.first_seq + len(chunk.lines) <= oldest:
+                break
+            skip = max(0, oldest - chunk.first_seq)
+            lines = chunk.lines
+            for index in reversed(chunk.matches(log_filter)):
+                if index < skip:
+                    break
+                found.append(lines[index])
+                if limit is not None and len(found) >= limit:
+                    found.reverse()
+                    return found
+        found.reverse()
+        return found
+
+
+class LogModel:
+    """Fixed-capacity ring buffer of log lines, safe to append to from any thread"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.lines = deque(maxlen=capacity)
+        self.index = LogIndex(capacity)
+        self.total = 0
+        self.dropped = 0
+        self._reported = 0
+        # More than a buffer's worth of queued lines could never be shown anyway
+        self._incoming = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def append(self, line, stream=LAUNCHER):
+        """Queue a line for the buffer (callable from any thread); when full the oldest queued line is dropped"""
+        with self._lock:
+            if len(self._incoming) == self._incoming.maxlen:
+                self.dropped += 1
+            self._incoming.append((line, stream))
+
+    def drain(self, limit=None):
+        """Move up to limit queued lines into the ring buffer and index, and return them (consumer side)"""
+        with self._lock:
+            incoming = self._incoming
+            count = len(incoming) if limit is None else min(limit, len(incoming))
+            items = [incoming.popleft() for _ in range(count)]
+            dropped, self._reported = self.dropped - self._reported, self.dropped
+        if dropped:
+            items.insert(0, (f"⚠️ {dropped:,} log lines dropped - the log view fell behind", LAUNCHER))
+
+        batch = []
+        add = self.index.add
+        for line, stream in items:
+            add(line, stream)
+            batch.append(line)
+
+        if batch:
+            self.lines.extend(batch)
+            self.total += len(batch)
+        return batch
+
+    def tail(self, count):
+        """Return the last count buffered lines"""
+        if count >= len(self.lines):
+            return list(self.lines)
+        return list(self.lines)[-count:]
+
+    def query(self, log_filter, since=0, limit=None):
+        """Return the newest buffered lines passing log_filter, oldest first"""
+        return self.index.query(log_filter, since, limit)
+
+
+class TkLogView:
+    """Flush a LogModel into a Tk Text widget at a capped frame rate, keeping the last N lines"""
+
+    def __init__(self, root, text_widget, model, max_lines=DEFAULT_VIEW_LINES, fps=DEFAULT_FPS,
+                 flush_lines=FLUSH_LINES):
+        self.root = root
+        self.text = text_widget
+        self.model = model
+        self.max_lines = max_lines
+        self.flush_lines = flush_lines
+        self.interval_ms = max(1, int(1000 / fps))
+        self.filter = LogFilter()
+        self._after_id = None
+
+    def start(self):
+        """Begin periodic flushing on the Tk main loop"""
+        if self._after_id is None:
+            self._after_id = self.root.after(0, self._tick)
+
+    def stop(self):
+        """Stop periodic flushing"""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _tick(self):
+        more = False
+        try:
+            more = self.flush()
+        finally:
+            # A backlog is worked off a frame at a time, with Tk events handled in between
+            self._after_id = self.root.after(0 if more else self.interval_ms, self._tick)
+
+    def set_filter(self, log_filter):
+        """Show only lines passing log_filter, re-rendering from the index"""
+        # One frame's worth; the scheduled flushes take the rest
+        self.model.drain(self.flush_lines)
+        self.filter = log_filter
+        if log_filter.active:
+            lines = self.model.query(log_filter, limit=self.max_lines)
+        else:
+            lines = self.model.tail(self.max_lines)
+        self.text.delete("1.0", "end")
+        if lines:
+            self.text.insert("end", "\n".join(lines) + "\n")
+        self.text.see("end")
+        return len(lines)
+
+    def flush(self):
+        """Render up to flush_lines of the lines queued since the last flush; returns True if more are queued"""
+        first_new = self.model.total
+        batch = self.model.drain(self.flush_lines)
+        more = len(batch) >= self.flush_lines
+        if batch and self.filter.active:
+            batch = self.model.query(self.filter, since=first_new, limit=self.max_lines)
+        if not batch:
+            return more
+
+        follow = self.text.yview()[1] >= 0.999
+
+        if len(batch) >= self.max_lines:
+            # The batch alone fills the view; replace everything
+            self.text.delete("1.0", "end")
+            batch = batch[-self.max_lines:]
+        self.text.insert("end", "\n".join(batch) + "\n")
+
+        # Trim from the top so the widget never holds more than max_lines
+        line_count = int(self.text.index("end-1c").split(".")[0]) - 1
+        excess = line_count - self.max_lines
+        if excess > 0:
+            self.text.delete("1.0", f"{excess + 1}.0")
+
+        if follow:
+            self.text.see("end")
+        return more
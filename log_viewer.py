@@ -0,0 +1,133 @@
+"""
+Window for browsing an app's on-disk log file.
+Shows one page of the file at a time through LogFileReader, so even
+multi-GB logs open instantly: jump to the tail, page back and forth and
+regex-search in either direction.
+"""
+
+import re
+import tkinter as tk
+from tkinter import messagebox
+
+from log_files import LogFileReader
+
+PAGE_LINES = 500
+
+
+class LogFileWindow:
+    """Toplevel viewer for one log file"""
+
+    def __init__(self, root, path, title=None):
+        self.reader = LogFileReader(path)
+        self.start = 0
+        self.end = 0
+        self.match = None
+        self.last_pattern = ""
+
+        self.window = tk.Toplevel(root)
+        self.window.title(title or f"Log - {path}")
+        self.window.geometry("900x600")
+
+        toolbar = tk.Frame(self.window, padx=10, pady=5)
+        toolbar.pack(fill="x")
+        for text, command in (
+            ("⏮ Older", self.show_older),
+            ("Newer ⏭", self.show_newer),
+            ("⏬ Tail", self.show_tail),
+        ):
+            tk.Button(toolbar, text=text, command=command, font=("Arial", 9)).pack(side="left", padx=2)
+
+        self.search_var = tk.StringVar()
+        search_entry = tk.Entry(toolbar, textvariable=self.search_var, font=("Arial", 10), width=30)
+        search_entry.pack(side="left", padx=(15, 2))
+        search_entry.bind("<Return>", lambda event: self.find(backwards=False))
+        tk.Button(toolbar, text="Find ↑", command=lambda: self.find(backwards=True),
+                  font=("Arial", 9)).pack(side="left", padx=2)
+        tk.Button(toolbar, text="Find ↓", command=lambda: self.find(backwards=False),
+                  font=("Arial", 9)).pack(side="left", padx=2)
+
+        self.position_label = tk.Label(toolbar, text="", font=("Arial", 9), fg="#555555")
+        self.position_label.pack(side="right")
+
+        self.text = tk.Text(self.window, font=("Consolas", 9), bg="#f5f5f5", fg="#333333", wrap="none")
+        scrollbar = tk.Scrollbar(self.window, command=self.text.yview)
+        self.text.config(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        self.text.pack(fill="both", expand=True)
+        self.text.tag_config("match", background="#fff59d")
+
+        self.show_tail()
+
+    def _show(self, lines, start, end, highlight_line=None):
+        self.start, self.end = start, end
+        self.text.config(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.insert("end", "\n".join(lines))
+        if highlight_line is not None:
+            row = f"{highlight_line + 1}"
+            self.text.tag_add("match", f"{row}.0", f"{row}.end")
+            self.text.see(f"{row}.0")
+        self.text.config(state="disabled")
+
+        size = self.reader.size()
+        percent = (end / size * 100) if size else 100
+        self.position_label.config(text=f"{start:,}-{end:,} of {size:,} bytes ({percent:.0f}%)")
+
+    def _read(self, action, *args):
+        try:
+            return action(*args)
+        except OSError as e:
+            messagebox.showerror("Log", f"Cannot read log file: {e}", parent=self.window)
+            return None
+
+    def show_tail(self):
+        result = self._read(self.reader.tail, PAGE_LINES)
+        if result:
+            lines, start = result
+            self._show(lines, start, self.reader.size())
+            self.text.see("end")
+
+    def show_older(self):
+        if self.start == 0:
+            return
+        result = self._read(self.reader.page_before, self.start, PAGE_LINES)
+        if result:
+            lines, start = result
+            self._show(lines, start, self.start)
+
+    def show_newer(self):
+        if self.end >= self.reader.size():
+            return self.show_tail()
+        result = self._read(self.reader.page_after, self.end, PAGE_LINES)
+        if result:
+            lines, end = result
+            self._show(lines, self.end, end)
+
+    def show_around(self, offset):
+        """Show the page around offset with that line highlighted"""
+        before = self._read(self.reader.page_before, offset, PAGE_LINES // 2)
+        after = self._read(self.reader.page_after, offset, PAGE_LINES // 2)
+        if before and after:
+            self._show(before[0] + after[0], before[1], after[1], highlight_line=len(before[0]))
+
+    def find(self, backwards=False):
+        pattern = self.search_var.get()
+        if not pattern:
+            return
+        if pattern != self.last_pattern:
+            self.match, self.last_pattern = None, pattern
+        if self.match is None:
+            origin = self.end if backwards else self.start
+        else:
+            # Continue from the matched line so a line is never found twice in a row
+            origin = self.match[0] if backwards else self.match[1] + 1
+        try:
+            result = self._read(self.reader.search, pattern, origin, backwards)
+        except re.error as e:
+            messagebox.showerror("Log", f"Invalid search pattern: {e}", parent=self.window)
+            return
+        if result is None:
+            self.position_label.config(text=f"'{pattern}' not found")
+            return
+        self.match = result[:2]
+        self.show_around(self.match[0])
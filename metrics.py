@@ -0,0 +1,235 @@
+"""
+Resource metrics for launched servers.
+Samples CPU, memory, threads, open files and child processes for each app's
+whole process tree from /proc, keeps a rolling history in array-backed ring
+buffers and exports the latest values as JSON or Prometheus text.
+"""
+
+import json
+import os
+import threading
+import time
+from array import array
+
+from config_store import atomic_write
+import process_control
+
+DEFAULT_INTERVAL = 2.0
+HISTORY_SIZE = 300
+
+FIELDS = ["cpu_percent", "rss_bytes", "threads", "fds", "children"]
+
+PROMETHEUS_HELP = {
+    "cpu_percent": ("gauge", "CPU usage of the app's process tree in percent of one core"),
+    "rss_bytes": ("gauge", "Resident memory of the app's process tree in bytes"),
+    "threads": ("gauge", "Threads in the app's process tree"),
+    "fds": ("gauge", "Open file descriptors in the app's process tree"),
+    "children": ("gauge", "Child processes of the app's main process"),
+}
+
+try:
+    CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+    PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    CLOCK_TICKS = 100
+    PAGE_SIZE = 4096
+
+
+def available():
+    """Return True if this platform exposes per-process stats in /proc"""
+    return os.path.isfile("/proc/self/stat")
+
+
+def read_process(pid):
+    """Return (cpu seconds, rss bytes, threads, fds) for one process, or None if it is gone"""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # Fields resume after the command name's closing parenthesis, starting at field 3 (state)
+    fields = stat[stat.rfind(b")") + 2:].split()
+    cpu = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+    threads = int(fields[17])
+    rss = int(fields[21]) * PAGE_SIZE
+    try:
+        fds = len(os.listdir(f"/proc/{pid}/fd"))
+    except OSError:
+        fds = 0
+    return cpu, rss, threads, fds
+
+
+class MetricsHistory:
+    """Fixed-size ring buffer of samples, one flat array per field"""
+
+    def __init__(self, size=HISTORY_SIZE):
+        self.size = size
+        self.times = array("d", bytes(8 * size))
+        self.values = {field: array("d", bytes(8 * size)) for field in FIELDS}
+        self.count = 0
+        self.peak = dict.fromkeys(FIELDS, 0.0)
+
+    def append(self, timestamp, sample):
+        index = self.count % self.size
+        self.times[index] = timestamp
+        for field in FIELDS:
+            value = sample[field]
+            self.values[field][index] = value
+            if value > self.peak[field]:
+                self.peak[field] = value
+        self.count += 1
+
+    def latest(self):
+        """Return the newest sample as a dict, or None"""
+        if not self.count:
+            return None
+        index = (self.count - 1) % self.size
+        return {field: self.values[field][index] for field in FIELDS}
+
+    def series(self, field):
+        """Return [(timestamp, value), ...] for field, oldest first"""
+        length = min(self.count, self.size)
+        start = self.count - length
+        return [(self.times[i % self.size], self.values[field][i % self.size])
+                for i in range(start, self.count)]
+
+
+class AppMetrics:
+    """Sampling state for one app's process tree"""
+
+    def __init__(self, history_size=HISTORY_SIZE):
+        self.history = MetricsHistory(history_size)
+        self.pid = None
+        self.last_cpu = None
+        self.last_time = None
+
+    def sample(self, pid, children, now):
+        """Take a sample of pid's tree; returns the sample dict, or None if pid is gone"""
+        tree = process_control.descendants(pid, children)
+        totals = [0.0, 0, 0, 0]
+        seen = False
+        for member in [pid] + tree:
+            stats = read_process(member)
+            if stats is None:
+                continue
+            seen = True
+            for i, value in enumerate(stats):
+                totals[i] += value
+        if not seen:
+            return None
+
+        cpu_seconds, rss, threads, fds = totals
+        cpu_percent = 0.0
+        if pid == self.pid and self.last_time is not None and now > self.last_time:
+            # Clamp: CPU time of children that exited between samples disappears from the total
+            cpu_percent = max(0.0, (cpu_seconds - self.last_cpu) / (now - self.last_time) * 100)
+        self.pid, self.last_cpu, self.last_time = pid, cpu_seconds, now
+
+        sample = {"cpu_percent": cpu_percent, "rss_bytes": rss, "threads": threads,
+                  "fds": fds, "children": len(tree)}
+        self.history.append(time.time(), sample)
+        return sample
+
+
+class MetricsSampler:
+    """Background sampler for every running app of a supervisor"""
+
+    def __init__(self, supervisor, interval=DEFAULT_INTERVAL, history_size=HISTORY_SIZE):
+        self.supervisor = supervisor
+        self.interval = interval
+        self.history_size = history_size
+        self.apps = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start sampling in a daemon thread (no-op if disabled or unsupported)"""
+        if self._thread or self.interval <= 0 or not available():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample_once()
+            except Exception as e:
+                print(f"Error sampling metrics: {e}")
+
+    def sample_once(self):
+        """Sample every running app once"""
+        running = [(app.name, app.process.pid) for app in list(self.supervisor.apps.values())
+                   if app.is_running and app.process is not None]
+        children = process_control.children_map() if running else {}
+        now = time.monotonic()
+        with self._lock:
+            for name in list(self.apps):
+                if name not in self.supervisor.apps:
+                    del self.apps[name]
+            for name, pid in running:
+                metrics = self.apps.get(name)
+                if metrics is None:
+                    metrics = self.apps[name] = AppMetrics(self.history_size)
+                metrics.sample(pid, children, now)
+
+    def current(self, name):
+        """Return (latest sample, peaks) for an app, or (None, None)"""
+        with self._lock:
+            metrics = self.apps.get(name)
+            if metrics is None:
+                return None, None
+            return metrics.history.latest(), dict(metrics.history.peak)
+
+    def to_dict(self):
+        """Return current and peak values for every sampled app"""
+        with self._lock:
+            return {
+                name: {"pid": metrics.pid, "current": metrics.history.latest(),
+                       "peak": dict(metrics.history.peak)}
+                for name, metrics in self.apps.items()
+            }
+
+    def to_json(self):
+        return json.dumps({"time": time.time(), "apps": self.to_dict()}, indent=2)
+
+    def to_prometheus(self):
+        """Return the latest values in the Prometheus text exposition format"""
+        data = self.to_dict()
+        lines = []
+        for field in FIELDS:
+            metric_type, help_text = PROMETHEUS_HELP[field]
+            for suffix, key in (("", "current"), ("_peak", "peak")):
+                metric = f"launcher_app_{field}{suffix}"
+                lines.append(f"# HELP {metric} {help_text}{' (peak)' if suffix else ''}")
+                lines.append(f"# TYPE {metric} {metric_type}")
+                for name, values in data.items():
+                    if values[key] is None:
+                        continue
+                    label = name.replace("\\", "\\\\").replace('"', '\\"')
+                    value = values[key][field]
+                    value = int(value) if value.is_integer() else round(value, 3)
+                    lines.append(f'{metric}{{app="{label}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, path):
+        """Write the metrics to path: Prometheus text for .prom/.txt, otherwise JSON"""
+        text = self.to_prometheus() if path.endswith((".prom", ".txt")) else self.to_json()
+        atomic_write(path, text)
+
+
+def format_metrics(sample, peak):
+    """Return a one-line summary of current and peak values"""
+    if sample is None:
+        return "Resources: no samples yet"
+    return (f"CPU {sample['cpu_percent']:.1f}% (peak {peak['cpu_percent']:.1f}%)  ·  "
+            f"RSS {sample['rss_bytes'] / 1048576:.1f} MB (peak {peak['rss_bytes'] / 1048576:.1f} MB)  ·  "
+            f"threads {sample['threads']:.0f}  ·  FDs {sample['fds']:.0f}  ·  "
+            f"children {sample['children']:.0f}")
@@ -0,0 +1,233 @@
+"""
+Non-blocking output streaming for server processes.
+The launcher's event loop drains stdout and stderr of every watched process
+at the same time, splits the bytes into lines and hands each line, tagged
+with its stream, to a callback. Servers that write to capture files instead
+of pipes (so they can outlive the launcher) are followed by a polling timer.
+"""
+
+import os
+import threading
+
+STDOUT = "stdout"
+STDERR = "stderr"
+
+READ_SIZE = 65536
+MAX_LINE_LENGTH = 65536
+EXIT_POLL_INTERVAL = 0.1
+FOLLOW_INTERVAL = 0.1
+
+
+class LineSplitter:
+    """Split a byte stream into decoded lines, keeping partial lines between reads"""
+
+    def __init__(self, encoding="utf-8"):
+        self.encoding = encoding
+        self._pending = b""
+
+    def feed(self, data):
+        """Add a chunk of bytes and return the complete lines it finished"""
+        if self._pending:
+            data = self._pending + data
+        lines = data.split(b"\n")
+        self._pending = lines.pop()
+
+        # Never hold on to an unterminated line forever
+        if len(self._pending) > MAX_LINE_LENGTH:
+            lines.append(self._pending)
+            self._pending = b""
+
+        return [self._decode(line) for line in lines]
+
+    @property
+    def pending_bytes(self):
+        """Bytes of an unfinished line held back from the last feed"""
+        return len(self._pending)
+
+    def flush(self):
+        """Return the trailing partial line (if any) at end of stream"""
+        if not self._pending:
+            return []
+        line, self._pending = self._pending, b""
+        return [self._decode(line)]
+
+    def _decode(self, raw):
+        if raw.endswith(b"\r"):
+            raw = raw[:-1]
+        return raw.decode(self.encoding, errors="replace")
+
+
+class _Watch:
+    """Bookkeeping for one watched process"""
+
+    def __init__(self, process, on_line, on_exit, open_streams):
+        self.process = process
+        self.on_line = on_line
+        self.on_exit = on_exit
+        self.open_streams = open_streams
+        self.captures = []
+
+    def emit(self, stream, lines):
+        for line in lines:
+            try:
+                self.on_line(stream, line)
+            except Exception as e:
+                print(f"Error handling server output: {e}")
+
+    def offsets(self):
+        """Return {stream: bytes consumed} for followed capture files"""
+        return {capture.stream: capture.offset for capture in self.captures}
+
+    def finish(self, returncode):
+        if self.on_exit is None:
+            return
+        try:
+            self.on_exit(returncode)
+        except Exception as e:
+            print(f"Error handling server exit: {e}")
+
+
+class _Capture:
+    """A capture file being followed from a byte offset"""
+
+    def __init__(self, stream, path, offset, encoding):
+        self.stream = stream
+        self.path = path
+        self.file = open(path, "rb")
+        self.file.seek(offset)
+        self.offset = offset
+        self.splitter = LineSplitter(encoding)
+
+    def read(self, watch):
+        while True:
+            data = self.file.read(READ_SIZE)
+            if not data:
+                break
+            watch.emit(self.stream, self.splitter.feed(data))
+            # Only count complete lines, so a resumed follow starts at a line boundary
+            self.offset = self.file.tell() - self.splitter.pending_bytes
+
+
+class OutputPump:
+    """Drain the output pipes of any number of processes without per-line sleeps.
+
+    On POSIX every pipe is a reader on the launcher's event loop, and capture
+    files are followed by a timer on the same loop. Windows cannot select on
+    pipes, so there each pipe gets a blocking reader thread instead.
+    """
+
+    def __init__(self, events, encoding="utf-8"):
+        self.events = events
+        self.encoding = encoding
+        self._lock = threading.Lock()
+        self._following = []
+        self._follow_timer = None
+        self._use_readers = os.name != "nt"
+
+    def watch(self, process, on_line, on_exit=None):
+        """Stream process output to on_line(stream, line); call on_exit(returncode) when it ends"""
+        streams = [(name, pipe) for name, pipe in ((STDOUT, process.stdout), (STDERR, process.stderr))
+                   if pipe is not None]
+        watch = _Watch(process, on_line, on_exit, len(streams))
+
+        if not self._use_readers:
+            for name, pipe in streams:
+                threading.Thread(target=self._read_blocking, args=(watch, name, pipe), daemon=True).start()
+            if not streams:
+                threading.Thread(target=self._wait_blocking, args=(watch,), daemon=True).start()
+            return watch
+
+        self.events.call_soon(self._register, watch, streams)
+        return watch
+
+    def follow(self, process, captures, on_line, on_exit=None):
+        """Like watch, for a process writing to files: captures is [(stream, path, offset), ...].
+
+        Returns a handle whose offsets() say how far each file has been read.
+        """
+        watch = _Watch(process, on_line, on_exit, len(captures))
+        watch.captures = [_Capture(stream, path, offset, self.encoding) for stream, path, offset in captures]
+        self.events.call_soon(self._add_follow, watch)
+        return watch
+
+    def _add_follow(self, watch):
+        self._following.append(watch)
+        if self._follow_timer is None:
+            self._follow_tick()
+
+    def _follow_tick(self):
+        for watch in list(self._following):
+            # Check for exit first so output written just before it is still read
+            returncode = watch.process.poll()
+            for capture in watch.captures:
+                try:
+                    capture.read(watch)
+                except OSError as e:
+                    print(f"Error reading server output: {e}")
+            if returncode is None:
+                continue
+            for capture in watch.captures:
+                watch.emit(capture.stream, capture.splitter.flush())
+                capture.file.close()
+            self._following.remove(watch)
+            watch.finish(returncode)
+        self._follow_timer = (self.events.loop.call_later(FOLLOW_INTERVAL, self._follow_tick)
+                              if self._following else None)
+
+    def _register(self, watch, streams):
+        for name, pipe in streams:
+            fd = pipe.fileno()
+            os.set_blocking(fd, False)
+            self.events.loop.add_reader(fd, self._on_readable, watch, name, pipe, LineSplitter(self.encoding))
+        if not streams:
+            self._check_exit(watch)
+
+    def _on_readable(self, watch, stream, pipe, splitter):
+        fd = pipe.fileno()
+        try:
+            data = os.read(fd, READ_SIZE)
+        except BlockingIOError:
+            return
+        except OSError:
+            data = b""
+
+        if data:
+            watch.emit(stream, splitter.feed(data))
+            return
+        watch.emit(stream, splitter.flush())
+        self.events.loop.remove_reader(fd)
+        pipe.close()
+        watch.open_streams -= 1
+        if watch.open_streams == 0:
+            self._check_exit(watch)
+
+    def _check_exit(self, watch):
+        # Pipes can close before the process is reaped; poll without blocking the loop
+        returncode = watch.process.poll()
+        if returncode is None:
+            self.events.loop.call_later(EXIT_POLL_INTERVAL, self._check_exit, watch)
+        else:
+            watch.finish(returncode)
+
+    def _read_blocking(self, watch, stream, pipe):
+        splitter = LineSplitter(self.encoding)
+        fd = pipe.fileno()
+        try:
+            while True:
+                data = os.read(fd, READ_SIZE)
+                if not data:
+                    break
+                watch.emit(stream, splitter.feed(data))
+        except OSError:
+            pass
+        watch.emit(stream, splitter.flush())
+        pipe.close()
+
+        with self._lock:
+            watch.open_streams -= 1
+            last = watch.open_streams == 0
+        if last:
+            self._wait_blocking(watch)
+
+    def _wait_blocking(self, watch):
+        watch.finish(watch.process.wait())
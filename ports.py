@@ -0,0 +1,131 @@
+"""
+Port allocation and discovery for launched servers.
+Checks whether a port is free before spawning, picks a free one from a
+range when the preferred port is taken, and finds the ports a process tree
+is actually listening on.
+"""
+
+import os
+import socket
+import subprocess
+
+DEFAULT_PORT_RANGE = (5000, 5999)
+
+TCP_LISTEN = "0A"
+
+
+def is_port_free(host, port):
+    """Return True if nothing is bound to host:port"""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        if os.name != "nt":
+            # Match what servers do, so ports lingering in TIME_WAIT count as free
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            sock.bind((host, port))
+        except OSError:
+            return False
+    return True
+
+
+def find_free_port(host, preferred, port_range=DEFAULT_PORT_RANGE, exclude=()):
+    """Return preferred if it is free, else the first free port in port_range (or None)"""
+    if preferred not in exclude and is_port_free(host, preferred):
+        return preferred
+    low, high = port_range
+    for port in range(low, high + 1):
+        if port != preferred and port not in exclude and is_port_free(host, port):
+            return port
+    return None
+
+
+def _socket_inodes(pid):
+    inodes = set()
+    try:
+        entries = os.listdir(f"/proc/{pid}/fd")
+    except OSError:
+        return inodes
+    for entry in entries:
+        try:
+            target = os.readlink(f"/proc/{pid}/fd/{entry}")
+        except OSError:
+            continue
+        if target.startswith("socket:["):
+            inodes.add(target[8:-1])
+    return inodes
+
+
+def _listening_linux(pids):
+    inodes = set()
+    for pid in pids:
+        inodes |= _socket_inodes(pid)
+    if not inodes:
+        return set()
+
+    ports = set()
+    for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(table) as f:
+                next(f)
+                for line in f:
+                    fields = line.split()
+                    if fields[3] == TCP_LISTEN and fields[9] in inodes:
+                        ports.add(int(fields[1].rsplit(":", 1)[1], 16))
+        except (OSError, StopIteration):
+            continue
+    return ports
+
+
+def _listening_netstat(pids):
+    """Windows: parse `netstat -ano` for LISTENING sockets owned by pids"""
+    try:
+        output = subprocess.run(["netstat", "-ano", "-p", "TCP"], capture_output=True,
+                                text=True, timeout=5).stdout
+    except (OSError, subprocess.SubprocessError):
+        return set()
+    wanted = {str(pid) for pid in pids}
+    ports = set()
+    for line in output.splitlines():
+        fields = line.split()
+        if len(fields) >= 5 and fields[3] == "LISTENING" and fields[4] in wanted:
+            ports.add(int(fields[1].rsplit(":", 1)[1]))
+    return ports
+
+
+def _listening_lsof(pids):
+    try:
+        output = subprocess.run(["lsof", "-nP", "-a", "-iTCP", "-sTCP:LISTEN", "-Fn",
+                                 "-p", ",".join(str(pid) for pid in pids)],
+                                capture_output=True, text=True, timeout=5).stdout
+    except (OSError, subprocess.SubprocessError):
+        return set()
+    ports = set()
+    for line in output.splitlines():
+        if line.startswith("n") and ":" in line:
+            port = line.rsplit(":", 1)[1]
+            if port.isdigit():
+                ports.add(int(port))
+    return ports
+
+
+def listening_ports(pids):
+    """Return the TCP ports any of pids is listening on"""
+    pids = list(pids)
+    if not pids:
+        return set()
+    if os.path.isdir("/proc/net"):
+        return _listening_linux(pids)
+    if os.name == "nt":
+        return _listening_netstat(pids)
+    return _listening_lsof(pids)
+
+
+def parse_port_range(value):
+    """Parse a config port range ("5000-5099" or [5000, 5099])"""
+    if not value:
+        return DEFAULT_PORT_RANGE
+    if isinstance(value, str):
+        low, _, high = value.partition("-")
+        return int(low), int(high or low)
+    low, high = value
+    return int(low), int(high)
@@ -0,0 +1,312 @@
+"""
+Process-tree spawning and shutdown for launched servers.
+Servers are started in their own session (POSIX) or process group (Windows)
+so a stop reaches the shell, the real server and any workers it forked.
+"""
+
+import asyncio
+import os
+import signal
+import subprocess
+import time
+
+DEFAULT_GRACE = 5.0
+POLL_INTERVAL = 0.02
+# Exit status reported for reattached processes, whose real status cannot be collected
+UNKNOWN_EXIT = 1
+
+
+def spawn(command, cwd, env=None, stdout=subprocess.PIPE, stderr=subprocess.PIPE, creationflags=0, hold=False):
+    """Start command through the shell in a new session / process group.
+
+    creationflags (Windows) are added to the process group flag. With hold
+    (POSIX) the shell waits for release() before running command, so settings
+    applied to the shell in the meantime reach everything it starts.
+    """
+    kwargs = {}
+    if os.name == "nt":
+        kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP | creationflags
+    else:
+        kwargs["start_new_session"] = True
+        if hold:
+            # The server then sees end-of-file on stdin
+            command = "read _; " + command
+            kwargs["stdin"] = subprocess.PIPE
+
+    return subprocess.Popen(
+        command,
+        shell=True,
+        cwd=cwd,
+        env=env,
+        stdout=stdout,
+        stderr=stderr,
+        **kwargs
+    )
+
+
+def release(process):
+    """Let a shell started with hold run its command"""
+    if process.stdin is not None:
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+
+
+def _start_time_windows(pid):
+    """Windows: creation time of a live process, or None"""
+    import ctypes
+    from ctypes import wintypes
+
+    kernel32 = ctypes.windll.kernel32
+    kernel32.OpenProcess.restype = wintypes.HANDLE
+    handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+    if not handle:
+        return None
+    try:
+        exit_code = wintypes.DWORD()
+        if not kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code)) or exit_code.value != 259:
+            return None  # 259 is STILL_ACTIVE
+        times = [wintypes.FILETIME() for _ in range(4)]
+        if not kernel32.GetProcessTimes(handle, *[ctypes.byref(t) for t in times]):
+            return None
+        return (times[0].dwHighDateTime << 32) | times[0].dwLowDateTime
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def process_start_time(pid):
+    """Return an opaque start-time stamp for a live process, or None if it is gone.
+
+    Comparing stamps tells a process apart from a later one that reused its pid.
+    """
+    if os.name == "nt":
+        return _start_time_windows(pid)
+    if not _alive(pid):
+        return None
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            stat = f.read()
+        return int(stat[stat.rfind(b")") + 2:].split()[19])
+    except OSError:
+        pass
+    try:
+        output = subprocess.run(["ps", "-o", "lstart=", "-p", str(pid)],
+                                capture_output=True, text=True, timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return output or None
+
+
+class AttachedProcess:
+    """Popen-like handle for a server started by an earlier launcher run"""
+
+    def __init__(self, pid, start_time):
+        self.pid = pid
+        self.start_time = start_time
+        self.returncode = None
+        self.stdout = None
+        self.stderr = None
+
+    def poll(self):
+        if self.returncode is None and process_start_time(self.pid) != self.start_time:
+            self.returncode = UNKNOWN_EXIT
+        return self.returncode
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.poll() is None:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise subprocess.TimeoutExpired(str(self.pid), timeout)
+            time.sleep(POLL_INTERVAL)
+        return self.returncode
+
+    def send_signal(self, sig):
+        if self.poll() is None:
+            os.kill(self.pid, sig)
+
+
+def _parent_map_windows():
+    """Windows: walk a Toolhelp snapshot for {pid: ppid}"""
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESSENTRY32(ctypes.Structure):
+        _fields_ = [
+            ("dwSize", wintypes.DWORD),
+            ("cntUsage", wintypes.DWORD),
+            ("th32ProcessID", wintypes.DWORD),
+            ("th32DefaultHeapID", ctypes.c_void_p),
+            ("th32ModuleID", wintypes.DWORD),
+            ("cntThreads", wintypes.DWORD),
+            ("th32ParentProcessID", wintypes.DWORD),
+            ("pcPriClassBase", wintypes.LONG),
+            ("dwFlags", wintypes.DWORD),
+            ("szExeFile", ctypes.c_char * 260),
+        ]
+
+    kernel32 = ctypes.windll.kernel32
+    kernel32.CreateToolhelp32Snapshot.restype = wintypes.HANDLE
+    snapshot = kernel32.CreateToolhelp32Snapshot(0x2, 0)  # TH32CS_SNAPPROCESS
+    parents = {}
+    entry = PROCESSENTRY32()
+    entry.dwSize = ctypes.sizeof(PROCESSENTRY32)
+    try:
+        ok = kernel32.Process32First(snapshot, ctypes.byref(entry))
+        while ok:
+            parents[entry.th32ProcessID] = entry.th32ParentProcessID
+            ok = kernel32.Process32Next(snapshot, ctypes.byref(entry))
+    finally:
+        kernel32.CloseHandle(snapshot)
+    return parents
+
+
+def _parent_map():
+    """Return {pid: ppid} for every process on the system"""
+    parents = {}
+    if os.name == "nt":
+        return _parent_map_windows()
+    if os.path.isdir("/proc"):
+        for entry in os.scandir("/proc"):
+            if not entry.name.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry.name}/stat", "rb") as f:
+                    stat = f.read()
+            except OSError:
+                continue
+            # The command name may contain spaces or parentheses; fields resume after the last ')'
+            fields = stat[stat.rfind(b")") + 2:].split()
+            parents[int(entry.name)] = int(fields[1])
+        return parents
+
+    try:
+        output = subprocess.run(["ps", "-A", "-o", "pid=", "-o", "ppid="],
+                                capture_output=True, text=True, timeout=5).stdout
+    except (OSError, subprocess.SubprocessError):
+        return parents
+    for line in output.splitlines():
+        parts = line.split()
+        if len(parts) == 2:
+            parents[int(parts[0])] = int(parts[1])
+    return parents
+
+
+def children_map():
+    """Return {ppid: [child pids]} for every process on the system"""
+    children = {}
+    for child, parent in _parent_map().items():
+        children.setdefault(parent, []).append(child)
+    return children
+
+
+def descendants(pid, children=None):
+    """Return the pids of every descendant of pid (children: a reusable children_map())"""
+    if children is None:
+        children = children_map()
+
+    found = []
+    stack = [pid]
+    while stack:
+        for child in children.get(stack.pop(), ()):
+            found.append(child)
+            stack.append(child)
+    return found
+
+
+def _alive(pid):
+    """Return True if pid exists and is not a zombie"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            stat = f.read()
+        return stat[stat.rfind(b")") + 2:stat.rfind(b")") + 3] != b"Z"
+    except OSError:
+        return True
+
+
+def _signal_tree(pgid, pids, sig):
+    try:
+        os.killpg(pgid, sig)
+    except OSError:
+        pass
+    for pid in pids:
+        try:
+            os.kill(pid, sig)
+        except OSError:
+            pass
+
+
+async def _wait_gone(process, pids, deadline):
+    """Wait until process has exited and pids are gone; return True if they all did"""
+    while True:
+        process.poll()
+        remaining = [pid for pid in pids if _alive(pid)]
+        if process.returncode is not None and not remaining:
+            return True
+        if time.monotonic() >= deadline:
+            return False
+        await asyncio.sleep(POLL_INTERVAL)
+
+
+def kill_orphans(process):
+    """Kill whatever is left in an exited server's process group"""
+    if os.name == "nt":
+        return
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except OSError:
+        pass
+
+
+def _terminate_windows(process, grace):
+    """Windows: CTRL_BREAK to the process group, then taskkill the whole tree"""
+    if process.poll() is not None:
+        return False
+    try:
+        process.send_signal(signal.CTRL_BREAK_EVENT)
+    except OSError:
+        pass
+    try:
+        process.wait(timeout=grace)
+        return False
+    except subprocess.TimeoutExpired:
+        subprocess.run(["taskkill", "/PID", str(process.pid), "/T", "/F"], capture_output=True)
+        process.wait()
+        return True
+
+
+async def terminate_tree(process, grace=DEFAULT_GRACE, executor=None):
+    """Stop process and all its descendants, escalating to a hard kill after grace seconds.
+
+    A coroutine: the grace period is awaited, and the blocking steps (process
+    table scans, taskkill) run on executor.
+    Returns (seconds taken, True if the hard kill was needed).
+    """
+    loop = asyncio.get_running_loop()
+    started = time.monotonic()
+    if os.name == "nt":
+        forced = await loop.run_in_executor(executor, _terminate_windows, process, grace)
+        return time.monotonic() - started, forced
+
+    # Snapshot the tree first: workers that left the process group are still found by ancestry
+    tree = await loop.run_in_executor(executor, descendants, process.pid)
+    pids = [process.pid] + tree
+
+    _signal_tree(process.pid, pids, signal.SIGTERM)
+    forced = False
+    if not await _wait_gone(process, tree, started + grace):
+        forced = True
+        later = await loop.run_in_executor(executor, descendants, process.pid)
+        survivors = [pid for pid in pids + later if _alive(pid)]
+        _signal_tree(process.pid, survivors, signal.SIGKILL)
+        await _wait_gone(process, tree, time.monotonic() + grace)
+
+    # Reaped by _wait_gone; never block the loop on a process that will not die
+    process.poll()
+    return time.monotonic() - started, forced
@@ -0,0 +1,205 @@
+"""
+Project type detection for app folders.
+Scans a folder once with os.scandir, recognises the ways a project can be
+started (start scripts, Procfile, package.json scripts, Django, plain app.py,
+docker-compose) and ranks them. Results are cached on the folder's mtime so
+repeated launches and checks do not touch the disk again.
+"""
+
+import json
+import os
+import shlex
+import shutil
+import sys
+import threading
+
+# Start scripts in order of preference; the extension native to this OS wins
+SCRIPT_NAMES = ["start", "run", "server", "app"]
+NATIVE_EXTENSIONS = (".bat", ".cmd") if os.name == "nt" else (".sh",)
+FOREIGN_EXTENSIONS = (".sh",) if os.name == "nt" else (".bat", ".cmd")
+
+PACKAGE_SCRIPTS = ["start", "dev", "serve"]
+COMPOSE_FILES = ["docker-compose.yml", "docker-compose.yaml", "compose.yml", "compose.yaml"]
+
+# Base scores per kind; higher is preferred
+SCORE_SCRIPT = 100
+SCORE_PROCFILE = 80
+SCORE_PACKAGE = 70
+SCORE_MANAGE = 60
+SCORE_APP = 50
+SCORE_COMPOSE = 40
+# Scripts for the other OS (start.bat on Linux) rarely run here; last resort only
+SCORE_FOREIGN_SCRIPT = 10
+
+
+class Candidate:
+    """One way of starting the project in a folder"""
+
+    def __init__(self, kind, command, source, score):
+        self.kind = kind
+        self.command = command
+        self.source = source
+        self.score = score
+
+    def __repr__(self):
+        return f"Candidate({self.kind!r}, {self.command!r}, score={self.score})"
+
+
+def quote(path):
+    """Quote a path for the shell commands are run through"""
+    return f'"{path}"' if os.name == "nt" else shlex.quote(path)
+
+
+def python_command():
+    """Return the quoted Python interpreter for app.py / manage.py projects"""
+    if getattr(sys, "frozen", False):
+        # A PyInstaller build's sys.executable is the launcher itself
+        found = shutil.which("python3") or shutil.which("python")
+        return quote(found) if found else "python"
+    return quote(sys.executable)
+
+
+def script_command(path):
+    """Return the shell command line that runs a start script"""
+    # Run shell scripts through bash so they need no exec bit
+    if path.endswith(".sh"):
+        return f"bash {quote(path)}"
+    return quote(path)
+
+
+def _script_candidates(folder, files):
+    candidates = []
+    for rank, base in enumerate(SCRIPT_NAMES):
+        for extensions, score in ((NATIVE_EXTENSIONS, SCORE_SCRIPT), (FOREIGN_EXTENSIONS, SCORE_FOREIGN_SCRIPT)):
+            for extension in extensions:
+                name = base + extension
+                if name in files:
+                    candidates.append(Candidate("script", script_command(os.path.join(folder, name)), name,
+                                                score - rank))
+    return candidates
+
+
+def _read_procfile(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                process_type, _, command = line.partition(":")
+                if process_type.strip() == "web" and command.strip():
+                    return command.strip()
+    except OSError as e:
+        print(f"Error reading Procfile: {e}")
+    return None
+
+
+def _read_package_scripts(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            scripts = json.load(f).get("scripts") or {}
+    except (OSError, ValueError, AttributeError) as e:
+        print(f"Error reading package.json: {e}")
+        return {}
+    return scripts if isinstance(scripts, dict) else {}
+
+
+def scan_folder(folder):
+    """Scan folder and return its start candidates, best first"""
+    files = set()
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.is_file():
+                files.add(entry.name)
+
+    candidates = _script_candidates(folder, files)
+
+    if "Procfile" in files:
+        command = _read_procfile(os.path.join(folder, "Procfile"))
+        if command:
+            candidates.append(Candidate("procfile", command, "Procfile", SCORE_PROCFILE))
+
+    if "package.json" in files:
+        scripts = _read_package_scripts(os.path.join(folder, "package.json"))
+        for rank, name in enumerate(PACKAGE_SCRIPTS):
+            if name in scripts:
+                command = "npm start" if name == "start" else f"npm run {name}"
+                candidates.append(Candidate("package.json", command, f"package.json ({name})",
+                                            SCORE_PACKAGE - rank))
+
+    if "manage.py" in files:
+        candidates.append(Candidate("django", f"{python_command()} manage.py runserver", "manage.py", SCORE_MANAGE))
+
+    if "app.py" in files:
+        candidates.append(Candidate("python", f"{python_command()} app.py", "app.py", SCORE_APP))
+
+    for rank, name in enumerate(COMPOSE_FILES):
+        if name in files:
+            candidates.append(Candidate("docker-compose", "docker compose up", name, SCORE_COMPOSE - rank))
+            break
+
+    candidates.sort(key=lambda candidate: candidate.score, reverse=True)
+    return candidates
+
+
+# Files whose contents feed the result; editing them in place does not change the folder mtime
+CONTENT_FILES = ["Procfile", "package.json"]
+
+
+def _cache_key(folder):
+    key = [os.stat(folder).st_mtime_ns]
+    for name in CONTENT_FILES:
+        try:
+            key.append(os.stat(os.path.join(folder, name)).st_mtime_ns)
+        except OSError:
+            key.append(None)
+    return tuple(key)
+
+
+class ProjectIndex:
+    """Cache of scan results keyed on folder (and manifest) mtimes"""
+
+    def __init__(self):
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def candidates(self, folder):
+        """Return the ranked start candidates for folder ([] if it cannot be read)"""
+        folder = os.path.abspath(folder)
+        try:
+            key = _cache_key(folder)
+        except OSError:
+            return []
+
+        with self._lock:
+            cached = self._cache.get(folder)
+        if cached and cached[0] == key:
+            return cached[1]
+
+        try:
+            result = scan_folder(folder)
+        except OSError as e:
+            print(f"Error scanning {folder}: {e}")
+            return []
+        with self._lock:
+            self._cache[folder] = (key, result)
+        return result
+
+    def best(self, folder):
+        """Return the preferred start candidate for folder, or None"""
+        candidates = self.candidates(folder)
+        return candidates[0] if candidates else None
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+_index = ProjectIndex()
+
+
+def detect(folder):
+    """Return the ranked start candidates for folder using the shared cache"""
+    return _index.candidates(folder)
+
+
+def best_candidate(folder):
+    """Return the preferred way to start the project in folder, or None"""
+    return _index.best(folder)
@@ -0,0 +1,115 @@
+"""
+Readiness probing for launched web servers.
+Polls the target with a TCP connect, then an optional HTTP GET on a health
+path, backing off between attempts until the server answers or time runs out.
+The probes are coroutines, so any number of them share the launcher's event loop.
+"""
+
+import asyncio
+import inspect
+import time
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_TIMEOUT = 60.0
+
+# Backoff between probe attempts (seconds)
+INITIAL_DELAY = 0.02
+MAX_DELAY = 0.25
+BACKOFF_FACTOR = 1.5
+
+
+async def _connect(host, port, timeout):
+    return await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+
+
+def _close(writer):
+    try:
+        writer.close()
+    except OSError:
+        pass
+
+
+async def tcp_ready(host, port, timeout=0.5):
+    """Return True if a TCP connection to host:port succeeds"""
+    try:
+        _, writer = await _connect(host, port, timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    _close(writer)
+    return True
+
+
+async def http_ready(host, port, path, timeout=2.0, max_status=499):
+    """Return True if GET path answers with a status no higher than max_status"""
+    if not path.startswith("/"):
+        path = "/" + path
+    writer = None
+    try:
+        reader, writer = await _connect(host, port, timeout)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nConnection: close\r\n\r\n"
+                     .encode("latin-1"))
+        status_line = await asyncio.wait_for(reader.readline(), timeout)
+        parts = status_line.split()
+        return len(parts) >= 2 and parts[0].startswith(b"HTTP/") and int(parts[1]) <= max_status
+    except (OSError, ValueError, asyncio.TimeoutError):
+        return False
+    finally:
+        if writer is not None:
+            _close(writer)
+
+
+async def probe_once(host, port, health_path=None):
+    """Run a single readiness check (TCP, then HTTP if a health path is set)"""
+    if not await tcp_ready(host, port):
+        return False
+    if health_path:
+        return await http_ready(host, port, health_path)
+    return True
+
+
+async def probe_alive(host, port, health_path=None, timeout=2.0):
+    """Liveness check: the server must actually answer an HTTP request.
+
+    A stopped or deadlocked process still completes TCP handshakes from the
+    listen backlog, so a bare connect is not enough. Without a health path
+    any HTTP response at all counts as alive.
+    """
+    if health_path:
+        return await http_ready(host, port, health_path, timeout=timeout)
+    return await http_ready(host, port, "/", timeout=timeout, max_status=599)
+
+
+async def wait_until_ready(host, port, health_path=None, timeout=DEFAULT_TIMEOUT,
+                           should_continue=None, on_port_open=None):
+    """Poll host:port until it is ready.
+
+    port may be a callable returning the port to probe (or an awaitable of
+    it), for servers whose port is only discovered while waiting.
+    on_port_open(port) is called the first time the port accepts a connection.
+    Returns the seconds it took to become ready, or None if the timeout
+    expired or should_continue() returned False (e.g. the server exited).
+    """
+    started = time.monotonic()
+    deadline = started + timeout
+    delay = INITIAL_DELAY
+    port_open = False
+
+    while True:
+        if should_continue is not None and not should_continue():
+            return None
+        current_port = port() if callable(port) else port
+        if inspect.isawaitable(current_port):
+            current_port = await current_port
+        if await tcp_ready(host, current_port):
+            if not port_open:
+                port_open = True
+                if on_port_open is not None:
+                    on_port_open(current_port)
+            if not health_path or await http_ready(host, current_port, health_path):
+                return time.monotonic() - started
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        await asyncio.sleep(min(delay, remaining))
+        delay = min(delay * BACKOFF_FACTOR, MAX_DELAY)
@@ -0,0 +1,458 @@
+"""
+Per-app resource limits, applied when a server is spawned.
+Niceness, CPU affinity and the address-space / open-file rlimits are set by
+the launcher on the server's shell, which is held before running the command
+until they are in place, so the server and everything it starts inherit
+them. An app can also be placed in its own cgroup v2 with memory.max / cpu.max when a
+writable cgroup (with the memory and cpu controllers) is available. LimitMonitor watches for breaches (memory.max
+hits, OOM kills, CPU throttling, processes close to their rlimits) and
+reports them as supervisor events.
+"""
+
+import errno
+import os
+import re
+import threading
+
+import process_control
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+CGROUP_PREFIX = "launcher-"
+CHECK_INTERVAL = 2.0
+CPU_PERIOD = 100000        # microseconds; cpu.max quota is a share of this
+NEAR_LIMIT = 0.9           # report rlimit usage above this fraction
+# (lowest nice in the band, Windows priority class): IDLE, BELOW_NORMAL, NORMAL, ABOVE_NORMAL, HIGH
+WINDOWS_PRIORITIES = ((15, 0x40), (5, 0x4000), (-4, 0x20), (-14, 0x8000), (-20, 0x80))
+CGROUP_MESSAGES = {
+    "oom_kill": "memory.max exceeded - {count} process(es) OOM-killed",
+    "max": "memory.max reached {count} time(s) - memory is being reclaimed",
+    "nr_throttled": "cpu.max throttled the app in {count} period(s)",
+}
+
+_UNSAFE_NAME = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def parse_cpus(value):
+    """Return a sorted list of CPU numbers from "0-3,6", [0, 1] or None"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, int):
+        return [value]
+    if isinstance(value, (list, tuple)):
+        return sorted({int(cpu) for cpu in value})
+    cpus = set()
+    for part in str(value).split(","):
+        part = part.strip()
+        if "-" in part:
+            first, last = part.split("-", 1)
+            cpus.update(range(int(first), int(last) + 1))
+        elif part:
+            cpus.add(int(part))
+    return sorted(cpus)
+
+
+def format_cpus(cpus):
+    """Return CPU numbers in the "0-3,6" form"""
+    ranges = []
+    for cpu in cpus:
+        if ranges and cpu == ranges[-1][1] + 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    return ",".join(str(first) if first == last else f"{first}-{last}" for first, last in ranges)
+
+
+class ResourceLimits:
+    """Limit settings for one application (all optional)"""
+
+    def __init__(self, nice=0, cpus=None, memory_mb=None, open_files=None, cgroup_memory_mb=None,
+                 cgroup_cpus=None):
+        self.nice = nice
+        self.cpus = cpus
+        self.memory_mb = memory_mb
+        self.open_files = open_files
+        self.cgroup_memory_mb = cgroup_memory_mb
+        self.cgroup_cpus = cgroup_cpus
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build limits from a config value"""
+        data = data or {}
+
+        def number(key, kind):
+            return kind(data[key]) if data.get(key) is not None else None
+
+        return cls(
+            nice=int(data.get("nice", 0)),
+            cpus=parse_cpus(data.get("cpus")),
+            memory_mb=number("memory_mb", int),
+            open_files=number("open_files", int),
+            cgroup_memory_mb=number("cgroup_memory_mb", int),
+            cgroup_cpus=number("cgroup_cpus", float),
+        )
+
+    def to_dict(self):
+        """Return the config value (unset limits omitted)"""
+        data = {key: value for key, value in vars(self).items() if value}
+        if self.cpus:
+            data["cpus"] = format_cpus(self.cpus)
+        return data
+
+    @property
+    def any(self):
+        return bool(self.to_dict())
+
+    @property
+    def wants_cgroup(self):
+        return bool(self.cgroup_memory_mb or self.cgroup_cpus)
+
+
+def cgroup2_mount():
+    """Return where the cgroup v2 hierarchy is mounted, or None"""
+    try:
+        with open("/proc/self/mountinfo", "r") as f:
+            for line in f:
+                fields = line.split()
+                separator = fields.index("-")
+                if fields[separator + 1] == "cgroup2":
+                    return fields[4]
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def own_cgroup(mount):
+    """Return the cgroup v2 folder of this process, or None"""
+    try:
+        with open("/proc/self/cgroup", "r") as f:
+            for line in f:
+                hierarchy, _, path = line.rstrip("\n").split(":", 2)
+                if hierarchy == "0":
+                    return os.path.join(mount, path.lstrip("/"))
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _read_file(path):
+    with open(path, "r") as f:
+        return f.read()
+
+
+def _write_file(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def read_keyed(path):
+    """Return a flat-keyed cgroup file (memory.events, cpu.stat) as {key: int}"""
+    values = {}
+    try:
+        for line in _read_file(path).splitlines():
+            key, _, value = line.partition(" ")
+            if value.strip().isdigit():
+                values[key] = int(value)
+    except OSError:
+        pass
+    return values
+
+
+class Cgroups:
+    """Per-app cgroups under a writable cgroup v2 folder"""
+
+    def __init__(self, root=None):
+        self.root = root
+        self.base = None
+        self.error = None
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def _setup(self):
+        """Find the base folder and enable the memory and cpu controllers for its children"""
+        mount = cgroup2_mount()
+        if mount is None:
+            raise OSError("cgroup v2 is not mounted")
+        base = self.root or own_cgroup(mount)
+        if base is None or not os.access(base, os.W_OK):
+            raise OSError(f"cgroup {base} is not writable")
+        available = _read_file(os.path.join(base, "cgroup.controllers")).split()
+        missing = [name for name in ("memory", "cpu") if name not in available]
+        if missing:
+            raise OSError(f"cgroup {base} has no {'/'.join(missing)} controller")
+        enabled = _read_file(os.path.join(base, "cgroup.subtree_control")).split()
+        wanted = " ".join(f"+{name}" for name in ("memory", "cpu") if name not in enabled)
+        if wanted:
+            try:
+                _write_file(os.path.join(base, "cgroup.subtree_control"), wanted)
+            except OSError as e:
+                if e.errno != errno.EBUSY or self.root:
+                    raise
+                # A cgroup with processes cannot hand controllers to children:
+                # move the launcher into a leaf of its own first
+                leaf = os.path.join(base, "launcher")
+                os.makedirs(leaf, exist_ok=True)
+                _write_file(os.path.join(leaf, "cgroup.procs"), str(os.getpid()))
+                _write_file(os.path.join(base, "cgroup.subtree_control"), wanted)
+        self.base = base
+
+    def prepare(self, name, limits):
+        """Create (or update) an app's cgroup; returns its cgroup.procs path, or raises OSError"""
+        with self._lock:
+            if not self._ready:
+                self._ready = True
+                try:
+                    self._setup()
+                except (OSError, ValueError) as e:
+                    self.error = str(e)
+            if self.base is None:
+                raise OSError(self.error)
+        path = self.path_for(name)
+        os.makedirs(path, exist_ok=True)
+        memory = f"{limits.cgroup_memory_mb * 1048576}" if limits.cgroup_memory_mb else "max"
+        cpu = f"{int(limits.cgroup_cpus * CPU_PERIOD)} {CPU_PERIOD}" if limits.cgroup_cpus else f"max {CPU_PERIOD}"
+        _write_file(os.path.join(path, "memory.max"), memory)
+        _write_file(os.path.join(path, "cpu.max"), cpu)
+        return os.path.join(path, "cgroup.procs")
+
+    def path_for(self, name):
+        return os.path.join(self.base or "", CGROUP_PREFIX + (_UNSAFE_NAME.sub("_", name) or "app"))
+
+    def remove(self, name):
+        """Remove an app's cgroup if no process is left in it"""
+        if self.base is None:
+            return
+        try:
+            os.rmdir(self.path_for(name))
+        except OSError:
+            pass
+
+
+class LimitPlan:
+    """The limits one spawn gets, as this platform allows them"""
+
+    def __init__(self, nice=0, cpus=None, rlimits=(), procs=None, creationflags=0):
+        self.nice = nice
+        self.cpus = cpus
+        self.rlimits = rlimits
+        self.procs = procs
+        self.creationflags = creationflags  # Windows priority class, given to spawn
+
+    def apply(self, pid):
+        """Apply the limits to a shell spawned with hold (POSIX); raises OSError"""
+        if os.name == "nt":
+            return
+        try:
+            if self.procs:
+                _write_file(self.procs, str(pid))
+            if self.nice:
+                os.setpriority(os.PRIO_PROCESS, pid, os.getpriority(os.PRIO_PROCESS, 0) + self.nice)
+            if self.cpus:
+                os.sched_setaffinity(pid, self.cpus)
+            for limit, amount in self.rlimits:
+                resource.prlimit(pid, limit, (amount, amount))
+        except ProcessLookupError:
+            pass  # already gone; its exit is reported as usual
+
+
+class LimitManager:
+    """Turns an app's limits into a LimitPlan, checking what this platform allows"""
+
+    def __init__(self):
+        self.cgroups = Cgroups()
+
+    def plan(self, name, limits):
+        """Return (LimitPlan or None, [warnings])"""
+        warnings = []
+        if limits is None or not limits.any:
+            return None, warnings
+        if os.name == "nt":
+            return self._windows_plan(limits, warnings), warnings
+
+        nice = limits.nice
+        if nice < 0 and os.geteuid() != 0:
+            warnings.append(f"nice {nice} needs root - running at normal priority")
+            nice = 0
+
+        cpus = limits.cpus
+        if cpus and not hasattr(os, "sched_setaffinity"):
+            warnings.append("CPU affinity is not supported on this platform")
+            cpus = None
+        elif cpus:
+            allowed = os.sched_getaffinity(0)
+            usable = [cpu for cpu in cpus if cpu in allowed]
+            if len(usable) < len(cpus):
+                warnings.append(f"CPUs {','.join(str(cpu) for cpu in cpus if cpu not in allowed)} "
+                                f"are not available - using {','.join(map(str, usable)) or 'all'}")
+            cpus = usable or None
+
+        rlimits = []
+        for limit, value, label in ((getattr(resource, "RLIMIT_AS", None), limits.memory_mb, "memory"),
+                                    (getattr(resource, "RLIMIT_NOFILE", None), limits.open_files, "open files")):
+            if not value:
+                continue
+            if limit is None or not hasattr(resource, "prlimit"):
+                warnings.append(f"The {label} limit is not supported on this platform")
+                continue
+            amount = value * 1048576 if label == "memory" else value
+            hard = resource.getrlimit(limit)[1]
+            if hard != resource.RLIM_INFINITY and amount > hard:
+                warnings.append(f"The {label} limit {value} is above the hard limit - using {hard}")
+                amount = hard
+            rlimits.append((limit, amount))
+
+        procs = None
+        if limits.wants_cgroup:
+            try:
+                procs = self.cgroups.prepare(name, limits)
+            except OSError as e:
+                warnings.append(f"cgroup limits skipped: {e}")
+
+        if not (nice or cpus or rlimits or procs):
+            return None, warnings
+        return LimitPlan(nice, cpus, rlimits, procs), warnings
+
+    @staticmethod
+    def _windows_plan(limits, warnings):
+        if limits.cpus or limits.memory_mb or limits.open_files or limits.wants_cgroup:
+            warnings.append("Only nice (as a priority class) is supported on Windows")
+        if not limits.nice:
+            return None
+        for lowest, priority_class in WINDOWS_PRIORITIES:
+            if limits.nice >= lowest:
+                return LimitPlan(creationflags=priority_class)
+        return LimitPlan(creationflags=WINDOWS_PRIORITIES[-1][1])
+
+
+def _process_usage(pid):
+    """Return (virtual memory bytes, open files) of one process, or None if it is gone"""
+    try:
+        status = _read_file(f"/proc/{pid}/status")
+        files = len(os.listdir(f"/proc/{pid}/fd"))
+    except OSError:
+        return None
+    match = re.search(r"^VmSize:\s+(\d+) kB", status, re.MULTILINE)
+    return (int(match.group(1)) * 1024 if match else 0), files
+
+
+class LimitMonitor:
+    """Reports apps running into their limits as "limit_exceeded" events"""
+
+    def __init__(self, supervisor, manager, interval=CHECK_INTERVAL):
+        self.supervisor = supervisor
+        self.manager = manager
+        self.interval = interval
+        self.breaches = {}
+        self._seen = {}
+        self._near = {}
+        self._timer = None
+        self._running = False
+        self._lock = threading.Lock()
+
+    def start(self):
+        if self._running or not os.path.isdir("/proc/self"):
+            return
+        self._running = True
+        self.supervisor.add_listener(self.on_event)
+        self._schedule()
+
+    def stop(self):
+        self._running = False
+        timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+
+    def on_event(self, event):
+        if event["type"] == "started":
+            app = self.supervisor.get(event["app"])
+            counters = {}
+            if app is not None and app.definition.limits.wants_cgroup:
+                # Counters of a reused cgroup carry on from earlier runs
+                counters = self._cgroup_counters(app.name)
+            with self._lock:
+                self._near.pop(event["app"], None)
+                self._seen[event["app"]] = counters
+
+    def _schedule(self):
+        if self._running:
+            self._timer = self.supervisor.events.call_later(self.interval, self._tick)
+
+    def _tick(self):
+        self.supervisor.events.spawn(self._check_async())
+
+    async def _check_async(self):
+        try:
+            await self.supervisor.events.run_blocking(self.check)
+        finally:
+            self._schedule()
+
+    def check(self):
+        """Look at every running app with limits once (blocks on /proc and /sys)"""
+        # Take the process now: the app may stop while we look
+        apps = [(app, app.process) for app in list(self.supervisor.apps.values())
+                if app.definition.limits.any]
+        apps = [(app, process) for app, process in apps if process is not None]
+        children = process_control.children_map() if apps else {}
+        for app, process in apps:
+            limits = app.definition.limits
+            if limits.wants_cgroup and self.manager.cgroups.base is not None:
+                self._check_cgroup(app.name)
+            if limits.memory_mb or limits.open_files:
+                self._check_rlimits(app, process.pid, children)
+
+    def _cgroup_counters(self, name):
+        path = self.manager.cgroups.path_for(name)
+        counters = read_keyed(os.path.join(path, "memory.events"))
+        counters.update(read_keyed(os.path.join(path, "cpu.stat")))
+        return {key: counters.get(key, 0) for key in CGROUP_MESSAGES}
+
+    def _check_cgroup(self, name):
+        for key, value in self._cgroup_counters(name).items():
+            with self._lock:
+                seen = self._seen.setdefault(name, {})
+                count = value - seen.get(key, 0)
+                seen[key] = value
+            if count > 0:
+                self._report(name, key, CGROUP_MESSAGES[key].format(count=count))
+
+    def _check_rlimits(self, app, pid, children):
+        limits = app.definition.limits
+        usage = [_process_usage(member) for member in [pid] + process_control.descendants(pid, children)]
+        usage = [item for item in usage if item is not None]
+        if not usage:
+            return
+        for key, used, limit, label in (
+            ("memory_mb", max(item[0] for item in usage), (limits.memory_mb or 0) * 1048576, "address space"),
+            ("open_files", max(item[1] for item in usage), limits.open_files or 0, "open files"),
+        ):
+            if not limit:
+                continue
+            with self._lock:
+                near = self._near.setdefault(app.name, set())
+                crossed = used >= limit * NEAR_LIMIT and key not in near
+                if crossed:
+                    near.add(key)
+                elif used < limit * NEAR_LIMIT * 0.9:
+                    near.discard(key)
+            if crossed:
+                shown = f"{used / 1048576:.0f} of {limit / 1048576:.0f} MB" if key == "memory_mb" else f"{used} of {limit}"
+                self._report(app.name, key, f"{label} at {shown} - close to the limit")
+
+    def _report(self, name, limit, message):
+        with self._lock:
+            counts = self.breaches.setdefault(name, {})
+            counts[limit] = counts.get(limit, 0) + 1
+        self.supervisor.emit(name, "limit_exceeded", limit=limit, message=message)
+
+    def describe(self, name):
+        """Return a short summary of an app's breaches, or "" """
+        with self._lock:
+            counts = dict(self.breaches.get(name, {}))
+        if not counts:
+            return ""
+        labels = {"oom_kill": "OOM kills", "max": "memory.max hits", "nr_throttled": "CPU throttling",
+                  "memory_mb": "address space", "open_files": "open files"}
+        return "Limits hit: " + ", ".join(f"{labels.get(key, key)} ×{count}" for key, count in counts.items())
@@ -0,0 +1,113 @@
+"""
+Restart policies for supervised applications.
+Decides whether an exited app is restarted, how long to back off first,
+and when repeated crashes count as a crash loop that should stop retrying.
+"""
+
+import random
+import time
+from collections import deque
+
+NEVER = "never"
+ON_FAILURE = "on-failure"
+ALWAYS = "always"
+POLICIES = (NEVER, ON_FAILURE, ALWAYS)
+
+
+class RestartPolicy:
+    """Restart settings for one application"""
+
+    def __init__(self, policy=NEVER, backoff_initial=1.0, backoff_max=60.0, backoff_factor=2.0,
+                 jitter=0.2, max_restarts=5, window=60.0, liveness_interval=0.0, liveness_failures=3):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown restart policy '{policy}' (expected one of {', '.join(POLICIES)})")
+        self.policy = policy
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.backoff_factor = backoff_factor
+        self.jitter = jitter
+        self.max_restarts = max_restarts
+        self.window = window
+        self.liveness_interval = liveness_interval
+        self.liveness_failures = liveness_failures
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a policy from a config value: a policy name or a dict of settings"""
+        if not data:
+            return cls()
+        if isinstance(data, str):
+            return cls(policy=data)
+        defaults = cls()
+        return cls(
+            policy=data.get("policy", NEVER),
+            backoff_initial=float(data.get("backoff_initial", defaults.backoff_initial)),
+            backoff_max=float(data.get("backoff_max", defaults.backoff_max)),
+            backoff_factor=float(data.get("backoff_factor", defaults.backoff_factor)),
+            jitter=float(data.get("jitter", defaults.jitter)),
+            max_restarts=int(data.get("max_restarts", defaults.max_restarts)),
+            window=float(data.get("window", defaults.window)),
+            liveness_interval=float(data.get("liveness_interval", defaults.liveness_interval)),
+            liveness_failures=int(data.get("liveness_failures", defaults.liveness_failures)),
+        )
+
+    def to_dict(self):
+        """Return the config value for this policy (defaults omitted)"""
+        defaults = RestartPolicy()
+        data = {key: value for key, value in vars(self).items() if value != getattr(defaults, key)}
+        if not data or list(data) == ["policy"]:
+            return self.policy
+        data["policy"] = self.policy
+        return data
+
+    def should_restart(self, returncode):
+        """Return True if an unexpected exit with returncode warrants a restart"""
+        if self.policy == ALWAYS:
+            return True
+        if self.policy == ON_FAILURE:
+            return returncode != 0
+        return False
+
+
+class RestartTracker:
+    """Per-app restart bookkeeping: backoff state and crash-loop detection"""
+
+    def __init__(self, policy):
+        self.policy = policy
+        self.restart_count = 0
+        self.consecutive_failures = 0
+        self._recent = deque()
+
+    def next_delay(self):
+        """Return the backoff delay for the next restart, with jitter applied"""
+        policy = self.policy
+        delay = policy.backoff_initial * (policy.backoff_factor ** self.consecutive_failures)
+        delay = min(delay, policy.backoff_max)
+        if policy.jitter:
+            delay *= 1 + random.uniform(-policy.jitter, policy.jitter)
+        return max(0.0, delay)
+
+    def record_failure(self, now=None):
+        """Record an unexpected exit; return False if the app is crash-looping"""
+        now = time.monotonic() if now is None else now
+        while self._recent and now - self._recent[0] > self.policy.window:
+            self._recent.popleft()
+        if len(self._recent) >= self.policy.max_restarts:
+            return False
+
+        self._recent.append(now)
+        self.restart_count += 1
+        return True
+
+    def record_healthy(self):
+        """Reset the backoff once the app has come back up"""
+        self.consecutive_failures = 0
+
+    def record_attempt(self):
+        """Grow the backoff after scheduling a restart"""
+        self.consecutive_failures += 1
+
+    def reset(self):
+        """Forget crash history (e.g. after a manual start)"""
+        self.consecutive_failures = 0
+        self._recent.clear()
@@ -0,0 +1,176 @@
+"""
+Start-up timing for the launchers (--startup-trace).
+Records how long each start-up phase took, measured from the moment the
+process was created (in a one-file bundle, from the bootloader that unpacks
+it), and reports the phases once the server has printed its first line.
+Import this module first so "interpreter ready" is close to the truth.
+"""
+
+import atexit
+import os
+import sys
+import threading
+import time
+
+FLAG = "--startup-trace"
+TRACE_FILE = "startup_trace.txt"
+FINAL_EVENTS = {"output": "first server output", "ready": "server ready"}
+
+_imported_at = time.monotonic()
+
+
+def _linux_age(pid):
+    """Seconds since pid started (Linux /proc), or None"""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            stat = f.read()
+        with open("/proc/uptime", "rb") as f:
+            uptime = float(f.read().split()[0])
+        ticks = int(stat[stat.rfind(b")") + 2:].split()[19])
+        return uptime - ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _windows_age(pid):
+    """Seconds since pid started (Windows GetProcessTimes), or None"""
+    import ctypes
+    from ctypes import wintypes
+
+    kernel32 = ctypes.windll.kernel32
+    kernel32.OpenProcess.restype = wintypes.HANDLE
+    handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+    if not handle:
+        return None
+    try:
+        times = [wintypes.FILETIME() for _ in range(4)]
+        if not kernel32.GetProcessTimes(handle, *[ctypes.byref(t) for t in times]):
+            return None
+        created = (times[0].dwHighDateTime << 32) | times[0].dwLowDateTime
+        now = wintypes.FILETIME()
+        kernel32.GetSystemTimeAsFileTime(ctypes.byref(now))
+        return (((now.dwHighDateTime << 32) | now.dwLowDateTime) - created) / 1e7
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def process_started():
+    """Return the time.monotonic() value at which this process started, or None if unknown.
+
+    A PyInstaller one-file bundle runs as the child of a bootloader that first
+    unpacks the archive; that parent's start time is the one the user feels.
+    """
+    pid = os.getpid()
+    if getattr(sys, "frozen", False) and os.path.basename(getattr(sys, "_MEIPASS", "")).startswith("_MEI"):
+        pid = os.getppid()
+    try:
+        age = _windows_age(pid) if os.name == "nt" else _linux_age(pid)
+    except (AttributeError, OSError):
+        age = None
+    if age is None or age < 0:
+        return None
+    return time.monotonic() - age
+
+
+class StartupTrace:
+    """Time stamps of the start-up phases, reported once the server first speaks"""
+
+    def __init__(self, output=None):
+        self.output = output
+        self.enabled = False
+        self.origin = None
+        self.marks = []
+        self.pending = set()
+        self.finished = False
+        self.reported = False
+        self._lock = threading.Lock()
+
+    def enable(self, output=None):
+        """Start recording; the report goes to output (a path), else stderr or TRACE_FILE"""
+        self.enabled = True
+        self.output = output or self.output
+        started = process_started()
+        self.origin = started if started is not None else _imported_at
+        self.marks = [("process start" if started is not None else "trace start", self.origin)]
+        if started is not None:
+            self.marks.append(("interpreter ready", _imported_at))
+        atexit.register(self.report)
+
+    def mark(self, phase):
+        """Record that phase has just completed"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.marks.append((phase, time.monotonic()))
+            self.pending.discard(phase)
+            due = self.finished and not self.pending
+        if due:
+            self.report()
+
+    def expect(self, phase):
+        """Hold the report back until phase has been marked too"""
+        if self.enabled:
+            with self._lock:
+                self.pending.add(phase)
+
+    def watch(self, supervisor):
+        """Finish the trace at the first server output (or readiness, for quiet servers)"""
+        if self.enabled:
+            supervisor.add_listener(self.on_event)
+
+    def on_event(self, event):
+        phase = FINAL_EVENTS.get(event["type"])
+        if phase is None or self.finished:
+            return
+        with self._lock:
+            if self.finished:
+                return
+            self.finished = True
+            self.marks.append((phase, event["monotonic"]))
+            due = not self.pending
+        if due:
+            self.report()
+
+    def format(self):
+        """Return the report: each phase with its offset from process start and its own duration"""
+        lines = [f"{'Phase':<24} {'At':>9} {'Took':>9}"]
+        previous = self.origin
+        for phase, stamp in sorted(self.marks, key=lambda mark: mark[1]):
+            lines.append(f"{phase:<24} {(stamp - self.origin) * 1000:>7.1f}ms {(stamp - previous) * 1000:>7.1f}ms")
+            previous = stamp
+        if not self.finished:
+            lines.append("(the server printed nothing before the launcher exited)")
+        return "\n".join(lines)
+
+    def report(self):
+        with self._lock:
+            if not self.enabled or self.reported:
+                return
+            self.reported = True
+        text = "Startup trace:\n" + self.format() + "\n"
+        try:
+            if self.output:
+                with open(self.output, "a", encoding="utf-8") as f:
+                    f.write(text)
+            elif sys.stderr is not None:
+                sys.stderr.write(text)
+                sys.stderr.flush()
+            else:
+                # Windowed builds have no console
+                with open(TRACE_FILE, "a", encoding="utf-8") as f:
+                    f.write(text)
+        except OSError as e:
+            print(f"Error writing startup trace: {e}")
+
+
+trace = StartupTrace()
+
+
+def from_argv(argv):
+    """Enable the trace if argv has --startup-trace[=FILE]; removes the flag from argv"""
+    for index, arg in enumerate(argv):
+        if arg == FLAG or arg.startswith(FLAG + "="):
+            del argv[index]
+            trace.enable(arg.partition("=")[2] or None)
+            break
+    return trace
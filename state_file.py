@@ -0,0 +1,107 @@
+"""
+Launcher state file for reattaching to servers that outlive the launcher.
+Apps with keep_running are left running when the launcher exits; their pid,
+process start time, port and output-file offsets are recorded here so the
+next launcher run can validate them and resume monitoring in milliseconds
+instead of cold-starting the app.
+"""
+
+import json
+import os
+import threading
+
+import process_control
+from config_store import atomic_write, user_file
+
+STATE_FILE = "launcher_state.json"
+SAVE_EVENTS = {"started", "reattached", "ready", "port_detected", "url_detected", "exited", "stopped"}
+
+
+def load_state(path):
+    """Return the saved entries ({app name: entry}), or {} if there are none"""
+    try:
+        with open(path, "r") as f:
+            return json.load(f).get("apps", {})
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError, AttributeError) as e:
+        print(f"Error loading state: {e}")
+        return {}
+
+
+def save_state(path, entries):
+    """Write entries atomically; remove the file when there is nothing to keep"""
+    if not entries:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    atomic_write(path, json.dumps({"apps": entries}, indent=2))
+
+
+class StateKeeper:
+    """Keep the state file in step with the supervisor's keep_running apps"""
+
+    def __init__(self, supervisor, path=None):
+        self.supervisor = supervisor
+        self.path = path or user_file(STATE_FILE)
+        self._lock = threading.Lock()
+        self._listening = False
+        # Live entries for apps whose profiles are not loaded yet
+        self.unclaimed = {}
+
+    def on_event(self, event):
+        if event["type"] not in SAVE_EVENTS:
+            return
+        app = self.supervisor.get(event["app"])
+        if app is not None and app.definition.keep_running:
+            self.save()
+
+    def save(self):
+        """Record every kept-running app that is currently running"""
+        entries = {}
+        for app in list(self.supervisor.apps.values()):
+            state = self.supervisor.capture_state(app)
+            if state:
+                entries[app.name] = state
+        for name, entry in list(self.unclaimed.items()):
+            if self.supervisor.get(name) is None:
+                entries.setdefault(name, entry)
+        with self._lock:
+            try:
+                save_state(self.path, entries)
+            except OSError as e:
+                print(f"Error saving state: {e}")
+
+    def reattach(self):
+        """Reattach to live servers from the state file; returns the names reattached"""
+        if not self._listening:
+            self.supervisor.add_listener(self.on_event)
+            self._listening = True
+
+        attached = []
+        self.unclaimed = {}
+        for name, entry in load_state(self.path).items():
+            app = self.supervisor.get(name)
+            if app is not None and (not app.definition.keep_running or app.is_running):
+                continue
+            try:
+                pid = int(entry["pid"])
+                # A different start time means the pid now belongs to another process
+                if process_control.process_start_time(pid) != entry["start_time"]:
+                    continue
+                if app is None:
+                    # Keep it for when the app's profile is loaded
+                    self.unclaimed[name] = entry
+                    continue
+                captures = [(stream, path, int(offset)) for stream, path, offset in entry.get("captures", ())
+                            if os.path.exists(path)]
+                self.supervisor.attach(name, pid, entry["start_time"], int(entry["port"]),
+                                       url=entry.get("url"), captures=captures)
+            except (KeyError, TypeError, ValueError, OSError) as e:
+                print(f"Error reattaching {name}: {e}")
+                continue
+            attached.append(name)
+
+        # Drop stale entries
+        self.save()
+        return attached
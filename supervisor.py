@@ -0,0 +1,868 @@
+"""
+Supervisor for running several web applications at once.
+Each managed app has its own process, port, status and log stream. Output,
+exits, readiness and liveness probes, restart timers and shutdowns are all
+handled on one shared event loop, so no thread is started per app or action.
+"""
+
+import concurrent.futures
+import os
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+import config_store
+import env_cache
+import event_loop
+import output_stream
+import ports
+import process_control
+import project_detect
+import readiness
+import url_detect
+from resource_limits import LimitManager, ResourceLimits
+from restart_policy import RestartPolicy, RestartTracker
+
+DEFAULT_PORT = 5000
+DEFAULT_CAPTURE_DIR = "logs"
+APP_LOG_CAPACITY = 5000
+LIVENESS_TICK = 0.5
+PORT_SCAN_INTERVAL = 0.5
+
+# App status values
+STOPPED = "stopped"
+PREPARING = "preparing"
+STARTING = "starting"
+READY = "ready"
+NOT_READY = "not ready"
+STOPPING = "stopping"
+EXITED = "exited"
+BACKOFF = "backoff"
+CRASH_LOOP = "crash loop"
+
+
+class LaunchError(Exception):
+    """Raised when an application cannot be started"""
+
+
+class AppDefinition:
+    """Static settings for one managed application"""
+
+    def __init__(self, name, path, command=None, host=readiness.DEFAULT_HOST, port=DEFAULT_PORT,
+                 health_path="", ready_timeout=readiness.DEFAULT_TIMEOUT, open_browser=True, restart=None,
+                 stop_grace=process_control.DEFAULT_GRACE, port_range=None, auto_port=True,
+                 url_patterns=(), detect_url=True, keep_running=False, watch=False, watch_include=(),
+                 watch_exclude=None, watch_debounce=0.5, depends_on=(), env=None, limits=None, prepare=None,
+                 prepare_files=()):
+        self.name = name
+        self.path = path
+        self.command = command
+        self.host = host
+        self.port = port
+        self.health_path = health_path
+        self.ready_timeout = ready_timeout
+        self.open_browser = open_browser
+        self.restart = restart or RestartPolicy()
+        self.stop_grace = stop_grace
+        self.port_range = port_range
+        self.auto_port = auto_port
+        self.url_patterns = list(url_patterns)
+        self.compiled_url_patterns = url_detect.compile_patterns(self.url_patterns)
+        self.detect_url = detect_url
+        self.keep_running = keep_running
+        self.watch = watch
+        self.watch_include = list(watch_include)
+        self.watch_exclude = None if watch_exclude is None else list(watch_exclude)
+        self.watch_debounce = watch_debounce
+        self.depends_on = list(depends_on)
+        self.env = dict(env or {})
+        self.limits = limits or ResourceLimits()
+        self.prepare = prepare
+        self.prepare_files = list(prepare_files)
+
+    @classmethod
+    def from_dict(cls, data, defaults=None):
+        """Build a definition from a config entry, filling gaps from defaults"""
+        values = dict(defaults or {})
+        values.update(data)
+        path = values["path"]
+        return cls(
+            name=values.get("name") or os.path.basename(os.path.normpath(path)) or path,
+            path=path,
+            command=values.get("command"),
+            host=values.get("host", readiness.DEFAULT_HOST),
+            port=int(values.get("port", DEFAULT_PORT)),
+            health_path=values.get("health_path", ""),
+            ready_timeout=float(values.get("ready_timeout", readiness.DEFAULT_TIMEOUT)),
+            open_browser=bool(values.get("open_browser", True)),
+            restart=RestartPolicy.from_dict(values.get("restart")),
+            stop_grace=float(values.get("stop_grace", process_control.DEFAULT_GRACE)),
+            port_range=ports.parse_port_range(values["port_range"]) if values.get("port_range") else None,
+            auto_port=bool(values.get("auto_port", True)),
+            url_patterns=values.get("url_patterns", ()),
+            detect_url=bool(values.get("detect_url", True)),
+            keep_running=bool(values.get("keep_running", False)),
+            watch=bool(values.get("watch", False)),
+            watch_include=values.get("watch_include", ()),
+            watch_exclude=values.get("watch_exclude"),
+            watch_debounce=float(values.get("watch_debounce", 0.5)),
+            depends_on=values.get("depends_on", ()),
+            env={str(key): str(value) for key, value in (values.get("env") or {}).items()},
+            limits=ResourceLimits.from_dict(values.get("limits")),
+            prepare=values.get("prepare"),
+            prepare_files=values.get("prepare_files", ()),
+        )
+
+    def to_dict(self):
+        """Return the config entry for this definition (defaults omitted)"""
+        data = {"name": self.name, "path": self.path}
+        if self.command:
+            data["command"] = self.command
+        if self.host != readiness.DEFAULT_HOST:
+            data["host"] = self.host
+        if self.port != DEFAULT_PORT:
+            data["port"] = self.port
+        if self.health_path:
+            data["health_path"] = self.health_path
+        if self.ready_timeout != readiness.DEFAULT_TIMEOUT:
+            data["ready_timeout"] = self.ready_timeout
+        if not self.open_browser:
+            data["open_browser"] = False
+        restart = self.restart.to_dict()
+        if restart != RestartPolicy().policy:
+            data["restart"] = restart
+        if self.stop_grace != process_control.DEFAULT_GRACE:
+            data["stop_grace"] = self.stop_grace
+        if self.port_range:
+            data["port_range"] = list(self.port_range)
+        if not self.auto_port:
+            data["auto_port"] = False
+        if self.url_patterns:
+            data["url_patterns"] = self.url_patterns
+        if not self.detect_url:
+            data["detect_url"] = False
+        if self.keep_running:
+            data["keep_running"] = True
+        if self.watch:
+            data["watch"] = True
+        if self.watch_include:
+            data["watch_include"] = self.watch_include
+        if self.watch_exclude is not None:
+            data["watch_exclude"] = self.watch_exclude
+        if self.watch_debounce != 0.5:
+            data["watch_debounce"] = self.watch_debounce
+        if self.depends_on:
+            data["depends_on"] = self.depends_on
+        if self.env:
+            data["env"] = self.env
+        if self.limits.any:
+            data["limits"] = self.limits.to_dict()
+        if self.prepare:
+            data["prepare"] = self.prepare
+        if self.prepare_files:
+            data["prepare_files"] = self.prepare_files
+        return data
+
+
+class ManagedApp:
+    """Runtime state of one application"""
+
+    def __init__(self, definition):
+        self.definition = definition
+        self.port = definition.port
+        self.detected_url = None
+        self.detector = None
+        self.process = None
+        self.output = None
+        self.status = STOPPED
+        self.started_at = None
+        self.time_to_ready = None
+        self.exit_code = None
+        self.tracker = RestartTracker(definition.restart)
+        self.restart_timer = None
+        self.shutdown = None
+        self.start_after_stop = False
+        # Set by start(); cleared by restarts, reattaching and the run's first "ready"
+        self.initial = False
+        self.last_stop_duration = None
+        self.down_since = None
+        self.total_downtime = 0.0
+        self.next_probe = 0.0
+        self.probe_failures = 0
+        self._log = deque(maxlen=APP_LOG_CAPACITY)
+        self._log_lock = threading.Lock()
+
+    @property
+    def name(self):
+        return self.definition.name
+
+    @property
+    def url(self):
+        """URL the server announced, else the port it was given (or found listening on)"""
+        if self.detected_url:
+            return self.detected_url
+        return f"http://{self.definition.host}:{self.port}"
+
+    @property
+    def is_running(self):
+        return self.process is not None
+
+    def append_log(self, line):
+        with self._log_lock:
+            self._log.append(line)
+
+    def tail(self, count=100):
+        """Return the last count lines of this app's log"""
+        with self._log_lock:
+            lines = list(self._log)
+        return lines[-count:]
+
+    @property
+    def downtime(self):
+        """Seconds spent down after unexpected exits, including any ongoing outage"""
+        total = self.total_downtime
+        if self.down_since is not None:
+            total += time.monotonic() - self.down_since
+        return total
+
+    def end_downtime(self):
+        if self.down_since is not None:
+            self.total_downtime += time.monotonic() - self.down_since
+            self.down_since = None
+
+    def snapshot(self):
+        """Return a plain dict describing the current state"""
+        return {
+            "name": self.name,
+            "path": self.definition.path,
+            "status": self.status,
+            "url": self.url,
+            "port": self.port,
+            "pid": self.process.pid if self.process else None,
+            "time_to_ready": self.time_to_ready,
+            "exit_code": self.exit_code,
+            "restarts": self.tracker.restart_count,
+            "downtime": self.downtime,
+            "last_stop_duration": self.last_stop_duration,
+        }
+
+
+class Supervisor:
+    """Start, stop and monitor a set of applications"""
+
+    def __init__(self, events=None):
+        self.apps = {}
+        self.events = events or event_loop.EventLoop()
+        self.pump = output_stream.OutputPump(self.events)
+        self.capture_dir = config_store.user_file(DEFAULT_CAPTURE_DIR)
+        self.limits = LimitManager()
+        self.env_cache = env_cache.EnvCache()
+        self._lock = threading.RLock()
+        self._listeners = []
+        self._liveness_started = False
+        self._probing = set()
+
+    def add_listener(self, callback):
+        """Register callback(event) for app events; called from the event loop (or the
+        thread that made the call), so callbacks must not block"""
+        self._listeners.append(callback)
+
+    def _emit(self, app, kind, **data):
+        self.emit(app.name, kind, **data)
+
+    def emit(self, name, kind, **data):
+        """Send an event about an app (or group of apps) to every listener"""
+        event = {"app": name, "type": kind, "time": time.time(), "monotonic": time.monotonic()}
+        event.update(data)
+        for callback in self._listeners:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Error in supervisor listener: {e}")
+
+    def add_app(self, definition):
+        """Register an application definition, returning its ManagedApp"""
+        with self._lock:
+            if definition.name in self.apps:
+                raise ValueError(f"App '{definition.name}' already exists")
+            app = ManagedApp(definition)
+            self.apps[definition.name] = app
+            return app
+
+    def remove_app(self, name):
+        """Forget an application; it must not be running"""
+        with self._lock:
+            app = self.apps[name]
+            if app.is_running:
+                raise LaunchError(f"App '{name}' is still running")
+            del self.apps[name]
+
+    def get(self, name):
+        return self.apps.get(name)
+
+    def find_by_path(self, path):
+        """Return the app whose folder is path, or None"""
+        target = os.path.normcase(os.path.abspath(path))
+        for app in list(self.apps.values()):
+            if os.path.normcase(os.path.abspath(app.definition.path)) == target:
+                return app
+        return None
+
+    def unique_name(self, base):
+        """Return base, or base with a numeric suffix if it is taken"""
+        name, counter = base, 2
+        while name in self.apps:
+            name = f"{base}-{counter}"
+            counter += 1
+        return name
+
+    def resolve_command(self, definition):
+        """Return the command line used to start an app"""
+        if definition.command:
+            return definition.command
+        if not os.path.isdir(definition.path):
+            raise LaunchError(f"Folder does not exist: {definition.path}")
+        candidate = project_detect.best_candidate(definition.path)
+        if not candidate:
+            raise LaunchError("No start script or known project type found in the selected folder")
+        return candidate.command
+
+    def start(self, name, initial=True):
+        """Spawn an app's process and begin monitoring it.
+
+        The first "ready" event of an initial start carries initial=True (the
+        front ends open the browser on it); restart() passes initial=False.
+        """
+        with self._lock:
+            app = self.apps[name]
+            if app.is_running:
+                raise LaunchError(f"App '{name}' is already running")
+            self._cancel_restart(app)
+            app.tracker.reset()
+            app.initial = initial
+            if app.shutdown is not None:
+                # The previous run still holds its port; start as soon as it is gone
+                app.start_after_stop = True
+                return app
+        return self._prepare_or_spawn(app, failed=lambda error: self._start_failed(app, "start_failed", error))
+
+    def _prepare_or_spawn(self, app, failed=None):
+        """Run the app's prepare step first if its dependency files changed, else spawn it.
+
+        On the event loop the dependency files are hashed on the worker pool
+        first; errors from then on go to failed(error) instead of being raised.
+        """
+        if not app.definition.prepare:
+            return self._spawn(app)
+        if not self.events.in_loop():
+            return self._prepare(app, self._check_prepare(app))
+        with self._lock:
+            # Held like a pending restart, so a stop or start in the meantime cancels it
+            app.restart_timer = self.events.submit(self._check_then_prepare(app, failed))
+        return app
+
+    async def _check_then_prepare(self, app, failed):
+        try:
+            check = await self.events.run_blocking(self._check_prepare, app)
+            with self._lock:
+                app.restart_timer = None
+            self._prepare(app, check)
+        except (LaunchError, OSError) as e:
+            failed(str(e))
+
+    def _check_prepare(self, app):
+        """Fingerprint an app's dependency files (blocks on the disk); returns (began, fingerprint, changed files, skip)"""
+        began = time.monotonic()
+        fingerprint = self.env_cache.fingerprint(app.name, app.definition)
+        current, changed = self.env_cache.check(app.name, fingerprint)
+        skip = self.env_cache.skipped(app.name, fingerprint) if current else None
+        return began, fingerprint, changed, skip
+
+    def _prepare(self, app, check):
+        definition = app.definition
+        began, fingerprint, changed, skip = check
+        if skip is not None:
+            saved, total = skip
+            self._emit(app, "prepare_skipped", saved=saved, total_saved=total, check=time.monotonic() - began)
+            return self._spawn(app)
+
+        with self._lock:
+            if app.is_running:
+                raise LaunchError(f"App '{app.name}' is already running")
+            process = process_control.spawn(definition.prepare, definition.path,
+                                            env=dict(os.environ, **definition.env))
+            app.process = process
+            app.status = PREPARING
+            app.exit_code = None
+        self._emit(app, "prepare_started", pid=process.pid, command=definition.prepare, changed=changed)
+        on_line = lambda stream, line: self._on_prepare_output(app, stream, line)
+        on_exit = lambda returncode: self._on_prepare_exit(app, process, fingerprint, began, returncode)
+        app.output = self.pump.watch(process, on_line, on_exit)
+        return app
+
+    def _on_prepare_output(self, app, stream, line):
+        if not line.strip():
+            return
+        line = line.rstrip()
+        app.append_log(line)
+        self._emit(app, "prepare_output", stream=stream, line=line)
+
+    def _on_prepare_exit(self, app, process, fingerprint, began, returncode):
+        with self._lock:
+            if app.process is not process:
+                # Stopped while preparing
+                return
+            app.process = None
+            if returncode != 0:
+                app.status = EXITED
+                app.exit_code = returncode
+        duration = time.monotonic() - began
+        # Installers may leave helpers behind (build servers, daemons)
+        process_control.kill_orphans(process)
+        if returncode != 0:
+            self._emit(app, "prepare_failed", returncode=returncode, duration=duration)
+            return
+        # Writes the cache file; keep it off the loop
+        self.events.executor.submit(self.env_cache.record, app.name, fingerprint, duration)
+        self._emit(app, "prepared", duration=duration)
+        try:
+            self._spawn(app)
+        except (LaunchError, OSError) as e:
+            self._start_failed(app, "start_failed", str(e))
+
+    def _spawn(self, app):
+        definition = app.definition
+        with self._lock:
+            if app.is_running:
+                raise LaunchError(f"App '{app.name}' is already running")
+            began = time.monotonic()
+            command = self.resolve_command(definition)
+            resolved = time.monotonic()
+            port = self._allocate_port(app)
+            env = dict(os.environ, **definition.env)
+            env["PORT"] = str(port)
+            plan, limit_warnings = self.limits.plan(app.name, definition.limits)
+            options = {"creationflags": plan.creationflags, "hold": True} if plan else {}
+            captures = None
+            if definition.keep_running:
+                # Write to files instead of pipes so the server survives the launcher exiting
+                captures = self._capture_paths(app)
+                with open(captures[0][1], "wb") as stdout, open(captures[1][1], "wb") as stderr:
+                    process = process_control.spawn(command, definition.path, env=env,
+                                                    stdout=stdout, stderr=stderr, **options)
+            else:
+                process = process_control.spawn(command, definition.path, env=env, **options)
+            if plan is not None:
+                try:
+                    plan.apply(process.pid)
+                except OSError as e:
+                    process_control.kill_orphans(process)
+                    process.wait()
+                    raise LaunchError(f"Could not apply the resource limits of '{app.name}': {e}")
+                finally:
+                    process_control.release(process)
+
+            app.port = port
+            app.detected_url = None
+            app.detector = (url_detect.UrlDetector(definition.compiled_url_patterns, definition.host)
+                            if definition.detect_url else None)
+            app.process = process
+            app.status = STARTING
+            app.started_at = time.monotonic()
+            app.time_to_ready = None
+            app.exit_code = None
+            app.probe_failures = 0
+
+        self._emit(app, "started", pid=process.pid, command=command, initial=app.initial,
+                   discovery=resolved - began, spawn=app.started_at - resolved)
+        for warning in limit_warnings:
+            self._emit(app, "limit_warning", message=warning)
+        if port != definition.port:
+            self._emit(app, "port_reassigned", preferred=definition.port, port=port)
+        self._monitor(app, process, captures)
+        return app
+
+    def _capture_paths(self, app):
+        # Absolute, so a launcher started from another directory can reattach to them
+        capture_dir = os.path.abspath(self.capture_dir)
+        os.makedirs(capture_dir, exist_ok=True)
+        base = os.path.join(capture_dir, "".join(c if c.isalnum() or c in "._-" else "_" for c in app.name))
+        return [(output_stream.STDOUT, base + ".stdout", 0), (output_stream.STDERR, base + ".stderr", 0)]
+
+    def _monitor(self, app, process, captures=None):
+        """Stream an app's output, wait for readiness and watch for its exit"""
+        on_line = lambda stream, line: self._on_output(app, process, stream, line)
+        on_exit = lambda returncode: self._on_exit(app, process, returncode)
+        if captures:
+            app.output = self.pump.follow(process, captures, on_line, on_exit)
+        else:
+            app.output = self.pump.watch(process, on_line, on_exit)
+        self.events.spawn(self._wait_ready(app, process))
+        if app.definition.restart.liveness_interval > 0:
+            self._ensure_liveness()
+
+    def attach(self, name, pid, start_time, port, url=None, captures=()):
+        """Resume monitoring a server left running by an earlier launcher.
+
+        captures is [(stream, path, offset), ...] for its output files.
+        """
+        with self._lock:
+            app = self.apps[name]
+            if app.is_running:
+                raise LaunchError(f"App '{name}' is already running")
+            process = process_control.AttachedProcess(pid, start_time)
+            app.port = port
+            app.detected_url = url
+            app.detector = None
+            app.process = process
+            app.status = STARTING
+            app.started_at = time.monotonic()
+            app.time_to_ready = None
+            app.exit_code = None
+            app.probe_failures = 0
+            app.initial = False
+
+        self._emit(app, "reattached", pid=pid, port=port)
+        self._monitor(app, process, list(captures))
+        return app
+
+    def capture_state(self, app):
+        """Return what a later launcher needs to reattach to a kept-running app, or None"""
+        process = app.process
+        if not app.definition.keep_running or process is None or not app.output or app.status == PREPARING:
+            return None
+        start_time = getattr(process, "start_time", None) or process_control.process_start_time(process.pid)
+        if start_time is None:
+            return None
+        offsets = app.output.offsets()
+        return {
+            "pid": process.pid,
+            "start_time": start_time,
+            "port": app.port,
+            "url": app.detected_url,
+            "captures": [[capture.stream, capture.path, offsets[capture.stream]]
+                         for capture in app.output.captures],
+        }
+
+    def _allocate_port(self, app):
+        """Pick the port for a run: the preferred one if free, else one from the range"""
+        definition = app.definition
+        exclude = {other.port for other in self.apps.values()
+                   if other is not app and (other.is_running or other.shutdown is not None)}
+
+        if not definition.auto_port:
+            if definition.port in exclude or not ports.is_port_free(definition.host, definition.port):
+                raise LaunchError(f"Port {definition.port} is already in use")
+            return definition.port
+
+        port_range = definition.port_range or ports.DEFAULT_PORT_RANGE
+        port = ports.find_free_port(definition.host, definition.port, port_range, exclude)
+        if port is None:
+            raise LaunchError(f"No free port in range {port_range[0]}-{port_range[1]}")
+        return port
+
+    def start_many(self, names=None):
+        """Start several apps; their readiness is awaited concurrently"""
+        errors = {}
+        for name in list(names if names is not None else self.apps):
+            app = self.apps.get(name)
+            if app is None or app.is_running:
+                continue
+            try:
+                self.start(name)
+            except (LaunchError, OSError) as e:
+                errors[name] = str(e)
+        return errors
+
+    def stop(self, name, wait=False):
+        """Stop an app's whole process tree (in the background unless wait is set;
+        never wait from the event loop itself)"""
+        with self._lock:
+            app = self.apps[name]
+            process = app.process
+            pending_restart = self._cancel_restart(app)
+            app.start_after_stop = False
+            app.end_downtime()
+            shutdown = app.shutdown
+            if process is None:
+                if pending_restart or app.status == CRASH_LOOP:
+                    app.status = STOPPED
+            else:
+                app.process = None
+                app.status = STOPPING
+
+        if process is None:
+            # Never wait while holding the lock: finishing the stop needs it
+            if wait and shutdown is not None:
+                shutdown.result()
+            return False
+
+        self._emit(app, "stop_requested", pid=process.pid)
+        shutdown = self._shutdown(app, process, self._finish_stop)
+        if wait:
+            shutdown.result()
+        return True
+
+    def restart(self, name):
+        """Stop an app if it is running and start it again once its tree is gone"""
+        self.stop(name)
+        return self.start(name, initial=False)
+
+    def stop_all(self, wait=False, keep_running=False):
+        """Stop every running app in parallel (except keep_running apps if keep_running is set)"""
+        for name, app in list(self.apps.items()):
+            if keep_running and app.definition.keep_running and app.is_running:
+                continue
+            self.stop(name)
+        if wait:
+            for app in list(self.apps.values()):
+                shutdown = app.shutdown
+                if shutdown is not None:
+                    shutdown.result()
+
+    def _shutdown(self, app, process, then):
+        """Terminate a process tree on the event loop, then call then(app, process, elapsed, forced).
+
+        Returns a concurrent.futures.Future that completes once that is done.
+        """
+        done = concurrent.futures.Future()
+
+        async def run():
+            try:
+                elapsed, forced = await process_control.terminate_tree(
+                    process, app.definition.stop_grace, self.events.executor)
+                with self._lock:
+                    if app.shutdown is done:
+                        app.shutdown = None
+                    app.last_stop_duration = elapsed
+                then(app, process, elapsed, forced)
+            finally:
+                done.set_result(None)
+
+        with self._lock:
+            app.shutdown = done
+        self.events.spawn(run())
+        return done
+
+    def _finish_stop(self, app, process, elapsed, forced):
+        with self._lock:
+            start_again = app.start_after_stop
+            if app.status == STOPPING:
+                # A restart is never seen as "stopped" in between
+                app.status = STARTING if start_again else STOPPED
+            app.start_after_stop = False
+        self._emit(app, "stopped", pid=process.pid, duration=elapsed, forced=forced)
+
+        if start_again:
+            try:
+                self._prepare_or_spawn(app, failed=lambda error: self._start_failed(app, "restart_failed", error))
+            except (LaunchError, OSError) as e:
+                self._start_failed(app, "restart_failed", str(e))
+
+    def _start_failed(self, app, kind, error):
+        app.status = EXITED
+        self._emit(app, kind, error=error)
+
+    def snapshot(self):
+        """Return the state of every app as a list of dicts"""
+        return [app.snapshot() for app in list(self.apps.values())]
+
+    def _on_output(self, app, process, stream, line):
+        if not line.strip():
+            return
+        line = line.rstrip()
+        app.append_log(line)
+        self._emit(app, "output", stream=stream, line=line)
+
+        detector = app.detector
+        if detector is not None:
+            url = detector.feed(line)
+            if url:
+                self._on_url_detected(app, process, url)
+
+    def _on_url_detected(self, app, process, url):
+        """Adopt the URL a server printed; without a health path it also means ready"""
+        with self._lock:
+            app.detector = None
+            if app.process is not process or app.status != STARTING:
+                return
+            app.detected_url = url
+            port = urlsplit(url).port
+            if port:
+                app.port = port
+            ready = not app.definition.health_path
+            if ready:
+                initial = self._mark_ready(app)
+
+        self._emit(app, "url_detected", url=url)
+        if ready:
+            self._emit(app, "ready", elapsed=app.time_to_ready, url=url, source="output", initial=initial)
+
+    def _mark_ready(self, app):
+        """Record that an app became ready (caller holds the lock); returns True for an initial start"""
+        initial, app.initial = app.initial, False
+        app.status = READY
+        app.detector = None
+        app.time_to_ready = time.monotonic() - app.started_at
+        app.end_downtime()
+        app.tracker.record_healthy()
+        app.next_probe = time.monotonic() + app.definition.restart.liveness_interval
+        return initial
+
+    def _on_exit(self, app, process, returncode):
+        with self._lock:
+            current = app.process is process
+            if current:
+                app.process = None
+                app.status = EXITED
+                app.exit_code = returncode
+                if app.down_since is None:
+                    app.down_since = time.monotonic()
+        if current:
+            # The shell is gone; do not let its workers keep holding the port
+            process_control.kill_orphans(process)
+        self._emit(app, "exited", pid=process.pid, returncode=returncode, expected=not current)
+
+        if current and app.definition.restart.should_restart(returncode):
+            self._schedule_restart(app)
+
+    def _schedule_restart(self, app):
+        """Restart an app after its backoff delay, unless it is crash-looping"""
+        with self._lock:
+            if not app.tracker.record_failure():
+                app.status = CRASH_LOOP
+                crash_loop = True
+            else:
+                crash_loop = False
+                delay = app.tracker.next_delay()
+                app.tracker.record_attempt()
+                app.status = BACKOFF
+                app.restart_timer = self.events.call_later(delay, self._restart, app)
+
+        policy = app.definition.restart
+        if crash_loop:
+            self._emit(app, "crash_loop", restarts=policy.max_restarts, window=policy.window)
+        else:
+            self._emit(app, "restart_scheduled", delay=delay, attempt=app.tracker.restart_count)
+
+    def _cancel_restart(self, app):
+        if app.restart_timer is None:
+            return False
+        app.restart_timer.cancel()
+        app.restart_timer = None
+        return True
+
+    def _restart(self, app):
+        with self._lock:
+            if app.status != BACKOFF or app.is_running:
+                return
+            app.restart_timer = None
+            app.initial = False
+        try:
+            self._prepare_or_spawn(app, failed=lambda error: self._restart_failed(app, error))
+        except (LaunchError, OSError) as e:
+            self._restart_failed(app, str(e))
+
+    def _restart_failed(self, app, error):
+        self._start_failed(app, "restart_failed", error)
+        self._schedule_restart(app)
+
+    async def _wait_ready(self, app, process):
+        definition = app.definition
+        elapsed = await readiness.wait_until_ready(
+            definition.host,
+            self._port_tracker(app, process),
+            health_path=definition.health_path,
+            timeout=definition.ready_timeout,
+            on_port_open=lambda port: self._emit(app, "port_open", port=port),
+            should_continue=lambda: (app.process is process and app.status == STARTING
+                                     and process.poll() is None)
+        )
+
+        with self._lock:
+            if app.process is not process or app.status != STARTING:
+                return
+            if elapsed is None:
+                if process.poll() is not None:
+                    return
+                app.status = NOT_READY
+            else:
+                initial = self._mark_ready(app)
+
+        if elapsed is None:
+            self._emit(app, "not_ready", timeout=definition.ready_timeout)
+        else:
+            self._emit(app, "ready", elapsed=app.time_to_ready, url=app.url, source="probe", initial=initial)
+
+    def _port_tracker(self, app, process):
+        """Return a coroutine function giving the port to probe, adopting the one the app really binds"""
+        next_scan = time.monotonic() + PORT_SCAN_INTERVAL
+
+        async def current_port():
+            nonlocal next_scan
+            now = time.monotonic()
+            if now >= next_scan and app.process is process:
+                next_scan = now + PORT_SCAN_INTERVAL
+                # ps/lsof scans block; keep them off the loop
+                listening = await self.events.run_blocking(self._listening_ports, process)
+                if listening and app.port not in listening and app.process is process:
+                    app.port = min(listening)
+                    self._emit(app, "port_detected", port=app.port)
+            return app.port
+
+        return current_port
+
+    @staticmethod
+    def _listening_ports(process):
+        return ports.listening_ports([process.pid] + process_control.descendants(process.pid))
+
+    def _ensure_liveness(self):
+        with self._lock:
+            if not self._liveness_started:
+                self._liveness_started = True
+                self.events.call_soon(self._liveness_tick)
+
+    def _liveness_tick(self):
+        """Start the liveness probes that are due (they run concurrently) and re-arm"""
+        now = time.monotonic()
+        for app in list(self.apps.values()):
+            policy = app.definition.restart
+            if (policy.liveness_interval <= 0 or app.status != READY or now < app.next_probe
+                    or app.name in self._probing):
+                continue
+            app.next_probe = now + policy.liveness_interval
+            self._probing.add(app.name)
+            self.events.spawn(self._probe_liveness(app, app.process))
+        self.events.call_later(LIVENESS_TICK, self._liveness_tick)
+
+    async def _probe_liveness(self, app, process):
+        """Probe one app and restart it once it has stopped answering too often"""
+        definition = app.definition
+        try:
+            alive = await readiness.probe_alive(definition.host, app.port, definition.health_path)
+        finally:
+            self._probing.discard(app.name)
+        if alive:
+            app.probe_failures = 0
+            return
+        app.probe_failures += 1
+        if app.probe_failures >= definition.restart.liveness_failures:
+            self._restart_unhealthy(app, process)
+
+    def _restart_unhealthy(self, app, process):
+        """Kill a hung-but-alive app and hand it to the restart policy"""
+        with self._lock:
+            if process is None or app.process is not process:
+                return
+            app.process = None
+            app.status = EXITED
+            app.down_since = time.monotonic()
+            failures = app.probe_failures
+
+        self._emit(app, "unhealthy", failures=failures)
+        self._shutdown(app, process, self._after_unhealthy_kill)
+
+    def _after_unhealthy_kill(self, app, process, elapsed, forced):
+        if app.status == EXITED and app.definition.restart.should_restart(None):
+            self._schedule_restart(app)
@@ -0,0 +1,14 @@
+from env_cache import Fingerprint
+
+
+def test_changes_lists_added_removed_and_rehashed_files():
+    previous = {"requirements.txt": [10, 1, "aaa"], "package.json": [5, 1, "bbb"], "old.lock": [1, 1, "ccc"]}
+    current = Fingerprint("value", {"requirements.txt": [10, 2, "aaa"], "package.json": [6, 2, "ddd"],
+                                    "poetry.lock": [3, 2, "eee"]})
+    assert current.changes(previous) == ["old.lock", "package.json", "poetry.lock"]
+
+
+def test_no_changes():
+    files = {"requirements.txt": [10, 1, "aaa"]}
+    assert Fingerprint("value", dict(files)).changes(files) == []
+    assert Fingerprint("value", {}).changes({}) == []
@@ -0,0 +1,31 @@
+from journal import percentile, summarize
+
+
+def test_percentile_nearest_rank():
+    assert percentile([], 0.5) is None
+    assert percentile([7], 0.95) == 7
+    assert percentile([4, 1, 3, 2], 0.5) == 2
+    assert percentile(list(range(1, 101)), 0.95) == 95
+    assert percentile([1, 2, 3], 0.0) == 1
+
+
+def test_summarize():
+    records = [
+        {"app": "api", "step": "spawn"},
+        {"app": "api", "step": "first_output", "since_spawn": 0.2},
+        {"app": "api", "step": "ready", "since_spawn": 1.0},
+        {"app": "api", "step": "spawn"},
+        {"app": "api", "step": "ready", "since_spawn": 3.0},
+        {"app": "api", "step": "prepare_skipped", "saved": 1.25},
+        {"app": "web", "step": "spawn"},
+        {"app": "web", "step": "not_ready"},
+        {"app": "web", "step": "ready"},
+        {"step": "spawn"},
+    ]
+    summary = summarize(records)
+    assert summary["api"] == {"runs": 2, "ready": 2, "not_ready": 0, "ready_p50": 1.0, "ready_p95": 3.0,
+                              "first_output_p50": 0.2, "prepare_saved": 1.25}
+    assert summary["web"]["not_ready"] == 1
+    assert summary["web"]["ready"] == 0
+    assert summary["web"]["ready_p50"] is None
+    assert list(summarize(records, app="web")) == ["web"]
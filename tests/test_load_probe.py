@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+
+from load_probe import read_response
+
+
+def read(data, eof=True):
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        if eof:
+            reader.feed_eof()
+        result = await read_response(reader)
+        return result, await reader.read()
+    return asyncio.run(run())
+
+
+def test_content_length_body_is_skipped():
+    response = b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\nhelloHTTP/1.1"
+    assert read(response) == ((200, True), b"HTTP/1.1")
+
+
+def test_chunked_body_with_trailers():
+    response = (b"HTTP/1.1 404 Not Found\r\nTransfer-Encoding: chunked\r\n\r\n"
+                b"4;ext=1\r\nabcd\r\n3\r\nefg\r\n0\r\nX-Trailer: 1\r\n\r\nnext")
+    assert read(response) == ((404, True), b"next")
+
+
+def test_connection_headers_and_http_10():
+    assert read(b"HTTP/1.1 204 No Content\r\nConnection: close\r\n\r\n")[0] == (204, False)
+    assert read(b"HTTP/1.0 200 OK\r\nContent-Length: 0\r\n\r\n")[0] == (200, False)
+    assert read(b"HTTP/1.0 200 OK\r\nConnection: keep-alive\r\nContent-Length: 0\r\n\r\n")[0] == (200, True)
+
+
+def test_body_without_length_runs_to_close():
+    assert read(b"HTTP/1.1 200 OK\r\n\r\neverything until close") == ((200, False), b"")
+
+
+def test_closed_connection():
+    with pytest.raises(ConnectionResetError):
+        read(b"")
@@ -0,0 +1,79 @@
+import pytest
+
+from log_model import CHUNK_LINES, ERROR, STDERR, STDOUT, WARNING, LogFilter, LogIndex, LogModel, classify
+
+
+def build_index(lines, stream=STDOUT):
+    index = LogIndex()
+    for line in lines:
+        index.add(line, stream)
+    return index
+
+
+def test_classify():
+    assert classify("Traceback (most recent call last):") == ERROR
+    assert classify("⚠️ slow start") == WARNING
+    assert classify("GET / 200") == "info"
+
+
+def test_invalid_regex_raises_value_error():
+    with pytest.raises(ValueError):
+        LogFilter(text="(", regex=True)
+
+
+def test_text_is_case_insensitive_and_one_hit_per_line():
+    index = build_index(["Hello hello", "nothing", "HELLO again"])
+    assert index.query(LogFilter(text="hello")) == ["Hello hello", "HELLO again"]
+
+
+def test_regex_anchors_match_every_line_not_the_chunk():
+    index = build_index(["start", "error at start", "error", "last error"])
+    assert index.query(LogFilter(text="^error", regex=True)) == ["error at start", "error"]
+    assert index.query(LogFilter(text="error$", regex=True)) == ["error", "last error"]
+
+
+def test_offsets_survive_lines_that_change_length_when_folded():
+    # "İ".lower() is two characters long
+    index = build_index(["İİİİ", "x", "needle"])
+    assert index.query(LogFilter(text="needle")) == ["needle"]
+    assert index.query(LogFilter(text="^needle$", regex=True)) == ["needle"]
+
+
+def test_level_and_stream_filters():
+    index = LogIndex()
+    index.add("info line", STDOUT)
+    index.add("Error on stdout", STDOUT)
+    index.add("warn on stderr", STDERR)
+    index.add("Error on stderr", STDERR)
+    assert index.query(LogFilter(level=WARNING)) == ["Error on stdout", "warn on stderr", "Error on stderr"]
+    assert index.query(LogFilter(level=ERROR, stream=STDERR)) == ["Error on stderr"]
+    assert index.query(LogFilter(stream=STDERR, text="warn")) == ["warn on stderr"]
+
+
+def test_query_spans_chunks_with_since_and_limit():
+    index = build_index([f"line {number}" for number in range(CHUNK_LINES * 2 + 10)])
+    matches = index.query(LogFilter(text="line"), limit=3)
+    assert matches == [f"line {number}" for number in range(CHUNK_LINES * 2 + 7, CHUNK_LINES * 2 + 10)]
+    recent = [f"line {number}" for number in range(CHUNK_LINES * 2, CHUNK_LINES * 2 + 10)]
+    assert index.query(LogFilter(text="[13579]$", regex=True), since=CHUNK_LINES * 2) == recent[1::2]
+
+
+def test_old_chunks_fall_out_past_capacity():
+    index = LogIndex(capacity=CHUNK_LINES)
+    for number in range(CHUNK_LINES * 3):
+        index.add(f"line {number}", STDOUT)
+    assert index.query(LogFilter(text="^line 0$", regex=True)) == []
+    assert len(index.chunks) <= 2
+
+
+def test_drain_respects_limit_and_reports_dropped_lines():
+    model = LogModel(capacity=3)
+    for number in range(5):
+        model.append(f"line {number}")
+    batch = model.drain(1)
+    # The notice comes on top of the limit
+    assert batch[0].startswith("⚠️ 2 log lines dropped")
+    assert batch[1:] == ["line 2"]
+    assert model.drain() == ["line 3", "line 4"]
+    assert model.drain() == []
+    assert model.tail(2) == ["line 3", "line 4"]
@@ -0,0 +1,62 @@
+import json
+import os
+
+import pytest
+
+import project_detect
+from project_detect import ProjectIndex, python_command, quote, scan_folder
+
+
+def make_folder(folder, *names, **contents):
+    for name in names:
+        (folder / name).write_text("")
+    for name, text in contents.items():
+        (folder / name.replace("_", ".")).write_text(text)
+    return str(folder)
+
+
+def kinds(candidates):
+    return [candidate.source for candidate in candidates]
+
+
+@pytest.mark.skipif(os.name == "nt", reason="native scripts are .bat/.cmd on Windows")
+def test_native_scripts_first_and_foreign_scripts_last(tmp_path):
+    folder = make_folder(tmp_path, "run.sh", "start.sh", "start.bat", "app.py")
+    assert kinds(scan_folder(folder)) == ["start.sh", "run.sh", "app.py", "start.bat"]
+
+
+def test_ranking_across_kinds(tmp_path):
+    folder = make_folder(tmp_path, "manage.py", "app.py", "compose.yml", "docker-compose.yml",
+                         Procfile="release: migrate\nweb: gunicorn app:app\n",
+                         package_json=json.dumps({"scripts": {"dev": "vite", "serve": "vite preview"}}))
+    candidates = scan_folder(folder)
+    assert kinds(candidates) == ["Procfile", "package.json (dev)", "package.json (serve)", "manage.py",
+                                 "app.py", "docker-compose.yml"]
+    assert candidates[0].command == "gunicorn app:app"
+    assert candidates[1].command == "npm run dev"
+
+
+def test_broken_package_json_is_ignored(tmp_path):
+    folder = make_folder(tmp_path, "app.py", package_json="{not json")
+    assert kinds(scan_folder(folder)) == ["app.py"]
+
+
+def test_quote_and_python_command(monkeypatch):
+    monkeypatch.setattr(project_detect.sys, "executable", "/opt/my python/bin/python3")
+    if os.name != "nt":
+        assert quote("/a b/start.sh") == "'/a b/start.sh'"
+        assert python_command() == "'/opt/my python/bin/python3'"
+    monkeypatch.setattr(project_detect.sys, "frozen", True, raising=False)
+    monkeypatch.setattr(project_detect.shutil, "which", lambda name: None)
+    assert python_command() == "python"
+
+
+def test_index_caches_until_a_content_file_changes(tmp_path):
+    folder = make_folder(tmp_path, Procfile="web: one\n")
+    index = ProjectIndex()
+    assert index.best(folder).command == "one"
+    procfile = tmp_path / "Procfile"
+    procfile.write_text("web: two\n")
+    stat = procfile.stat()
+    os.utime(procfile, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert index.best(folder).command == "two"
@@ -0,0 +1,32 @@
+import pytest
+
+from resource_limits import format_cpus, parse_cpus
+
+
+@pytest.mark.parametrize("value, cpus", [
+    (None, None),
+    ("", None),
+    (2, [2]),
+    ([3, 1, 1], [1, 3]),
+    ("0-3,6", [0, 1, 2, 3, 6]),
+    (" 4 , 1-2 ,", [1, 2, 4]),
+])
+def test_parse_cpus(value, cpus):
+    assert parse_cpus(value) == cpus
+
+
+def test_parse_cpus_rejects_garbage():
+    with pytest.raises(ValueError):
+        parse_cpus("0-x")
+
+
+@pytest.mark.parametrize("cpus, text", [
+    ([], ""),
+    ([5], "5"),
+    ([0, 1, 2, 3, 6], "0-3,6"),
+    ([0, 2, 3, 5, 6, 7], "0,2-3,5-7"),
+])
+def test_format_cpus(cpus, text):
+    assert format_cpus(cpus) == text
+    if cpus:
+        assert parse_cpus(text) == cpus
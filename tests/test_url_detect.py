@@ -0,0 +1,39 @@
+import pytest
+
+from url_detect import UrlDetector, compile_patterns, normalize_url
+
+
+@pytest.mark.parametrize("line, url", [
+    (" * Running on http://127.0.0.1:5000", "http://127.0.0.1:5000"),
+    ("INFO:     Uvicorn running on http://0.0.0.0:8000 (Press CTRL+C to quit)", "http://127.0.0.1:8000"),
+    ("Starting development server at http://127.0.0.1:8000/", "http://127.0.0.1:8000/"),
+    ("Serving HTTP on :: port 8080 (http://[::]:8080/) ...", "http://127.0.0.1:8080/"),
+    ("  \x1b[32m➜\x1b[39m  \x1b[1mLocal\x1b[22m:   \x1b[36mhttp://localhost:\x1b[1m5173\x1b[22m/\x1b[39m",
+     "http://localhost:5173/"),
+    ("Server listening on http://localhost:3000.", "http://localhost:3000"),
+])
+def test_builtin_patterns(line, url):
+    assert UrlDetector().feed(line) == url
+
+
+def test_lines_without_a_url_are_skipped():
+    detector = UrlDetector()
+    assert detector.feed("Compiling...") is None
+    assert detector.feed("see https://example.com/docs") is None
+    assert detector.url is None
+
+
+def test_user_port_pattern_wins_and_scans_lines_without_a_scheme():
+    detector = UrlDetector(compile_patterns([r"ready on port (?P<port>\d+)"]), host="localhost")
+    assert detector.feed("api ready on port 9000") == "http://localhost:9000"
+    assert detector.url == "http://localhost:9000"
+
+
+def test_invalid_user_pattern():
+    with pytest.raises(ValueError):
+        compile_patterns(["(unclosed"])
+
+
+def test_normalize_url():
+    assert normalize_url("http://0.0.0.0:8000/app/),", host="localhost") == "http://localhost:8000/app/"
+    assert normalize_url("https://[::]") == "https://127.0.0.1"
@@ -1,19 +1,30 @@
+import sys
+
+if __name__ == "__main__" and "--headless" in sys.argv[1:]:
+    # Headless mode shares the core but must never import Tk
+    from headless import main
+    sys.exit(main(sys.argv[1:]))
+
 import tkinter as tk
-from tkinter import filedialog, messagebox
-import subprocess
+from tkinter import filedialog, messagebox, ttk
 import os
-import sys
-import threading
 import time
-import webbrowser
-import json
-from pathlib import Path
+
+import event_loop
+import launcher_core
+import load_probe
+import log_model
+import log_viewer
+import metrics
+import project_detect
+import readiness
+import supervisor
 
 class UniversalWebAppLauncher:
-    def __init__(self, auto_start=False):
+    def __init__(self, auto_start=False, core=None, early_events=None):
         self.root = tk.Tk()
         self.root.title("Universal Web App Launcher")
-        self.root.geometry("600x400")
+        self.root.geometry("700x860")
         self.root.resizable(True, True)
         
         # Center the window
@@ -21,19 +32,39 @@ class UniversalWebAppLauncher:
         
         # Initialize variables
         self.app_path = tk.StringVar()
-        self.server_process = None
-        self.config_file = "launcher_config.json"
+        self.log_model = log_model.LogModel()
         self.auto_start = auto_start
         
+        # Config and process supervision live in the Tk-free core (the auto-start
+        # launcher hands in one that has already loaded the config and spawned the server)
+        self.core = core or launcher_core.LauncherCore()
+        self.supervisor = self.core.supervisor
+        # Supervisor events arrive on its event loop; Tk only sees them through this queue
+        self.ui = event_loop.UiQueue(self.root)
+        forward = lambda event: self.ui.post(self.on_supervisor_event, event)
+        if early_events is not None:
+            early_events.attach(forward)
+        else:
+            self.supervisor.add_listener(forward)
+        
         # Load saved configuration
-        self.load_config()
+        if core is None:
+            self.load_config()
+        else:
+            self.app_path.set(self.core.app_path)
         
         # Setup UI
         self.setup_ui()
+        self.refresh_apps()
+        address = self.core.start()
+        if address:
+            self.log_status(f"Control API listening on {address}")
         
         # Auto-start if enabled and path is available
         if self.auto_start and self.app_path.get():
-            self.root.after(1000, self.auto_start_server)  # Start after 1 second
+            self.root.after(0, self.auto_start_server)
+        # Started after auto-start is queued so its message precedes early server output
+        self.ui.start()
         
     def center_window(self):
         """Center the window on the screen"""
@@ -76,14 +107,17 @@ class UniversalWebAppLauncher:
         path_inner_frame = tk.Frame(path_frame)
         path_inner_frame.pack(fill="x", padx=10, pady=10)
         
-        # Path entry
-        self.path_entry = tk.Entry(
+        # Path entry, with the recently used folders in its drop-down
+        self.path_entry = ttk.Combobox(
             path_inner_frame,
             textvariable=self.app_path,
+            values=self.core.recent_paths(),
+            postcommand=self.refresh_recent,
             font=("Arial", 10),
             width=50
         )
         self.path_entry.pack(side="left", fill="x", expand=True, padx=(0, 10))
+        self.path_entry.bind("<<ComboboxSelected>>", self.on_recent_selected)
         
         # Browse button
         browse_btn = tk.Button(
@@ -161,10 +195,137 @@ class UniversalWebAppLauncher:
         )
         self.change_path_btn.pack(pady=5)
         
+        # Watch-and-restart toggle for the selected app
+        self.watch_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            buttons_frame,
+            text="🔄 Restart on file changes",
+            variable=self.watch_var,
+            command=self.toggle_watch,
+            font=("Arial", 10)
+        ).pack(pady=(5, 0))
+        
+        # Applications frame (every app known to the supervisor)
+        apps_frame = tk.LabelFrame(main_frame, text="Applications", font=("Arial", 12, "bold"))
+        apps_frame.pack(fill="x", pady=(0, 20))
+        
+        self.apps_tree = ttk.Treeview(
+            apps_frame,
+            columns=("status", "url", "ready", "restarts", "downtime"),
+            height=5,
+            selectmode="browse"
+        )
+        self.apps_tree.heading("#0", text="App")
+        self.apps_tree.heading("status", text="Status")
+        self.apps_tree.heading("url", text="URL")
+        self.apps_tree.heading("ready", text="Ready in")
+        self.apps_tree.heading("restarts", text="Restarts")
+        self.apps_tree.heading("downtime", text="Downtime")
+        self.apps_tree.column("#0", width=140)
+        self.apps_tree.column("status", width=90)
+        self.apps_tree.column("url", width=160)
+        self.apps_tree.column("ready", width=70, anchor="e")
+        self.apps_tree.column("restarts", width=65, anchor="e")
+        self.apps_tree.column("downtime", width=75, anchor="e")
+        self.apps_tree.pack(fill="x", padx=10, pady=(10, 5))
+        self.apps_tree.bind("<<TreeviewSelect>>", self.on_app_selected)
+        
+        apps_buttons_frame = tk.Frame(apps_frame)
+        apps_buttons_frame.pack(pady=(0, 10))
+        
+        for text, command, color in (
+            ("▶ Start All", self.start_all_apps, "#4CAF50"),
+            ("⏹ Stop All", self.stop_all_apps, "#f44336"),
+            ("✖ Remove", self.remove_selected_app, "#757575"),
+            ("📄 View Log", self.view_log, "#795548"),
+            ("⚡ Load Probe", self.load_probe, "#FF9800"),
+            ("📊 Export Metrics", self.export_metrics, "#607D8B"),
+        ):
+            tk.Button(
+                apps_buttons_frame,
+                text=text,
+                command=command,
+                font=("Arial", 10),
+                bg=color,
+                fg="white",
+                padx=15
+            ).pack(side="left", padx=5)
+        
+        # App groups (stacks started in dependency order)
+        groups_frame = tk.Frame(apps_frame)
+        groups_frame.pack(pady=(0, 10))
+        
+        tk.Label(groups_frame, text="Group:", font=("Arial", 10)).pack(side="left")
+        group_names = sorted(self.core.groups.groups)
+        self.group_var = tk.StringVar(value=group_names[0] if group_names else "")
+        ttk.Combobox(
+            groups_frame,
+            textvariable=self.group_var,
+            values=group_names,
+            width=20,
+            state="readonly"
+        ).pack(side="left", padx=5)
+        
+        for text, command, color in (
+            ("▶ Start Group", self.start_group, "#4CAF50"),
+            ("⏹ Stop Group", self.stop_group, "#f44336"),
+        ):
+            tk.Button(
+                groups_frame,
+                text=text,
+                command=command,
+                font=("Arial", 10),
+                bg=color,
+                fg="white",
+                padx=15
+            ).pack(side="left", padx=5)
+        
         # Status frame
         status_frame = tk.LabelFrame(main_frame, text="Status", font=("Arial", 12, "bold"))
         status_frame.pack(fill="both", expand=True, pady=(0, 10))
         
+        # Resource usage of the selected app
+        self.metrics_label = tk.Label(
+            status_frame,
+            text="",
+            font=("Consolas", 9),
+            fg="#555555",
+            anchor="w"
+        )
+        self.metrics_label.pack(fill="x", padx=10, pady=(5, 0))
+        
+        # Filter bar: level, stream and text/regex over the whole buffered log
+        filter_frame = tk.Frame(status_frame)
+        filter_frame.pack(fill="x", padx=10, pady=(5, 0))
+        
+        self.filter_level = tk.StringVar(value="All levels")
+        self.filter_stream = tk.StringVar(value="All streams")
+        self.filter_text = tk.StringVar()
+        self.filter_regex = tk.BooleanVar(value=False)
+        self._filter_after_id = None
+        
+        for variable, values, width in (
+            (self.filter_level, ["All levels", "Warnings", "Errors"], 11),
+            (self.filter_stream, ["All streams", "stdout", "stderr", "launcher"], 11),
+        ):
+            combo = ttk.Combobox(filter_frame, textvariable=variable, values=values, width=width, state="readonly")
+            combo.pack(side="left", padx=(0, 5))
+            combo.bind("<<ComboboxSelected>>", self.schedule_filter)
+        
+        filter_entry = tk.Entry(filter_frame, textvariable=self.filter_text, font=("Arial", 10))
+        filter_entry.pack(side="left", fill="x", expand=True, padx=(0, 5))
+        filter_entry.bind("<KeyRelease>", self.schedule_filter)
+        
+        tk.Checkbutton(
+            filter_frame,
+            text="Regex",
+            variable=self.filter_regex,
+            command=self.schedule_filter
+        ).pack(side="left")
+        
+        self.filter_status = tk.Label(filter_frame, text="", font=("Arial", 9), fg="#555555")
+        self.filter_status.pack(side="left", padx=(5, 0))
+        
         # Status text widget
         self.status_text = tk.Text(
             status_frame,
@@ -182,6 +343,10 @@ class UniversalWebAppLauncher:
         self.status_text.config(yscrollcommand=scrollbar.set)
         scrollbar.config(command=self.status_text.yview)
         
+        # Batched, rate-limited rendering of the status log
+        self.log_view = log_model.TkLogView(self.root, self.status_text, self.log_model)
+        self.log_view.start()
+        
         # Initial status
         if self.app_path.get():
             self.log_status(f"Loaded saved app path: {self.app_path.get()}")
@@ -205,12 +370,46 @@ class UniversalWebAppLauncher:
             self.save_config()
             self.log_status(f"Selected folder: {folder_path}")
             
-            # Check if start.bat exists
-            start_bat_path = os.path.join(folder_path, "start.bat")
-            if os.path.exists(start_bat_path):
-                self.log_status("✓ start.bat found in selected folder")
+            # Check how the project can be started
+            candidate = project_detect.best_candidate(folder_path)
+            if candidate:
+                self.log_status(f"✓ {candidate.source} found in selected folder: {candidate.command}")
             else:
-                self.log_status("⚠️ start.bat not found in selected folder")
+                self.log_status("⚠️ No start script or known project type found in selected folder")
+    
+    def refresh_recent(self):
+        """Fill the path drop-down with the recently used folders"""
+        self.path_entry["values"] = self.core.recent_paths()
+    
+    def on_recent_selected(self, event=None):
+        """Switch to a folder picked from the recently used list"""
+        self.save_config()
+        self.log_status(f"Selected folder: {self.app_path.get()}")
+    
+    def current_app(self, create=False):
+        """Return the managed app for the selected path, registering it if create is set"""
+        app = self.core.app_for_path(self.app_path.get())
+        if app is None and create:
+            app = self.core.app_for_path(self.app_path.get(), create=True)
+            self.save_config()
+        return app
+    
+    def toggle_watch(self):
+        """Turn watch-and-restart on or off for the selected app"""
+        if not self.app_path.get().strip() or not os.path.isdir(self.app_path.get().strip()):
+            self.watch_var.set(False)
+            messagebox.showerror("Error", "Please select an application folder first")
+            return
+        app = self.current_app(create=True)
+        app.definition.watch = self.watch_var.get()
+        self.save_config()
+        if app.definition.watch:
+            self.log_status(f"Watching {app.definition.path} for changes")
+            if app.is_running:
+                self.core.watches.watch(app)
+        else:
+            self.log_status(f"Stopped watching {app.definition.path}")
+            self.core.watches.unwatch(app.name)
     
     def start_server_and_browser(self):
         """Start the server using start.bat and open browser"""
@@ -224,53 +423,19 @@ class UniversalWebAppLauncher:
             messagebox.showerror("Error", "Selected folder does not exist")
             return
         
-        start_bat_path = os.path.join(app_folder, "start.bat")
-        if not os.path.exists(start_bat_path):
-            # Try alternative start files
-            alt_files = ["start.cmd", "run.bat", "run.cmd", "server.bat", "app.bat"]
-            found_file = None
-            for alt_file in alt_files:
-                alt_path = os.path.join(app_folder, alt_file)
-                if os.path.exists(alt_path):
-                    start_bat_path = alt_path
-                    found_file = alt_file
-                    break
-            
-            if not found_file:
-                messagebox.showerror("Error", "start.bat (or alternative start file) not found in the selected folder")
-                return
-            else:
-                self.log_status(f"Using alternative start file: {found_file}")
+        app = self.current_app(create=True)
+        if app.is_running:
+            self.log_status(f"[{app.name}] Server is already running")
+            return
         
         try:
-            self.log_status("Starting server...")
-            self.log_status(f"Running: {start_bat_path}")
-            
-            # Start the server process
-            self.server_process = subprocess.Popen(
-                [start_bat_path],
-                shell=True,
-                cwd=app_folder,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
-            
-            # Update UI
-            self.start_btn.config(state="disabled")
-            self.stop_btn.config(state="normal")
-            
-            self.log_status("✓ Server started successfully")
-            
-            # Wait a moment then open browser
-            def delayed_browser_open():
-                time.sleep(3)  # Wait for server to start
-                self.open_browser()
-            
-            threading.Thread(target=delayed_browser_open, daemon=True).start()
-            
-            # Monitor server output
-            self.monitor_server_output()
+            self.log_status(f"[{app.name}] Starting server...")
+            if app.definition.depends_on:
+                # Bring up what it needs first; it starts once they are ready
+                self.core.groups.start([app.name], label=app.name)
+            else:
+                self.supervisor.start(app.name)
+            self.refresh_apps(reschedule=False)
             
         except Exception as e:
             self.log_status(f"❌ Failed to start server: {str(e)}")
@@ -278,16 +443,11 @@ class UniversalWebAppLauncher:
     
     def stop_server(self):
         """Stop the running server"""
-        if self.server_process:
+        app = self.current_app()
+        if app and app.is_running:
             try:
-                self.server_process.terminate()
-                self.server_process = None
-                
-                # Update UI
-                self.start_btn.config(state="normal")
-                self.stop_btn.config(state="disabled")
-                
-                self.log_status("✓ Server stopped")
+                self.supervisor.stop(app.name)
+                self.refresh_apps(reschedule=False)
                 
             except Exception as e:
                 self.log_status(f"❌ Error stopping server: {str(e)}")
@@ -295,10 +455,21 @@ class UniversalWebAppLauncher:
             self.log_status("No server process to stop")
     
     def open_browser(self):
-        """Open browser to localhost:5000"""
+        """Open browser to the selected app's URL"""
+        app = self.current_app()
+        if app:
+            self.open_url(app.url, app.name)
+        else:
+            self.open_url(f"http://{readiness.DEFAULT_HOST}:{supervisor.DEFAULT_PORT}")
+    
+    def open_url(self, url, app_name=None):
+        """Open browser to url (journaled against app_name if given)"""
         try:
-            url = "http://127.0.0.1:5000"
-            webbrowser.open(url)
+            if app_name:
+                self.core.open_browser(app_name, url)
+            else:
+                import webbrowser
+                webbrowser.open(url)
             self.log_status(f"✓ Opening browser: {url}")
             
         except Exception as e:
@@ -316,97 +487,240 @@ class UniversalWebAppLauncher:
             self.log_status("No saved app path found. Please select an app folder.")
             return
         
-        if not os.path.exists(app_folder):
-            self.log_status(f"❌ Saved path no longer exists: {app_folder}")
-            self.log_status("Please select a new app folder.")
+        error = self.core.check_app_folder(app_folder)
+        if error:
+            self.log_status(f"❌ {error}")
+            self.log_status("Please select a valid app folder.")
             return
         
-        start_bat_path = os.path.join(app_folder, "start.bat")
-        if not os.path.exists(start_bat_path):
-            # Try alternative start files
-            alt_files = ["start.cmd", "run.bat", "run.cmd", "server.bat", "app.bat"]
-            found_file = None
-            for alt_file in alt_files:
-                alt_path = os.path.join(app_folder, alt_file)
-                if os.path.exists(alt_path):
-                    start_bat_path = alt_path
-                    found_file = alt_file
-                    break
-            
-            if not found_file:
-                self.log_status(f"❌ start.bat (or alternative start file) not found in: {app_folder}")
-                self.log_status("Please select a valid app folder.")
-                return
-            else:
-                self.log_status(f"Using alternative start file: {found_file}")
+        app = self.current_app()
+        if app and app.is_running:
+            # The auto-start launcher spawned it before building this window
+            self.log_status(f"🚀 Auto-started server from saved path: {app_folder}")
+            self.refresh_apps(reschedule=False)
+            return
         
         self.log_status(f"🚀 Auto-starting server from saved path: {app_folder}")
         self.start_server_and_browser()
     
-    def monitor_server_output(self):
-        """Monitor server output in a separate thread"""
-        def monitor():
-            if self.server_process:
-                try:
-                    # Read server output
-                    while self.server_process.poll() is None:
-                        output = self.server_process.stdout.readline()
-                        if output:
-                            self.log_status(f"Server: {output.strip()}")
-                        time.sleep(0.1)
-                    
-                    # Server process ended
-                    self.log_status("Server process ended")
-                    self.root.after(0, lambda: self.stop_btn.config(state="disabled"))
-                    self.root.after(0, lambda: self.start_btn.config(state="normal"))
-                    
-                except Exception as e:
-                    self.log_status(f"Error monitoring server: {str(e)}")
-        
-        threading.Thread(target=monitor, daemon=True).start()
+    def start_all_apps(self):
+        """Start every registered app that is not running, in dependency order"""
+        # A tab per app is not wanted; "Open Browser" opens the selected one
+        self.start_apps(list(self.supervisor.apps), initial=False)
     
-    def log_status(self, message):
-        """Add a message to the status log"""
-        timestamp = time.strftime("%H:%M:%S")
-        full_message = f"[{timestamp}] {message}\n"
-        
-        # Append to text widget
-        self.status_text.insert("end", full_message)
-        self.status_text.see("end")  # Scroll to bottom
+    def stop_all_apps(self):
+        """Stop every running app, dependents first"""
+        self.core.groups.stop_all()
+        self.refresh_apps(reschedule=False)
+    
+    def start_apps(self, names, label="apps", initial=True):
+        """Start apps through the group manager; failures are logged as events"""
+        try:
+            self.core.groups.start(names, label=label, initial=initial)
+        except supervisor.LaunchError as e:
+            self.log_status(f"❌ {e}")
+            messagebox.showerror("Error", str(e))
+        self.refresh_apps(reschedule=False)
+    
+    def start_group(self):
+        """Start the selected app group in dependency order"""
+        group = self.group_var.get()
+        if group:
+            self.log_status(f"[{group}] Starting group: {', '.join(self.core.groups.members(group))}")
+            self.start_apps(self.core.groups.members(group), label=group, initial=False)
+    
+    def stop_group(self):
+        """Stop the selected app group in reverse dependency order"""
+        group = self.group_var.get()
+        if group:
+            self.core.groups.stop_group(group)
+            self.refresh_apps(reschedule=False)
+    
+    def remove_selected_app(self):
+        """Remove the selected app from the list"""
+        selection = self.apps_tree.selection()
+        if not selection:
+            return
+        try:
+            self.supervisor.remove_app(selection[0])
+        except supervisor.LaunchError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.log_status(f"Removed app: {selection[0]}")
+        self.save_config()
+        self.refresh_apps(reschedule=False)
+    
+    def on_app_selected(self, event=None):
+        """Make the selected app the target of the server controls"""
+        selection = self.apps_tree.selection()
+        if selection:
+            app = self.supervisor.get(selection[0])
+            if app and self.app_path.get() != app.definition.path:
+                self.app_path.set(app.definition.path)
+                self.save_config()
+    
+    def refresh_apps(self, reschedule=True):
+        """Sync the app list and control buttons with the supervisor state"""
+        snapshot = self.supervisor.snapshot()
+        names = set()
+        for state in snapshot:
+            names.add(state["name"])
+            ready = f"{state['time_to_ready']:.2f}s" if state["time_to_ready"] is not None else ""
+            status = state["status"]
+            if status in (supervisor.EXITED, supervisor.BACKOFF, supervisor.CRASH_LOOP) and state["exit_code"] is not None:
+                status = f"{status} ({state['exit_code']})"
+            downtime = f"{state['downtime']:.0f}s" if state["downtime"] else ""
+            values = (status, state["url"], ready, state["restarts"], downtime)
+            if self.apps_tree.exists(state["name"]):
+                self.apps_tree.item(state["name"], values=values)
+            else:
+                self.apps_tree.insert("", "end", iid=state["name"], text=state["name"], values=values)
+        for iid in self.apps_tree.get_children():
+            if iid not in names:
+                self.apps_tree.delete(iid)
+        
+        app = self.current_app()
+        running = bool(app and app.is_running)
+        self.start_btn.config(state="disabled" if running else "normal")
+        self.stop_btn.config(state="normal" if running else "disabled")
+        self.watch_var.set(bool(app and app.definition.watch))
+        self.refresh_metrics(app)
+        
+        if reschedule:
+            self.root.after(250, self.refresh_apps)
+    
+    def refresh_metrics(self, app):
+        """Show current and peak resource usage of the selected app"""
+        if not metrics.available() or self.core.metrics.interval <= 0:
+            text = ""
+        elif app is None:
+            text = "Resources: no app selected"
+        else:
+            sample, peak = self.core.metrics.current(app.name)
+            text = f"[{app.name}] {metrics.format_metrics(sample, peak)}"
+            breaches = self.core.limit_monitor.describe(app.name)
+            if breaches:
+                text += f"  ·  ⚠️ {breaches}"
+        if self.metrics_label.cget("text") != text:
+            self.metrics_label.config(text=text)
+    
+    def view_log(self):
+        """Open the on-disk log of the selected app"""
+        app = self.current_app()
+        if app is None:
+            messagebox.showinfo("View Log", "Select an application first")
+            return
+        path = self.core.log_file_for(app.name)
+        if path is None or not os.path.exists(path):
+            messagebox.showinfo("View Log", f"No log file for {app.name} yet")
+            return
+        log_viewer.LogFileWindow(self.root, path, title=f"Log - {app.name}")
+    
+    def load_probe(self):
+        """Put the selected app under a short burst of concurrent requests"""
+        app = self.current_app()
+        if app is None or not app.is_running:
+            messagebox.showinfo("Load Probe", "Start the application first")
+            return
+        probes = self.core.probes
+        self.log_status(f"⚡ Load probe of {app.name}: {probes.requests} requests, "
+                        f"{probes.concurrency} at a time...")
+        future = probes.submit(app.name)
+        future.add_done_callback(lambda done: self.ui.post(self.on_load_probe_done, app.name, done))
+    
+    def on_load_probe_done(self, name, future):
+        """Report a finished load probe in the status log"""
+        try:
+            result = future.result()
+        except Exception as e:
+            self.log_status(f"❌ Load probe of {name} failed: {e}")
+            return
+        status = "⚠️" if result["errors"] else "✓"
+        self.log_status(f"{status} Load probe of {name}: {load_probe.format_result(result)}")
+    
+    def export_metrics(self):
+        """Save the collected resource metrics as JSON or Prometheus text"""
+        path = filedialog.asksaveasfilename(
+            title="Export Metrics",
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json"), ("Prometheus text", "*.prom")]
+        )
+        if not path:
+            return
+        try:
+            self.core.metrics.export(path)
+            self.log_status(f"✓ Metrics exported to {path}")
+        except OSError as e:
+            self.log_status(f"❌ Failed to export metrics: {e}")
+    
+    def schedule_filter(self, event=None):
+        """Apply the filter bar shortly after the user stops typing"""
+        if self._filter_after_id is not None:
+            self.root.after_cancel(self._filter_after_id)
+        self._filter_after_id = self.root.after(150, self.apply_filter)
+    
+    def apply_filter(self):
+        """Re-render the status log with only the lines passing the filter bar"""
+        self._filter_after_id = None
+        level = {"Warnings": log_model.WARNING, "Errors": log_model.ERROR}.get(self.filter_level.get())
+        stream = self.filter_stream.get()
+        try:
+            log_filter = log_model.LogFilter(
+                level=level,
+                stream=stream if stream != "All streams" else None,
+                text=self.filter_text.get(),
+                regex=self.filter_regex.get()
+            )
+        except ValueError as e:
+            self.filter_status.config(text=str(e), fg="#f44336")
+            return
         
-        # Update the GUI
-        self.root.update_idletasks()
+        shown = self.log_view.set_filter(log_filter)
+        if log_filter.active:
+            label = f"last {shown} matches" if shown >= self.log_view.max_lines else f"{shown} matching"
+            self.filter_status.config(text=label, fg="#555555")
+        else:
+            self.filter_status.config(text="")
+    
+    def on_supervisor_event(self, event):
+        """Turn supervisor events into status log lines (runs on the Tk thread via the UI queue)"""
+        message = launcher_core.describe_event(event)
+        if message:
+            stream = event["stream"] if event["type"] == "output" else log_model.LAUNCHER
+            self.log_status(f"[{event['app']}] {message}", stream)
+        
+        # Only the first ready after a Start; restarts and reattaches leave the browser alone
+        if event["type"] == "ready" and event.get("initial"):
+            app = self.supervisor.get(event["app"])
+            if app and app.definition.open_browser:
+                self.open_url(event["url"], app.name)
+    
+    def log_status(self, message, stream=log_model.LAUNCHER):
+        """Add a message to the status log (safe to call from any thread)"""
+        timestamp = time.strftime("%H:%M:%S")
+        self.log_model.append(f"[{timestamp}] {message}", stream)
     
     def save_config(self):
         """Save configuration to file"""
-        try:
-            config = {
-                "app_path": self.app_path.get()
-            }
-            with open(self.config_file, "w") as f:
-                json.dump(config, f)
-        except Exception as e:
-            print(f"Error saving config: {e}")
+        self.core.app_path = self.app_path.get()
+        self.core.save_config()
     
     def load_config(self):
         """Load configuration from file"""
-        try:
-            if os.path.exists(self.config_file):
-                with open(self.config_file, "r") as f:
-                    config = json.load(f)
-                    self.app_path.set(config.get("app_path", ""))
-        except Exception as e:
-            print(f"Error loading config: {e}")
+        self.core.load_config()
+        self.app_path.set(self.core.app_path)
     
     def on_closing(self):
         """Handle application closing"""
-        if self.server_process:
-            try:
-                self.server_process.terminate()
-            except:
-                pass
+        try:
+            # keep_running apps stay up; the next launcher run reattaches to them
+            self.core.groups.stop_all(wait=True, keep_running=True)
+            # Before close(), which writes out the pending save
+            self.save_config()
+            self.core.close()
+        except:
+            pass
         
-        self.save_config()
         self.root.destroy()
         
     def run(self):
@@ -415,8 +729,6 @@ class UniversalWebAppLauncher:
         self.root.mainloop()
 
 if __name__ == "__main__":
-    import sys
-    
     # Check for auto-start command line argument
     auto_start = len(sys.argv) > 1 and sys.argv[1] == "--auto-start"
     
@@ -0,0 +1,89 @@
+"""
+Detect the URL a server is serving from its startup output.
+Flask, Vite, uvicorn, Django, http.server and most Node servers print their
+bound URL as soon as they are listening; catching that line lets the browser
+open immediately, on the right port.
+"""
+
+import re
+
+BUILTIN_PATTERNS = [
+    r"Running on (?P<url>https?://\S+)",                                # Flask / Werkzeug
+    r"Uvicorn running on (?P<url>https?://\S+)",                        # uvicorn
+    r"Starting development server at (?P<url>https?://\S+)",            # Django
+    r"Serving HTTP on \S+ port \d+ \((?P<url>https?://[^)\s]+)\)",      # python -m http.server
+    r"Local:\s+(?P<url>https?://\S+)",                                  # Vite / Next.js / CRA
+    r"(?:[Ll]istening|[Rr]unning|[Ss]erving|[Aa]vailable) (?:on|at) (?P<url>https?://\S+)",  # Express and friends
+]
+
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+WILDCARD_HOSTS = ("0.0.0.0", "[::]", "::")
+
+
+def compile_patterns(patterns):
+    """Compile user-supplied regexes, raising ValueError for invalid ones"""
+    compiled = []
+    for pattern in patterns:
+        try:
+            compiled.append(re.compile(pattern))
+        except re.error as e:
+            raise ValueError(f"Invalid URL pattern '{pattern}': {e}") from e
+    return compiled
+
+
+_BUILTIN = compile_patterns(BUILTIN_PATTERNS)
+
+
+def normalize_url(url, host="127.0.0.1"):
+    """Tidy a URL printed by a server so a browser can open it"""
+    url = url.rstrip(".,;'\")]")
+    # The bracket closing a bare IPv6 host is part of the URL
+    if url.count("[") > url.count("]"):
+        url += "]"
+    scheme, _, rest = url.partition("://")
+    netloc, slash, path = rest.partition("/")
+    for wildcard in WILDCARD_HOSTS:
+        if netloc == wildcard or netloc.startswith(wildcard + ":"):
+            netloc = host + netloc[len(wildcard):]
+            break
+    return f"{scheme}://{netloc}{slash}{path}"
+
+
+class UrlDetector:
+    """Match server output lines against URL patterns until the first hit"""
+
+    def __init__(self, extra_patterns=(), host="127.0.0.1"):
+        # User patterns win over the built-in rules
+        self.patterns = list(extra_patterns) + _BUILTIN
+        self.host = host
+        self.url = None
+        # Patterns that capture a bare port can match lines without a URL in them
+        self._scan_all = any("port" in pattern.groupindex for pattern in self.patterns)
+
+    def feed(self, line):
+        """Return the served URL if line announces it, else None"""
+        # Cheap prefilter: almost no log line contains "://"
+        if "://" not in line and not self._scan_all:
+            return None
+        if "\x1b" in line:
+            line = ANSI_ESCAPE.sub("", line)
+
+        for pattern in self.patterns:
+            match = pattern.search(line)
+            if match:
+                url = self._url_from_match(match)
+                if url:
+                    self.url = url
+                    return url
+        return None
+
+    def _url_from_match(self, match):
+        groups = match.groupdict()
+        if groups.get("url"):
+            return normalize_url(groups["url"], self.host)
+        if groups.get("port"):
+            return f"http://{self.host}:{groups['port']}"
+        text = match.group(0)
+        if "://" in text:
+            return normalize_url(text, self.host)
+        return None
@@ -0,0 +1,419 @@
+"""
+Watch-and-restart for app folders.
+Uses inotify on Linux (one watch per non-excluded directory) and otherwise,
+or when watch descriptors would run out, an mtime/size index that is
+rescanned a few directories at a time under a small CPU budget. Bursts of
+changes are debounced into a single restart through the supervisor. Every
+watcher runs on the launcher's event loop rather than a thread of its own.
+"""
+
+import asyncio
+import ctypes
+import errno
+import fnmatch
+import os
+import re
+import select
+import struct
+import threading
+import time
+from collections import deque
+
+from supervisor import STOPPED
+
+DEFAULT_EXCLUDES = ["node_modules", ".git", "__pycache__", ".venv", "venv", ".mypy_cache",
+                    ".pytest_cache", ".idea", ".vscode", "*.pyc", "*.log", "*.swp", "*~"]
+DEFAULT_DEBOUNCE = 0.5
+MAX_WAIT = 5.0             # restart even if changes never stop for this long
+POLL_TICK = 0.1
+POLL_BUDGET = 0.01         # seconds of scanning per tick: ~10% of one core at most
+STOP_WATCH_DELAY = 1.0
+
+# inotify constants (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+              | IN_CREATE | IN_DELETE | IN_DELETE_SELF)
+EVENT_HEADER = struct.Struct("iIII")
+# Leave most of the per-user watch budget to other programs (IDEs, other watchers)
+WATCH_SHARE = 0.5
+
+
+def compile_globs(patterns):
+    """Combine glob patterns into one regex (None if there are none); case-insensitive on Windows"""
+    if not patterns:
+        return None
+    flags = re.IGNORECASE if os.name == "nt" else 0
+    return re.compile("|".join(fnmatch.translate(pattern) for pattern in patterns), flags)
+
+
+class PathFilter:
+    """Include/exclude globs for paths relative to the watched folder"""
+
+    def __init__(self, includes=None, excludes=None):
+        self.includes = list(includes or [])
+        self.excludes = DEFAULT_EXCLUDES if excludes is None else list(excludes)
+        # One regex per list: the poller tests every name it sees
+        self._include = compile_globs(self.includes)
+        self._exclude = compile_globs(self.excludes)
+
+    def excluded(self, name):
+        """Return True if a file or directory name (or its relative path) is excluded"""
+        return self._exclude is not None and self._exclude.match(name) is not None
+
+    def wanted(self, relative_path):
+        """Return True if a change to this file should trigger a restart"""
+        parts = relative_path.replace("\\", "/").split("/")
+        if any(self.excluded(part) for part in parts) or self.excluded(relative_path):
+            return False
+        if self._include is None:
+            return True
+        return bool(self._include.match(parts[-1]) or self._include.match(relative_path))
+
+
+def walk_dirs(root, path_filter):
+    """Yield the relative paths of all non-excluded directories under root (root is "")"""
+    stack = [""]
+    while stack:
+        relative = stack.pop()
+        yield relative
+        try:
+            with os.scandir(os.path.join(root, relative)) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False) and not path_filter.excluded(entry.name):
+                        stack.append(os.path.join(relative, entry.name))
+        except OSError:
+            continue
+
+
+def max_user_watches():
+    try:
+        with open("/proc/sys/fs/inotify/max_user_watches") as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        return 8192
+
+
+class _Inotify:
+    """Recursive inotify watch via ctypes (Linux only)"""
+
+    def __init__(self, root, path_filter):
+        self.root = root
+        self.filter = path_filter
+        libc = ctypes.CDLL(None, use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches = {}
+        self.limit = int(max_user_watches() * WATCH_SHARE)
+        try:
+            for relative in walk_dirs(root, path_filter):
+                self.add(relative)
+        except OSError:
+            self.close()
+            raise
+
+    def add(self, relative):
+        if len(self.watches) >= self.limit:
+            raise OSError(errno.ENOSPC, "Too many directories for inotify")
+        path = os.path.join(self.root, relative)
+        wd = self._add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            if error == errno.ENOSPC:
+                raise OSError(error, "inotify watch limit reached")
+            return  # The directory vanished or cannot be read
+        self.watches[wd] = relative
+
+    def read(self, timeout):
+        """Return changed relative paths (None means "rescan everything")"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return []
+
+        changed = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                return None
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+            directory = self.watches.get(wd)
+            if directory is None or not name:
+                continue
+            relative = os.path.join(directory, name)
+            if mask & IN_ISDIR:
+                if self.filter.excluded(name):
+                    continue
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    # Watch new directories, including ones created inside them before the watch landed
+                    for sub in self._walk_new(relative):
+                        self.add(sub)
+                changed.append(relative)
+            elif self.filter.wanted(relative):
+                changed.append(relative)
+        return changed
+
+    def _walk_new(self, relative):
+        for sub in walk_dirs(os.path.join(self.root, relative), self.filter):
+            yield os.path.join(relative, sub) if sub else relative
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class _PollIndex:
+    """mtime/size index rescanned a few directories at a time"""
+
+    def __init__(self, root, path_filter):
+        self.root = root
+        self.filter = path_filter
+        self.listings = {}
+        self.queue = deque([""])
+
+    def scan(self, budget):
+        """Rescan directories for up to budget seconds; return changed relative paths"""
+        changed = []
+        deadline = time.monotonic() + budget
+        for _ in range(len(self.queue)):
+            if time.monotonic() >= deadline:
+                break
+            relative = self.queue.popleft()
+            changed.extend(self._scan_dir(relative))
+        return changed
+
+    def _scan_dir(self, relative):
+        previous = self.listings.get(relative)
+        listing = {}
+        try:
+            with os.scandir(os.path.join(self.root, relative)) as entries:
+                for entry in entries:
+                    if self.filter.excluded(entry.name):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            listing[entry.name] = None
+                        else:
+                            stat = entry.stat(follow_symlinks=False)
+                            listing[entry.name] = (stat.st_mtime_ns, stat.st_size)
+                    except OSError:
+                        continue
+        except OSError:
+            # Gone: forget it; its subdirectories drop out the same way when their turn comes
+            self.listings.pop(relative, None)
+            return [relative] if previous is not None else []
+
+        self.listings[relative] = listing
+        self.queue.append(relative)
+        changed = []
+        for name, stamp in listing.items():
+            child = os.path.join(relative, name)
+            if stamp is None:
+                if previous is None or name not in previous:
+                    self.queue.append(child)
+                    if previous is not None:
+                        changed.append(child)
+            elif previous is not None and previous.get(name) != stamp and self.filter.wanted(child):
+                changed.append(child)
+        if previous is not None:
+            for name in previous.keys() - listing.keys():
+                child = os.path.join(relative, name)
+                if previous[name] is None or self.filter.wanted(child):
+                    changed.append(child)
+        return changed
+
+
+class FolderWatcher:
+    """Call on_change(paths) once per burst of changes under a folder.
+
+    Runs on the launcher's event loop: the inotify descriptor is a loop
+    reader, debouncing is a loop timer and poll scans go to the worker pool.
+    """
+
+    def __init__(self, events, root, on_change, includes=None, excludes=None, debounce=DEFAULT_DEBOUNCE,
+                 use_inotify=True):
+        self.events = events
+        self.root = root
+        self.on_change = on_change
+        self.filter = PathFilter(includes, excludes)
+        self.debounce = debounce
+        self.use_inotify = use_inotify
+        self.backend = None
+        self._inotify = None
+        self._poller = None
+        self._pending = set()
+        self._first_change = 0.0
+        self._flush_timer = None
+        self._stopped = False
+
+    def start(self):
+        self.events.spawn(self._open())
+
+    def stop(self):
+        self._stopped = True
+        self.events.call_soon(self._close)
+
+    async def _open(self):
+        if self.use_inotify and os.path.isdir("/proc/sys/fs/inotify"):
+            try:
+                # One watch per directory: slow enough on big trees to keep off the loop
+                inotify = await self.events.run_blocking(_Inotify, self.root, self.filter)
+            except (OSError, AttributeError) as e:
+                print(f"inotify unavailable for {self.root} ({e}); polling instead")
+            else:
+                if self._stopped:
+                    inotify.close()
+                    return
+                self._inotify = inotify
+                self.backend = "inotify"
+                self.events.loop.add_reader(inotify.fd, self._on_inotify)
+                return
+        self._start_polling()
+
+    def _start_polling(self):
+        self._poller = _PollIndex(self.root, self.filter)
+        self.backend = "poll"
+        self.events.spawn(self._poll())
+
+    async def _poll(self):
+        while not self._stopped:
+            tick_start = time.monotonic()
+            changed = await self.events.run_blocking(self._poller.scan, POLL_BUDGET)
+            self._changed(changed)
+            await asyncio.sleep(max(0.0, POLL_TICK - (time.monotonic() - tick_start)))
+
+    def _on_inotify(self):
+        try:
+            changed = self._inotify.read(0)
+        except OSError as e:
+            print(f"inotify failed for {self.root} ({e}); polling instead")
+            self._close_inotify()
+            self._changed([""])
+            self._start_polling()
+            return
+        self._changed([""] if changed is None else changed)
+
+    def _changed(self, paths):
+        if not paths or self._stopped:
+            return
+        now = time.monotonic()
+        if not self._pending:
+            self._first_change = now
+        self._pending.update(paths)
+        # Each change pushes the restart back, but never past MAX_WAIT after the first one
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+        delay = min(self.debounce, max(0.0, self._first_change + MAX_WAIT - now))
+        self._flush_timer = self.events.loop.call_later(delay, self._flush)
+
+    def _flush(self):
+        self._flush_timer = None
+        paths = sorted(self._pending)
+        self._pending.clear()
+        if not paths or self._stopped:
+            return
+        try:
+            self.on_change(paths)
+        except Exception as e:
+            print(f"Error handling file changes: {e}")
+
+    def _close_inotify(self):
+        if self._inotify is not None:
+            self.events.loop.remove_reader(self._inotify.fd)
+            self._inotify.close()
+            self._inotify = None
+
+    def _close(self):
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        self._close_inotify()
+
+
+class WatchManager:
+    """Restart apps with watch enabled when files in their folder change"""
+
+    def __init__(self, supervisor):
+        self.supervisor = supervisor
+        self.watchers = {}
+        self._lock = threading.Lock()
+        supervisor.add_listener(self.on_event)
+
+    def on_event(self, event):
+        kind = event["type"]
+        app = self.supervisor.get(event["app"])
+        if kind in ("started", "reattached"):
+            if app is not None and app.definition.watch:
+                self.watch(app)
+        elif kind == "stopped":
+            # A restart passes through "stopped" too; only drop the watcher if it stays stopped
+            self.supervisor.events.call_later(STOP_WATCH_DELAY, self._drop_if_stopped, event["app"])
+
+    def watch(self, app):
+        """Start watching an app's folder (no-op if already watched)"""
+        definition = app.definition
+        with self._lock:
+            if app.name in self.watchers:
+                return
+            watcher = FolderWatcher(
+                self.supervisor.events,
+                definition.path,
+                lambda paths: self._on_change(app.name, paths),
+                includes=definition.watch_include or None,
+                excludes=definition.watch_exclude,
+                debounce=definition.watch_debounce,
+            )
+            self.watchers[app.name] = watcher
+        watcher.start()
+
+    def unwatch(self, name):
+        with self._lock:
+            watcher = self.watchers.pop(name, None)
+        if watcher is not None:
+            watcher.stop()
+
+    def stop_all(self):
+        for name in list(self.watchers):
+            self.unwatch(name)
+
+    def _drop_if_stopped(self, name):
+        app = self.supervisor.get(name)
+        if app is None or (not app.is_running and app.shutdown is None):
+            self.unwatch(name)
+
+    def _on_change(self, name, paths):
+        app = self.supervisor.get(name)
+        if app is None or not app.definition.watch:
+            self.unwatch(name)
+            return
+        if not app.is_running and app.shutdown is None and app.status == STOPPED:
+            return
+        self.supervisor.emit(name, "files_changed", paths=paths)
+        try:
+            self.supervisor.restart(name)
+        except Exception as e:
+            self.supervisor.emit(name, "restart_failed", error=str(e))